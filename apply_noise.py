@@ -1,5 +1,10 @@
+import hashlib
+import json
+from collections import OrderedDict
+from fractions import Fraction
+from math import gcd
+
 import numpy as np
-import random
 from typing import Dict, List, Optional
 
 class GradeReverseEngine:
@@ -10,37 +15,59 @@ class GradeReverseEngine:
     2. 支持多种统计分布 (正态、左偏、双峰等)。
     3. 支持【噪声三角】控制：触发率、分数分布模式、位置偏好。
     4. 支持分数跨度控制 (spread_mode)。
+    5. 所有随机数来自引擎自身的 numpy Generator，可由运行种子完整复现。
     """
 
-    def __init__(self):
-        pass
+    def __init__(self, seed: Optional[int] = None, seed_sequence: Optional[np.random.SeedSequence] = None):
+        """
+        :param seed: 运行种子；为 None 时自动生成一个并记录在 self.seed 中
+        :param seed_sequence: 由父引擎派生的种子序列（内部使用，优先于 seed）
+        """
+        if seed_sequence is None:
+            seed_sequence = np.random.SeedSequence(seed)
+        self.seed_sequence = seed_sequence
+        self.seed = int(seed_sequence.entropy)
+        self.rng = np.random.default_rng(seed_sequence)
+        # 最近一次批量分解中被注入噪声的学生行号（供审计核对不及格人数）
+        self.last_noise_rows = np.zeros(0, dtype=int)
+        self.last_noise_rows_by_link = []
+
+    def spawn(self, n: int) -> List["GradeReverseEngine"]:
+        """
+        派生 n 个相互独立的子引擎（每个环节 / 每个工作进程一个）
+        子引擎沿用父引擎的 seed，随机流由 SeedSequence.spawn 保证互不重叠。
+        """
+        return [GradeReverseEngine(seed_sequence=child) for child in self.seed_sequence.spawn(n)]
 
     # ==========================================
     # 1. 核心分布生成方法 (Distribution Methods)
     # ==========================================
 
-    def dist_normal(self, target_mean: float, scale: float = 5.0) -> float:
+    # 各分布均支持 size 参数：size=None 时返回单个 float；
+    # 给定 size 时返回数组，target_mean / scale / strength 可为可广播到 size 的数组。
+
+    def dist_normal(self, target_mean, scale=5.0, size=None):
         """标准正态分布"""
-        score = np.random.normal(loc=target_mean, scale=scale)
-        return self._clamp(score)
+        score = self.rng.normal(loc=target_mean, scale=scale, size=size)
+        return self._clamp_scores(score, size)
 
-    def dist_left_skewed(self, target_mean: float, strength: float = 10.0) -> float:
+    def dist_left_skewed(self, target_mean, strength=10.0, size=None):
         """左偏分布 (容易拿高分)"""
-        low = max(0, target_mean - strength * 3)
-        high = min(100, target_mean + strength)
-        mode = high 
-        score = np.random.triangular(left=low, mode=mode, right=high)
-        return self._clamp(score)
+        low = np.maximum(0, np.subtract(target_mean, np.multiply(strength, 3)))
+        high = np.minimum(100, np.add(target_mean, strength))
+        mode = high
+        score = self.rng.triangular(left=low, mode=mode, right=high, size=size)
+        return self._clamp_scores(score, size)
 
-    def dist_right_skewed(self, target_mean: float, strength: float = 10.0) -> float:
+    def dist_right_skewed(self, target_mean, strength=10.0, size=None):
         """右偏分布 (题目难，低分多)"""
-        low = max(0, target_mean - strength)
-        high = min(100, target_mean + strength * 3)
-        mode = low 
-        score = np.random.triangular(left=low, mode=mode, right=high)
-        return self._clamp(score)
+        low = np.maximum(0, np.subtract(target_mean, strength))
+        high = np.minimum(100, np.add(target_mean, np.multiply(strength, 3)))
+        mode = low
+        score = self.rng.triangular(left=low, mode=mode, right=high, size=size)
+        return self._clamp_scores(score, size)
 
-    def dist_bimodal(self, target_mean: float = 75, low_peak: float = None, high_peak: float = None, ratio: float = 0.5, scale: float = 5.0) -> float:
+    def dist_bimodal(self, target_mean=75, low_peak=None, high_peak=None, ratio: float = 0.5, scale=5.0, size=None):
         """
         双峰分布 (两极分化)
         :param target_mean: 目标均值，用于动态计算双峰位置
@@ -49,34 +76,38 @@ class GradeReverseEngine:
         """
         # 根据目标均值动态计算双峰位置
         if low_peak is None:
-            low_peak = max(0, target_mean - 15)
+            low_peak = np.maximum(0, np.subtract(target_mean, 15))
         if high_peak is None:
-            high_peak = min(100, target_mean + 15)
-        
-        if random.random() < ratio:
-            score = np.random.normal(loc=high_peak, scale=scale)
-        else:
-            score = np.random.normal(loc=low_peak, scale=scale)
-        return self._clamp(score)
+            high_peak = np.minimum(100, np.add(target_mean, 15))
+
+        # 伯努利掩码决定落在哪个峰
+        is_high = self.rng.random(size) < ratio
+        score = self.rng.normal(loc=np.where(is_high, high_peak, low_peak), scale=scale, size=size)
+        return self._clamp_scores(score, size)
 
-    def dist_discrete(self, target_mean: float = 75, levels: List[int] = None) -> float:
+    def dist_discrete(self, target_mean=75, levels: List[int] = None, size=None):
         """
         离散档位分布
-        :param target_mean: 目标均值，用于筛选合适的档位
+        :param target_mean: 目标均值，用于筛选合适的档位（±15分范围内，没有则取最接近的档位）
         :param levels: 可选的档位列表
         """
         if levels is None:
             levels = [60, 70, 80, 85, 90, 95]
-        
-        # 筛选出与目标均值接近的档位（±15分范围内）
-        valid_levels = [lv for lv in levels if abs(lv - target_mean) <= 15]
-        
-        # 如果没有合适的档位，使用所有档位中最接近的
-        if not valid_levels:
-            valid_levels = [min(levels, key=lambda x: abs(x - target_mean))]
-        
-        score = np.random.choice(valid_levels)
-        return float(score)
+        level_arr, edges, cumulative, counts, empty = _discrete_table(levels)
+
+        t = np.asarray(target_mean, dtype=float)
+        if size is not None:
+            t = np.broadcast_to(t, size)
+        # 按目标所在区间（边界点单独成桶）查预计算的有效档位表，再在有效档位中均匀抽取
+        bucket = np.searchsorted(edges, t, side='left') + np.searchsorted(edges, t, side='right')
+        pick = (self.rng.random(t.shape) * counts[bucket]).astype(int)
+        score = level_arr[(cumulative[bucket] > pick[..., None]).argmax(axis=-1)]
+        # ±15 分内没有档位的区间：按目标本身（而非区间代表点）取最接近的档位
+        gap = empty[bucket]
+        if gap.any():
+            score = np.array(score)
+            score[gap] = level_arr[np.abs(level_arr[None, :] - t[gap][:, None]).argmin(axis=1)]
+        return float(score) if size is None and np.ndim(score) == 0 else score
 
     # ==========================================
     # 2. 智能噪声控制 (Smart Noise Injection)
@@ -98,7 +129,7 @@ class GradeReverseEngine:
         
         # --- 控制1：决定这个学生是否中招 ---
         # 如果随机数大于比率，则该学生安全，直接返回原成绩
-        if random.random() > noise_ratio:
+        if self.rng.random() > noise_ratio:
             return noisy_scores 
 
         # --- 控制3：决定在哪一项注入 ---
@@ -110,21 +141,21 @@ class GradeReverseEngine:
             return noisy_scores
 
         # 随机挑一个倒霉的科目
-        target_item = random.choice(valid_targets)
+        target_item = valid_targets[self.rng.integers(len(valid_targets))]
         
         # --- 控制2：决定不及格的分数是多少 (核心修改区域) ---
         if severity_mode == 'near_miss': 
             # 边缘挂科: 55 - 59 分 (模拟努力了但没过)
-            fake_score = random.uniform(55, 59.9)
+            fake_score = self.rng.uniform(55, 59.9)
             
         elif severity_mode == 'catastrophic': 
             # 严重缺失: 0 - 40 分 (模拟缺考或极差)
-            fake_score = random.uniform(0, 40.0)
+            fake_score = self.rng.uniform(0, 40.0)
             
         else: 
             # random / default: 40 - 59 分 (常规不及格)
             # 您的要求：默认推荐改为 40-59
-            fake_score = random.uniform(40, 59.9)
+            fake_score = self.rng.uniform(40, 59.9)
             
         # 注入分数 (保留1位小数)
         noisy_scores[target_item] = round(fake_score, 1)
@@ -166,13 +197,15 @@ class GradeReverseEngine:
                            student_total_score: float, 
                            structure: Dict[str, Dict], 
                            noise_config: Dict = None,
-                           spread_mode: str = 'medium') -> Dict[str, float]:
+                           spread_mode: str = 'medium',
+                           score_step: Optional[float] = None) -> Dict[str, float]:
         """
         主函数：根据总分逆向生成各分项
         :param student_total_score: 该环节的总分
         :param structure: 方法结构，格式 {method_name: {'weight': 0.5, 'type': 'normal'}}
         :param noise_config: 包含 noise_ratio, severity_mode, allowed_items 的字典
         :param spread_mode: 分数跨度模式 ('large', 'medium', 'small')
+        :param score_step: 分数网格（1、0.5 或 0.1）；None 时保留1位小数
         """
         
         # 默认噪声配置
@@ -185,10 +218,9 @@ class GradeReverseEngine:
 
         # ===== 极端分数直接返回（用户无感知） =====
         # 极低分(0-2)或极高分(98-100)直接让所有分项等于总分，避免分布计算导致的偏差
-        if student_total_score <= 2:
-            return {name: round(student_total_score, 1) for name in structure.keys()}
-        if student_total_score >= 98:
-            return {name: round(student_total_score, 1) for name in structure.keys()}
+        if student_total_score <= 2 or student_total_score >= 98:
+            value = float(self._round_to_grid(student_total_score, score_step))
+            return {name: value for name in structure.keys()}
 
         # ===== 100分限制（用户无感知） =====
         # 如果原始总分不是99或100，推算出的方法分数最高只能是99
@@ -265,48 +297,499 @@ class GradeReverseEngine:
                 allowed_items=allowed
             )
 
-        # 第三步：计算偏差并修正 (Target Alignment)
-        current_weighted_sum = sum(draft_scores[k] * structure[k]['weight'] for k in draft_scores)
-        diff = student_total_score - current_weighted_sum
-        
-        final_scores = {}
-        for name, score in draft_scores.items():
-            final_scores[name] = self._clamp(score + diff, max_allowed_score)
-            
-        # 第四步：锚点强行修正 (Anchor Fix)
-        sorted_items = sorted(structure.items(), key=lambda x: x[1]['weight'], reverse=True)
-        anchor_name = sorted_items[0][0]
-        anchor_weight = sorted_items[0][1]['weight']
-        
-        post_clamp_total = sum(final_scores[k] * structure[k]['weight'] for k in final_scores)
-        final_diff = student_total_score - post_clamp_total
-        
-        final_scores[anchor_name] += final_diff / anchor_weight
-        final_scores[anchor_name] = self._clamp(final_scores[anchor_name], max_allowed_score)
-        
-        # ===== 验证总分一致性并强制修正 =====
-        calculated_total = sum(final_scores[k] * structure[k]['weight'] for k in final_scores)
-        deviation = abs(calculated_total - student_total_score)
-        
-        # 偏差超过0.5分时，启用强制均匀分配策略
-        if deviation > 0.5:
-            # 尝试二次锚点修正（使用第二大权重的项）
-            if len(sorted_items) > 1:
-                second_anchor_name = sorted_items[1][0]
-                second_anchor_weight = sorted_items[1][1]['weight']
-                remaining_diff = student_total_score - calculated_total
-                final_scores[second_anchor_name] += remaining_diff / second_anchor_weight
-                final_scores[second_anchor_name] = self._clamp(final_scores[second_anchor_name], max_allowed_score)
-            
-            # 再次验证
-            calculated_total = sum(final_scores[k] * structure[k]['weight'] for k in final_scores)
-            deviation = abs(calculated_total - student_total_score)
-            
-            # 如果仍有较大偏差，强制所有分项等于总分（保底策略）
-            if deviation > 1.0:
-                return {name: round(student_total_score, 1) for name in structure.keys()}
-        
-        return {k: round(v, 1) for k, v in final_scores.items()}
+        # 第三步：精确投影到 {加权和 = 总分, 0 ≤ 分数 ≤ 上限}
+        names = list(draft_scores.keys())
+        draft = np.array([[draft_scores[k] for k in names]], dtype=float)
+        weights = np.array([structure[k]['weight'] for k in names], dtype=float)
+        totals = np.array([student_total_score])
+        final = self.project_to_weighted_total(draft, weights, totals, max_allowed_score)
+        if score_step:
+            final = self.quantize_to_grid(final, weights, totals, score_step, max_allowed_score)
+
+        return {k: round(float(v), 1) for k, v in zip(names, final[0])}
+
+    def compile_plan(self,
+                     structure: Dict[str, Dict],
+                     noise_config: Dict = None,
+                     spread_mode: str = 'medium') -> "BreakdownPlan":
+        """
+        编译某一环节的分解计划（同一环节内所有学生共用）
+        按 (structure, noise_config, spread_mode) 的哈希缓存，重复导出时直接复用。
+        """
+        if noise_config is None:
+            noise_config = {
+                'noise_ratio': 0.0,
+                'severity_mode': 'random',
+                'allowed_items': []
+            }
+        key = hashlib.sha1(json.dumps(
+            [structure, noise_config, spread_mode], sort_keys=True, ensure_ascii=False, default=str
+        ).encode('utf-8')).hexdigest()
+        plan = _PLAN_CACHE.get(key)
+        if plan is None:
+            plan = BreakdownPlan(
+                structure, noise_config, spread_mode,
+                scales=[self._get_scale_from_spread_mode(md) for md in SPREAD_MODES],
+                strengths=[self._get_strength_from_spread_mode(md) for md in SPREAD_MODES],
+            )
+            _PLAN_CACHE[key] = plan
+            while len(_PLAN_CACHE) > _PLAN_CACHE_SIZE:
+                _PLAN_CACHE.popitem(last=False)
+        else:
+            _PLAN_CACHE.move_to_end(key)
+        return plan
+
+    def generate_breakdown_batch(self,
+                                 student_totals: np.ndarray,
+                                 structure,
+                                 noise_config: Dict = None,
+                                 spread_mode: str = 'medium',
+                                 score_step: Optional[float] = None) -> np.ndarray:
+        """
+        批量版 generate_breakdown：一次性为整个班级逆向生成某一环节的各分项
+        :param student_totals: 各学生该环节总分，形状 (n,)
+        :param structure: 方法结构（格式同 generate_breakdown），或已编译的 BreakdownPlan
+        :param noise_config: 噪声配置，格式同 generate_breakdown（传入 plan 时忽略）
+        :param spread_mode: 分数跨度模式 ('large', 'medium', 'small')（传入 plan 时忽略）
+        :param score_step: 分数网格（1、0.5 或 0.1）；None 时保留1位小数
+        :return: 学生×方法 的分数矩阵，形状 (n, m)，列顺序与 structure 的键顺序一致
+        """
+        if isinstance(structure, BreakdownPlan):
+            plan = structure
+        else:
+            plan = self.compile_plan(structure, noise_config, spread_mode)
+
+        def draw(active, t, scale, strength):
+            # 同一分布的列一次性批量生成草稿分数
+            k = t.size
+            draft = np.empty((k, len(plan.names)), dtype=float)
+            for sampler, levels, cols in plan.sampler_groups:
+                draft[:, cols] = sampler(
+                    self, t[:, None], scale[:, None], strength[:, None], levels, (k, cols.size)
+                )
+            return draft
+
+        totals = np.asarray(student_totals, dtype=float).ravel()
+        return self._finish_breakdown(totals, plan, draw, score_step)
+
+    def generate_correlated_breakdown(self,
+                                      link_totals: np.ndarray,
+                                      plans: List["BreakdownPlan"],
+                                      correlation,
+                                      score_step: Optional[float] = None) -> List[np.ndarray]:
+        """
+        相关潜在能力模式：同一学生所有环节、所有方法的分数共同生成
+        全部方法的标准化偏离量服从多元正态 N(0, C)，由一次 Cholesky 批量采样得到，
+        各方法按 草稿 = 环节总分 + scale × 偏离量 生成，之后的噪声注入、精确投影与网格量化
+        与 generate_breakdown_batch 相同。
+        环节总分是固定输入，学生的整体能力已体现在各环节总分中；投影会吸收环节内各方法的
+        共同偏离（所有方法同升同降的分量），只有环节内的相对高低能跨环节保留。
+        标量 ρ 的共同能力因子会被投影全部抵消，因此只接受显式的方法相关矩阵。
+        只有一个方法的环节分数由总分决定，不参与相关。
+        偏离量为正态，仅支持 normal 分布；结构中含其他 dist_type 时报错。
+        :param link_totals: 学生×环节 总分矩阵，形状 (n, L)
+        :param plans: 各环节已编译的 BreakdownPlan，顺序与 link_totals 的列一致
+        :param correlation: (M, M) 方法相关矩阵（M 为所有环节方法数之和，按环节顺序排列）
+        :param score_step: 分数网格（1、0.5 或 0.1）；None 时保留1位小数
+        :return: 各环节的 学生×方法 分数矩阵列表
+        """
+        for plan in plans:
+            if any(sampler is not GradeReverseEngine._sample_normal for sampler, _, _ in plan.sampler_groups):
+                raise ValueError("相关潜在能力模式仅支持正态分布（normal），请改用正态分布或关闭方法相关")
+        link_totals = np.atleast_2d(np.asarray(link_totals, dtype=float))
+        n = link_totals.shape[0]
+        sizes = [len(plan.names) for plan in plans]
+        offsets = np.concatenate([[0], np.cumsum(sizes)]).astype(int)
+        chol = self._correlation_cholesky(correlation, plans)
+
+        # 整班一次采样：Z = E · Lᵀ，行内各方法相关
+        z = self.rng.standard_normal((n, chol.shape[0])) @ chol.T
+
+        results = []
+        noise_rows = []
+        for idx, plan in enumerate(plans):
+            block = z[:, offsets[idx]:offsets[idx + 1]]
+
+            def draw(active, t, scale, strength, block=block):
+                return np.clip(t[:, None] + scale[:, None] * block[active], 0.0, 100.0)
+
+            results.append(self._finish_breakdown(link_totals[:, idx], plan, draw, score_step))
+            noise_rows.append(self.last_noise_rows)
+        self.last_noise_rows_by_link = noise_rows
+        return results
+
+    def _correlation_cholesky(self, correlation, plans: List["BreakdownPlan"]) -> np.ndarray:
+        """校验方法相关矩阵（对称、对角线为1、正定）并做 Cholesky 分解"""
+        size = sum(len(plan.names) for plan in plans)
+        if np.ndim(correlation) != 2:
+            raise ValueError("方法相关需为方法相关矩阵：环节总分固定，标量相关系数的共同因子会被环节内投影抵消")
+        matrix = np.asarray(correlation, dtype=float)
+        if matrix.shape != (size, size):
+            raise ValueError(f"方法相关矩阵形状应为 ({size}, {size})，实际为 {matrix.shape}")
+        if not np.allclose(matrix, matrix.T) or not np.allclose(np.diag(matrix), 1.0):
+            raise ValueError("方法相关矩阵必须对称且对角线为1")
+        try:
+            return np.linalg.cholesky(matrix)
+        except np.linalg.LinAlgError:
+            raise ValueError("方法相关矩阵必须是对称正定矩阵")
+
+    def _finish_breakdown(self, totals: np.ndarray, plan: "BreakdownPlan", draw, score_step: Optional[float]) -> np.ndarray:
+        """
+        批量分解的公共流程：极端分数、跨度收窄、草稿（由 draw 生成）、噪声、投影、量化
+        :param draw: draw(active, t, scale, strength) -> 草稿矩阵 (k, m)
+        """
+        n, m = totals.size, len(plan.names)
+        result = np.empty((n, m), dtype=float)
+
+        # ===== 极端分数直接返回（与单个学生逻辑一致） =====
+        extreme = (totals <= 2) | (totals >= 98)
+        result[extreme] = self._round_to_grid(totals[extreme], score_step)[:, None]
+        active = ~extreme
+        self.last_noise_rows = np.zeros(0, dtype=int)
+        if not active.any():
+            return result
+
+        t = totals[active]
+        k = t.size
+        max_allowed = np.where(t >= 99, 100.0, 99.0)
+        scale, strength = plan.spread_params(t)
+
+        # 第一步：生成草稿分数
+        draft = draw(active, t, scale, strength)
+
+        # 第二步：按精确配额注入智能噪声（高分学生跳过）
+        rows, cols = self.apply_noise_batch(
+            draft, t < 85, plan.allowed_mask, plan.noise_ratio, plan.severity_mode, plan.severity_range
+        )
+        self.last_noise_rows = np.flatnonzero(active)[rows]
+        if score_step:
+            # 固定的不及格分数先落到网格上（仍低于60），否则量化时其上下界为空、整行无解
+            pinned = np.round(draft[rows, cols] / score_step) * score_step
+            pinned = np.where(pinned >= 60, pinned - score_step, pinned)
+            draft[rows, cols] = np.clip(pinned, 0.0, None)
+
+        # 第三步：精确投影到 {加权和 = 总分, 0 ≤ 分数 ≤ 上限}
+        # 被注入的不及格分数固定不动，由其余分项补足总分
+        lower = np.zeros((k, m))
+        upper = np.repeat(max_allowed[:, None], m, axis=1)
+        lower[rows, cols] = upper[rows, cols] = draft[rows, cols]
+        final = self.project_to_weighted_total(draft, plan.weights, t, upper, lower)
+        # 其余分项无法补足时（噪声项权重过大），该生放开固定重新投影
+        missed = np.abs(final @ plan.weights - t) > 1e-6
+        if missed.any():
+            lower[missed] = 0.0
+            upper[missed] = max_allowed[missed][:, None]
+            final[missed] = self.project_to_weighted_total(
+                draft[missed], plan.weights, t[missed], upper[missed], lower[missed]
+            )
+
+        if score_step:
+            final = self.quantize_to_grid(final, plan.weights, t, score_step, upper, lower)
+            # 固定噪声后网格上凑不出总分的学生，放开固定重新投影并量化（仅在更接近总分时采用）
+            dev = np.abs(final @ plan.weights - t)
+            retry = np.flatnonzero((dev > 0.05 + 1e-9) & (lower > 0).any(axis=1))
+            if retry.size:
+                refit = self.project_to_weighted_total(
+                    draft[retry], plan.weights, t[retry], max_allowed[retry], 0.0
+                )
+                refit = self.quantize_to_grid(refit, plan.weights, t[retry], score_step, max_allowed[retry])
+                closer = np.abs(refit @ plan.weights - t[retry]) < dev[retry] - 1e-9
+                final[retry[closer]] = refit[closer]
+        result[active] = np.round(final, 1)
+        return result
+
+    def quantize_to_grid(self,
+                         scores: np.ndarray,
+                         weights: np.ndarray,
+                         totals: np.ndarray,
+                         step: float,
+                         upper,
+                         lower=0.0,
+                         tolerance: float = 0.05,
+                         max_passes: Optional[int] = None) -> np.ndarray:
+        """
+        将连续分数量化到 step 网格（整数 / 0.5 / 0.1 分），并修复加权和
+        1. 贪心：全部向下取整，再按小数部分从大到小逐个上调一格，取最接近总分的前缀；
+        2. 修复：对仍超出 tolerance 的学生，逐轮尝试「某项 +1 格 / 某项 -1 格 / 一升一降」
+           中最能缩小偏差的一步，最多 max_passes 轮（默认 2m+8）；
+        3. 兜底：仍超差的学生逐行做有界背包（权重化为整数、各项限定在 [lo, hi] 格内），
+           网格上存在 tolerance 内的组合时必定找到。
+        前两步每轮 O(m²)、整班向量化。tolerance 默认 0.05，即总分按1位小数舍入后一致；
+        网格过粗而无法精确命中时，返回偏差最小的结果。
+        :param scores: 已满足加权和的连续分数，形状 (n, m)
+        :param upper: 分数上限，标量、形状 (n,) 或逐分项 (n, m)；lower 同理
+        :return: 网格上的分数矩阵，形状 (n, m)
+        """
+        x = np.atleast_2d(np.asarray(scores, dtype=float))
+        n, m = x.shape
+        w = np.asarray(weights, dtype=float)
+        totals = np.asarray(totals, dtype=float).ravel()
+        if m == 0 or n == 0:
+            return x.copy()
+        eps = 1e-9
+        lo = np.ceil(self._broadcast_bound(lower, n, m) / step - eps)
+        hi = np.floor(self._broadcast_bound(upper, n, m) / step + eps)
+
+        # 以「格数」为单位计算，最后再乘回 step
+        units = x / step
+        q = np.clip(np.floor(units + eps), lo, hi)
+        frac = units - q
+
+        # 第一步：贪心上调小数部分最大的若干项
+        order = np.argsort(-frac, axis=1, kind='stable')
+        rows = np.arange(n)[:, None]
+        can_up = np.take_along_axis(q, order, axis=1) + 1 <= np.take_along_axis(hi, order, axis=1)
+        gain = np.where(can_up, w[order] * step, 0.0)
+        cum = np.concatenate([np.zeros((n, 1)), np.cumsum(gain, axis=1)], axis=1)
+        residual = totals - (q @ w) * step
+        best_k = np.abs(residual[:, None] - cum).argmin(axis=1)
+        bump = (np.arange(m)[None, :] < best_k[:, None]) & can_up
+        q[rows, order] += bump
+
+        # 第二步：一升一降的成对修复（下标 m 表示“不动”）
+        move = np.append(w * step, 0.0)
+        delta = move[:, None] - move[None, :]
+        same = np.eye(m + 1, dtype=bool)
+        same[m, m] = False
+        passes = max_passes if max_passes is not None else 2 * m + 8
+        dev = totals - (q @ w) * step
+        active = np.flatnonzero(np.abs(dev) > tolerance)
+        for _ in range(passes):
+            if active.size == 0:
+                break
+            qa = q[active]
+            up_ok = np.concatenate([qa + 1 <= hi[active], np.ones((active.size, 1), bool)], axis=1)
+            dn_ok = np.concatenate([qa - 1 >= lo[active], np.ones((active.size, 1), bool)], axis=1)
+            err = np.abs(dev[active][:, None, None] - delta[None])
+            err[~(up_ok[:, :, None] & dn_ok[:, None, :]) | same[None]] = np.inf
+            flat = err.reshape(active.size, -1).argmin(axis=1)
+            improved = err.reshape(active.size, -1)[np.arange(active.size), flat] < np.abs(dev[active]) - eps
+            up_idx, dn_idx = np.divmod(flat, m + 1)
+            sel = active[improved]
+            up_sel, dn_sel = up_idx[improved], dn_idx[improved]
+            real_up = up_sel < m
+            real_dn = dn_sel < m
+            q[sel[real_up], up_sel[real_up]] += 1
+            q[sel[real_dn], dn_sel[real_dn]] -= 1
+            dev[sel] = totals[sel] - (q[sel] @ w) * step
+            active = sel[np.abs(dev[sel]) > tolerance]
+
+        # 第三步：仍超差的学生做有界背包，求网格上最接近总分的组合
+        # 上下限相同的学生共用一张可达表（未注入噪声的学生通常同属一组）
+        active = np.flatnonzero(np.abs(dev) > tolerance)
+        if active.size:
+            int_w, scale = self._integer_weights(w, step)
+            bounds = np.concatenate([lo[active], hi[active]], axis=1)
+            _, group = np.unique(bounds, axis=0, return_inverse=True)
+            for g in range(group.max() + 1):
+                sel = active[group.ravel() == g]
+                cand = self._knapsack_to_total(q[sel], int_w, scale, lo[sel[0]], hi[sel[0]], totals[sel] / step)
+                if cand is None:
+                    continue
+                new_dev = totals[sel] - (cand @ w) * step
+                better = np.abs(new_dev) < np.abs(dev[sel]) - eps
+                q[sel[better]] = cand[better]
+                dev[sel[better]] = new_dev[better]
+
+        return q * step
+
+    def _integer_weights(self, weights: np.ndarray, step: float):
+        """
+        权重化为整数比例：各权重取分母不超过 1000 的最简分数，按公分母放大
+        公分母使状态数（公分母 × 满分格数）过大时，改为按允许的最大倍数取整（结果仍按原权重复核）
+        :return: (整数权重, 放大倍数)
+        """
+        fractions = [Fraction(float(v)).limit_denominator(1000) for v in weights]
+        scale = 1
+        for frac in fractions:
+            scale = scale * frac.denominator // gcd(scale, frac.denominator)
+        exact = all(abs(float(frac) - float(v)) < 1e-9 for frac, v in zip(fractions, weights))
+        limit = max(1, int(_KNAPSACK_STATES * step / 100))
+        if not exact or scale > limit:
+            scale = limit
+        return np.maximum(np.round(np.asarray(weights, dtype=float) * scale), 0).astype(np.int64), scale
+
+    def _knapsack_to_total(self, q, int_w, scale, lo, hi, target_units):
+        """
+        有界背包：在 lo ≤ 格数 ≤ hi 内求整数加权和最接近各学生 target 的组合（同一组上下限，逐学生目标）
+        可达表按超出下限的部分计数，一次构造后整组查找；回溯时每项取可行格数中离当前 q 最近的，
+        尽量少改动原有分数
+        :param q: 当前格数，形状 (k, m)
+        :param target_units: 各学生总分（格数单位），形状 (k,)
+        :return: 新的格数矩阵 (k, m)；上下限无解时返回 None
+        """
+        lo = lo.astype(np.int64)
+        hi = hi.astype(np.int64)
+        if (hi < lo).any():
+            return None
+        count = hi - lo
+        limit = int(int_w @ count)
+
+        # reach[i][s]：前 i 项可凑出部分和 s
+        reach = [np.zeros(limit + 1, dtype=bool)]
+        reach[0][0] = True
+        for weight, c in zip(int_w, count):
+            prev = reach[-1]
+            if weight == 0 or c == 0:
+                reach.append(prev)
+                continue
+            # 按 s mod weight 分组做滑动窗口：new[s] = prev[s - j·weight] 对 j ∈ [0, c] 取或
+            width = -(-(limit + 1) // weight) * weight
+            grid = np.zeros(width, dtype=np.int64)
+            grid[:limit + 1] = prev
+            cum = np.cumsum(grid.reshape(-1, weight), axis=0)
+            window = cum.copy()
+            window[c + 1:] -= cum[:-(c + 1)]
+            reach.append((window.reshape(-1) > 0)[:limit + 1])
+
+        # 各学生最接近目标的可达和
+        sums = np.flatnonzero(reach[-1])
+        goal = target_units * scale - int(int_w @ lo)
+        pos = np.clip(np.searchsorted(sums, goal), 1, sums.size - 1) if sums.size > 1 else np.zeros(goal.size, int)
+        left, right = sums[pos - 1 if sums.size > 1 else pos], sums[pos]
+        s_best = np.where(np.abs(left - goal) <= np.abs(right - goal), left, right)
+
+        # 回溯按行分块，候选矩阵 (块行数, 格数+1) 不超过约 400 万个元素
+        result = np.empty(q.shape, dtype=float)
+        chunk = max(1, 4_000_000 // (int(count.max()) + 1))
+        for start in range(0, q.shape[0], chunk):
+            part = slice(start, start + chunk)
+            s_part = s_best[part]
+            for i in range(len(int_w) - 1, -1, -1):
+                weight = int(int_w[i])
+                j = np.arange(int(count[i]) + 1)
+                idx = s_part[:, None] - j[None, :] * weight
+                ok = idx >= 0
+                ok[ok] = reach[i][idx[ok]]
+                cost = np.where(ok, np.abs(lo[i] + j[None, :] - q[part, i:i + 1]), np.inf)
+                pick = cost.argmin(axis=1)
+                result[part, i] = lo[i] + pick
+                s_part = s_part - pick * weight
+        return result
+
+    def _round_to_grid(self, value, step: Optional[float]):
+        """极端分数的取整：有网格时取最近网格点，否则保留1位小数"""
+        if not step:
+            return np.round(value, 1)
+        return np.round(np.round(np.asarray(value, dtype=float) / step) * step, 1)
+
+    def apply_noise_batch(self,
+                          scores: np.ndarray,
+                          eligible: np.ndarray,
+                          allowed_mask: np.ndarray,
+                          noise_ratio: float,
+                          severity_mode: str = 'random',
+                          severity_range: Optional[tuple] = None):
+        """
+        整班噪声注入（精确配额，原地修改 scores）
+        :param scores: 学生×方法 分数矩阵，形状 (n, m)，就地写入不及格分数
+        :param eligible: 可被注入的学生掩码，形状 (n,)
+        :param allowed_mask: 允许注入的方法掩码，形状 (m,) 或逐学生 (n, m)
+        :param noise_ratio: 注入比例，恰好选中 round(noise_ratio × 合格人数) 名学生
+        :param severity_mode: 'random'(40-59), 'near_miss'(55-59), 'catastrophic'(0-40)
+        :param severity_range: 不及格分数区间 (low, high)，通常取 BreakdownPlan.severity_range；None 时按 severity_mode 查表
+        :return: (rows, cols) 被注入的学生行号与方法列号
+        """
+        n, m = scores.shape
+        mask = np.broadcast_to(np.asarray(allowed_mask, dtype=bool), (n, m))
+        candidates = np.flatnonzero(np.asarray(eligible, dtype=bool) & mask.any(axis=1))
+        quota = int(round(float(noise_ratio or 0.0) * candidates.size))
+        if quota <= 0:
+            empty = np.zeros(0, dtype=int)
+            return empty, empty
+
+        # 控制1：一次置换选出恰好 quota 名学生
+        rows = np.sort(self.rng.permutation(candidates)[:quota])
+
+        # 控制3：在允许的方法中做掩码类别抽样（均匀）
+        row_mask = mask[rows]
+        pick = (self.rng.random(quota) * row_mask.sum(axis=1)).astype(int)
+        cols = (np.cumsum(row_mask, axis=1) > pick[:, None]).argmax(axis=1)
+
+        # 控制2：按严重程度生成不及格分数（保留1位小数）
+        if severity_range is None:
+            severity_range = BreakdownPlan._SEVERITY_RANGES.get(severity_mode, (40, 59.9))
+        low, high = severity_range
+        scores[rows, cols] = np.round(self.rng.uniform(low, high, size=quota), 1)
+        return rows, cols
+
+    # 批量采样器：按列组生成草稿分数，由 BreakdownPlan 按 dist_type 预先绑定
+    def _sample_normal(self, t, scale, strength, levels, size):
+        return self.dist_normal(t, scale=scale, size=size)
+
+    def _sample_left_skewed(self, t, scale, strength, levels, size):
+        return self.dist_left_skewed(t, strength=strength, size=size)
+
+    def _sample_right_skewed(self, t, scale, strength, levels, size):
+        return self.dist_right_skewed(t, strength=strength, size=size)
+
+    def _sample_bimodal(self, t, scale, strength, levels, size):
+        return self.dist_bimodal(target_mean=t, scale=scale, size=size)
+
+    def _sample_discrete(self, t, scale, strength, levels, size):
+        return self.dist_discrete(target_mean=t, levels=levels, size=size)
+
+    def project_to_weighted_total(self,
+                                  draft: np.ndarray,
+                                  weights: np.ndarray,
+                                  totals: np.ndarray,
+                                  upper,
+                                  lower=0.0) -> np.ndarray:
+        """
+        将草稿分数投影到 {加权和 = 总分, lower ≤ 分数 ≤ upper} 上（按权重加权的欧氏投影）
+        结果形如 clip(draft + λ, lower, upper)，λ 按行求出，使加权和恰好等于总分。
+        加权和关于 λ 是分段线性单调函数，按断点排序后用前缀和定位所在线段，
+        每行 O(m log m)，整班一次完成。
+        :param draft: 草稿分数，形状 (n, m)
+        :param weights: 方法权重，形状 (m,)
+        :param totals: 目标加权和，形状 (n,)
+        :param upper: 分数上限，标量、形状 (n,) 或逐分项 (n, m)
+        :param lower: 分数下限，标量、形状 (n,) 或逐分项 (n, m)
+        :return: 投影后的分数矩阵，形状 (n, m)
+        """
+        x = np.atleast_2d(np.asarray(draft, dtype=float))
+        n, m = x.shape
+        w = np.asarray(weights, dtype=float)
+        totals = np.asarray(totals, dtype=float).ravel()
+        lo = self._broadcast_bound(lower, n, m)
+        hi = self._broadcast_bound(upper, n, m)
+        if m == 0:
+            return x.copy()
+
+        # 断点：分项进入 (lo - x) / 离开 (hi - x) 可调区间，对应斜率 +w / -w
+        breakpoints = np.concatenate([lo - x, hi - x], axis=1)
+        slope_delta = np.concatenate([np.broadcast_to(w, (n, m)), np.broadcast_to(-w, (n, m))], axis=1)
+        order = np.argsort(breakpoints, axis=1, kind='stable')
+        bp = np.take_along_axis(breakpoints, order, axis=1)
+        slope = np.cumsum(np.take_along_axis(slope_delta, order, axis=1), axis=1)
+
+        # 各断点处的加权和；最左断点处所有分项都在下限
+        f = np.empty_like(bp)
+        f[:, 0] = lo @ w
+        f[:, 1:] = f[:, :1] + np.cumsum(np.diff(bp, axis=1) * slope[:, :-1], axis=1)
+
+        # 目标超出可行范围时取最近的端点
+        target = np.clip(totals, f[:, 0], f[:, -1])
+        k = np.clip((f <= target[:, None]).sum(axis=1) - 1, 0, 2 * m - 2)
+        rows = np.arange(n)
+        seg_slope = slope[rows, k]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            step = np.where(seg_slope > 0, (target - f[rows, k]) / seg_slope, 0.0)
+        lam = bp[rows, k] + step
+        return np.clip(x + lam[:, None], lo, hi)
+
+    def _broadcast_bound(self, bound, n, m):
+        """将上/下限（标量、逐学生或逐分项）展开为 (n, m)"""
+        bound = np.asarray(bound, dtype=float)
+        if bound.ndim == 1:
+            bound = bound[:, None]
+        return np.broadcast_to(bound, (n, m))
+
+    def _clamp_scores(self, score, size=None):
+        """采样结果截断到 [0, 100]：标量返回 float，数组返回数组"""
+        if size is None and np.ndim(score) == 0:
+            return self._clamp(float(score))
+        return np.clip(score, 0.0, 100.0)
 
     def _clamp(self, value, max_score=100.0):
         """
@@ -314,4 +797,123 @@ class GradeReverseEngine:
         :param value: 原始分数
         :param max_score: 最大允许分数（默认100）
         """
-        return max(0.0, min(max_score, value))
\ No newline at end of file
+        return max(0.0, min(max_score, value))
+
+
+# 跨度模式顺序：下标越大跨度越大
+SPREAD_MODES = ('small', 'medium', 'large')
+
+# 已编译计划缓存：{结构哈希: BreakdownPlan}，进程内跨导出复用，按最近使用保留至多 _PLAN_CACHE_SIZE 个
+_PLAN_CACHE: "OrderedDict[str, BreakdownPlan]" = OrderedDict()
+_PLAN_CACHE_SIZE = 64
+
+# 网格兜底背包的状态数上限（整数权重放大倍数 × 满分格数）
+_KNAPSACK_STATES = 2_000_000
+
+# 离散档位查找表缓存：{档位元组: (档位, 区间边界, 累计有效数, 有效数, 无有效档位的桶)}
+_DISCRETE_TABLES: Dict[tuple, tuple] = {}
+
+
+def _discrete_table(levels) -> tuple:
+    """
+    预计算离散档位的有效档位表
+    有效集合只在 档位±15 处变化，把这些边界排序后，区间与边界点各占一个桶：
+    桶号 = searchsorted(left) + searchsorted(right)，偶数为区间，奇数为边界点。
+    """
+    key = tuple(float(lv) for lv in levels)
+    table = _DISCRETE_TABLES.get(key)
+    if table is not None:
+        return table
+
+    level_arr = np.array(key, dtype=float)
+    edges = np.unique(np.concatenate([level_arr - 15, level_arr + 15]))
+    # 各桶的代表点：区间取中点（两端区间向外延伸 1 分），边界点取自身
+    inner = (edges[:-1] + edges[1:]) / 2
+    gaps = np.concatenate([[edges[0] - 1], inner, [edges[-1] + 1]])
+    reps = np.empty(2 * edges.size + 1)
+    reps[0::2] = gaps
+    reps[1::2] = edges
+
+    dist = np.abs(level_arr[None, :] - reps[:, None])
+    valid = dist <= 15
+    # 没有合适档位的桶先占位代表点最近的档位，抽样时再按各目标值改取最接近的档位
+    empty = ~valid.any(axis=1)
+    valid[np.flatnonzero(empty), dist[empty].argmin(axis=1)] = True
+
+    table = (level_arr, edges, np.cumsum(valid, axis=1), valid.sum(axis=1), empty)
+    _DISCRETE_TABLES[key] = table
+    return table
+
+
+class BreakdownPlan:
+    """
+    预编译的环节分解计划 (BreakdownPlan)
+    同一环节的结构对所有学生相同，编译一次后在批量分解中直接使用：
+    权重向量、各列采样器、跨度参数表、噪声白名单掩码以及不及格分数区间。
+    """
+
+    _SAMPLERS = {
+        'normal': GradeReverseEngine._sample_normal,
+        'left_skewed': GradeReverseEngine._sample_left_skewed,
+        'right_skewed': GradeReverseEngine._sample_right_skewed,
+        'bimodal': GradeReverseEngine._sample_bimodal,
+        'discrete': GradeReverseEngine._sample_discrete,
+    }
+
+    _SEVERITY_RANGES = {
+        'near_miss': (55, 59.9),
+        'catastrophic': (0, 40.0),
+    }
+
+    def __init__(self, structure: Dict[str, Dict], noise_config: Dict, spread_mode: str,
+                 scales: List[float], strengths: List[float]):
+        """
+        :param scales: 各跨度模式的标准差，顺序同 SPREAD_MODES
+        :param strengths: 各跨度模式的偏态强度，顺序同 SPREAD_MODES
+        """
+        self.names = list(structure.keys())
+        self.weights = np.array([float(structure[k]['weight']) for k in self.names])
+
+        total_weight = self.weights.sum()
+        if abs(total_weight - 1.0) > 0.01:
+            raise ValueError(f"权重之和不为1 ({total_weight})")
+
+        # 采样器分组：(采样器, 档位, 列下标)，同一分布的列合并为一次数组调用
+        groups = {}
+        for j, name in enumerate(self.names):
+            config = structure[name]
+            dist_type = config.get('type', 'normal')
+            sampler = self._SAMPLERS.get(dist_type, GradeReverseEngine._sample_normal)
+            levels = tuple(config.get('levels') or [60, 70, 80, 85, 90, 95]) if dist_type == 'discrete' else None
+            groups.setdefault((sampler, levels), []).append(j)
+        self.sampler_groups = [
+            (sampler, list(levels) if levels is not None else None, np.array(cols, dtype=int))
+            for (sampler, levels), cols in groups.items()
+        ]
+
+        # 跨度参数表（按 SPREAD_MODES 顺序），未知模式按中跨度处理
+        self.scales = np.array(scales, dtype=float)
+        self.strengths = np.array(strengths, dtype=float)
+        self.spread_index = SPREAD_MODES.index(spread_mode) if spread_mode in SPREAD_MODES else 1
+
+        allowed = noise_config.get('allowed_items')
+        if allowed is None:
+            allowed = self.names
+        self.allowed_mask = np.array([name in allowed for name in self.names], dtype=bool)
+        self.noise_ratio = float(noise_config.get('noise_ratio', 0.0) or 0.0)
+        self.severity_mode = noise_config.get('severity_mode', 'random')
+        self.severity_range = self._SEVERITY_RANGES.get(self.severity_mode, (40, 59.9))
+
+    def spread_params(self, totals: np.ndarray):
+        """
+        按学生总分自动收窄跨度（高分/低分保护），返回逐学生的 (scale, strength)
+        """
+        idx = np.full(totals.size, self.spread_index, dtype=int)
+        is_large = self.spread_index == 2
+        idx[totals >= 95] = 0
+        if is_large:
+            idx[(totals >= 90) & (totals < 95)] = 1
+        idx[totals <= 5] = 0
+        if is_large:
+            idx[(totals > 5) & (totals <= 15)] = 1
+        return self.scales[idx], self.strengths[idx]
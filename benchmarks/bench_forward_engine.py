@@ -0,0 +1,58 @@
+"""
+ForwardCalculator 基准测试：5000 名学生的正向达成度矩阵计算耗时
+
+用法（在项目根目录）：
+    python benchmarks/bench_forward_engine.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core_app.forward_calc import ForwardCalculator, RelationMatrix
+
+
+def _payload(obj_count=4):
+    links = []
+    for name, ratio, methods in [
+        ("平时考核", 0.3, ["作业", "考勤", "实验", "课堂表现"]),
+        ("期中考核", 0.2, ["期中考试"]),
+        ("期末考核", 0.5, ["期末考试", "大作业"]),
+    ]:
+        share = 1 / len(methods)
+        links.append({
+            "name": name,
+            "ratio": ratio,
+            "methods": [
+                {
+                    "name": m,
+                    "subtotal": share,
+                    "supports": {f"课程目标{i+1}": share / obj_count for i in range(obj_count)},
+                }
+                for m in methods
+            ],
+        })
+    return {"objectives_count": obj_count, "links": links}
+
+
+def main():
+    payload = _payload()
+    relation = RelationMatrix(payload)
+    rng = np.random.default_rng(0)
+    for n in (500, 5_000, 50_000):
+        df = pd.DataFrame(rng.integers(40, 101, size=(n, relation.method_count)), columns=relation.method_names)
+        df.insert(0, "姓名", [f"学生{i}" for i in range(n)])
+        best = float("inf")
+        for _ in range(5):
+            start = time.perf_counter()
+            ForwardCalculator(df, relation).run()
+            best = min(best, time.perf_counter() - start)
+        print(f"{n:>7} 名学生: {best * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+generate_initial_scores 基准测试：验证耗时随学生数线性增长
+
+用法（在项目根目录）：
+    python benchmarks/bench_initial_scores.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apply_noise import GradeReverseEngine
+from core_app.excel_calc import ExcelCalcMixin
+
+
+class _Calc(ExcelCalcMixin):
+    def __init__(self, seed=0):
+        self.reverse_engine = GradeReverseEngine(seed)
+
+
+def _best_of(func, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    calc = _Calc()
+    sizes = [1_000, 10_000, 100_000, 1_000_000]
+    print(f"{'n':>10} {'dist':>13} {'耗时(ms)':>10} {'每千人(ms)':>11}")
+    for dist_type in ("normal", "left_skewed", "right_skewed", "uniform"):
+        for n in sizes:
+            elapsed = _best_of(lambda: calc.generate_initial_scores(75, n, 62, 88, dist_type))
+            print(f"{n:>10} {dist_type:>13} {elapsed * 1000:>10.2f} {elapsed * 1e6 / n:>11.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,406 @@
+"""
+命令行成绩处理（无界面，不导入 PyQt6）
+
+用法示例：
+    python cli.py --relation relation.json --input 成绩.xlsx --config config.json --output-dir out/ --mode reverse --seed 123
+    python cli.py --manifest courses.json --output-dir batch_out/ --workers 8
+
+配置文件与界面保存的 config.json 字段一致（course_open_info / course_basic_info / ratios /
+noise_config / previous_achievement_file / course_description / objective_requirements /
+relation_payload），另可包含命令行参数同名的键：mode、spread_mode、distribution、seed、
+score_step、method_correlation（方法相关矩阵，按环节顺序排列全部方法）、course_name、incremental。
+命令行参数优先于配置文件。
+
+批量清单（--manifest）格式：
+    {
+      "output_root": "batch_out",          # 可被 --output-dir 覆盖
+      "seed": 20260101,                    # 批次种子，各课程由此派生独立种子
+      "workers": 8,                        # 可被 --workers 覆盖，缺省为 CPU 核数
+      "defaults": {...},                   # 各课程共用的配置（字段同配置文件）
+      "courses": [
+        {"name": "课程A", "relation": "a_relation.json", "input": "a.xlsx", "config": "a.json",
+         "previous_achievement_file": "...", "mode": "reverse", "spread_mode": "medium",
+         "distribution": "normal", "noise_config": {...}, "seed": 123},
+        ...
+      ]
+    }
+清单中的相对路径相对于清单文件所在目录。每门课程写入 output_root 下独立的子目录，
+汇总写入 output_root/batch_summary.json 与 batch_summary.csv。
+
+退出码：0 成功；1 校验失败（表头、关系表、配置不一致）；2 参数错误；3 处理失败
+"""
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Optional
+
+import numpy as np
+
+EXIT_OK = 0
+EXIT_VALIDATION = 1
+EXIT_USAGE = 2
+EXIT_FAILED = 3
+
+# 清单中可逐门课程覆盖的配置键
+COURSE_KEYS = ("mode", "spread_mode", "distribution", "noise_config", "previous_achievement_file", "seed",
+               "score_step", "method_correlation", "course_name", "incremental")
+
+SPREAD_MODES = ("large", "medium", "small")
+DISTRIBUTIONS = ("normal", "left_skewed", "right_skewed", "bimodal", "discrete", "uniform")
+
+
+class CourseValidationError(ValueError):
+    """课程输入校验失败（配置取值、成绩文件、关系表或表头不一致），对应退出码 1 / 批量状态 invalid"""
+
+
+class TextValue:
+    """替代界面输入控件：提供 .text() 接口"""
+
+    def __init__(self, value=""):
+        self._text = "" if value is None else str(value)
+
+    def text(self):
+        return self._text
+
+
+class ConsoleStatus:
+    """替代界面状态栏：setText 输出到控制台"""
+
+    def __init__(self, prefix: str = ""):
+        self.prefix = prefix
+        self._text = ""
+
+    def setText(self, text):
+        self._text = str(text)
+        print(f"{self.prefix}{self._text}")
+
+    def text(self):
+        return self._text
+
+
+def load_json(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def course_name_from_config(config: dict, input_file: str = "") -> str:
+    """课程名称：course_name → 开课信息 → 基本信息（与界面一致），都没有时取输入文件名"""
+    name = config.get("course_name") or ""
+    for key in ("course_open_info", "course_basic_info"):
+        if not name and isinstance(config.get(key), dict):
+            name = config[key].get("course_name") or ""
+    name = str(name).strip()
+    if not name and input_file:
+        name = os.path.splitext(os.path.basename(input_file))[0]
+    return name or "未命名"
+
+
+def build_processor(relation_payload: dict, input_file: str, config: dict, output_dir: Optional[str] = None,
+                    status_prefix: str = ""):
+    """按关系表与配置构造 GradeProcessor（与界面 start_analysis 的参数映射一致）"""
+    from core import GradeProcessor
+
+    num_objectives = int(relation_payload.get("objectives_count", 0) or 0)
+    weights = [TextValue(1.0 / num_objectives) for _ in range(num_objectives)] if num_objectives > 0 else []
+    ratios = config.get("ratios") or {}
+
+    def ratio(key, default):
+        value = ratios.get(key)
+        return default if value in (None, "") else value
+
+    processor = GradeProcessor(
+        TextValue(course_name_from_config(config, input_file)),
+        TextValue(num_objectives),
+        weights,
+        TextValue(ratio("usual", 0.2)),
+        TextValue(ratio("midterm", 0.3)),
+        TextValue(ratio("final", 0.5)),
+        ConsoleStatus(status_prefix),
+        input_file,
+        course_description=config.get("course_description", ""),
+        objective_requirements=config.get("objective_requirements", []),
+        relation_payload=relation_payload,
+    )
+    processor.set_output_dir(output_dir)
+    if config.get("seed") is not None:
+        processor.set_random_seed(int(config["seed"]))
+    if config.get("noise_config"):
+        processor.set_noise_config(config["noise_config"])
+    if config.get("score_step") is not None:
+        processor.set_score_step(config["score_step"])
+    if config.get("method_correlation") is not None:
+        processor.set_method_correlation(config["method_correlation"])
+    return processor
+
+
+def run_course(relation_payload: dict, input_file: str, config: dict, output_dir: Optional[str] = None,
+               status_prefix: str = "") -> dict:
+    """
+    处理一门课程，返回结果摘要
+    :return: {"course", "mode", "overall", "achievement", "seed", "output_dir", "seconds"}
+    """
+    start = time.perf_counter()
+    mode = config.get("mode", "forward")
+    if mode not in ("forward", "reverse"):
+        raise CourseValidationError(f"mode 只能为 forward 或 reverse：{mode}")
+    spread_mode = config.get("spread_mode", "medium")
+    distribution = config.get("distribution", "normal")
+    if spread_mode not in SPREAD_MODES:
+        raise CourseValidationError(f"spread_mode 只能为 {'/'.join(SPREAD_MODES)}：{spread_mode}")
+    if distribution not in DISTRIBUTIONS:
+        raise CourseValidationError(f"distribution 只能为 {'/'.join(DISTRIBUTIONS)}：{distribution}")
+    if not os.path.exists(input_file):
+        raise CourseValidationError(f"成绩文件不存在：{input_file}")
+    if not (relation_payload or {}).get("links"):
+        raise CourseValidationError("关系表为空，请先导出课程考核与课程目标对应关系表")
+
+    # 配置取值（噪声、步长、方法相关系数等）与表头校验的 ValueError 记为校验失败；
+    # 之后处理中抛出的异常一律记为处理失败
+    try:
+        processor = build_processor(relation_payload, input_file, config, output_dir, status_prefix)
+        # 先只读表头校验，不通过时不读取表体
+        if mode == "forward":
+            processor._validate_forward_headers(input_file)
+        else:
+            processor._validate_reverse_input(input_file)
+    except ValueError as exc:
+        raise CourseValidationError(str(exc)) from exc
+    processor.load_previous_achievement(config.get("previous_achievement_file") or "")
+
+    if mode == "forward":
+        overall = processor.process_forward_grades(spread_mode=spread_mode, distribution=distribution,
+                                                   incremental=bool(config.get("incremental")))
+    else:
+        overall = processor.process_reverse_grades(spread_mode=spread_mode, distribution=distribution)
+
+    return {
+        "course": processor.course_name_input.text(),
+        "mode": mode,
+        "overall": overall,
+        "achievement": dict(getattr(processor, "current_achievement", {}) or {}),
+        "seed": processor.reverse_engine.seed,
+        "output_dir": processor._get_output_dir(),
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+# ---------- 批量处理 ----------
+def _resolve(path, base_dir: str):
+    if not path:
+        return path
+    return path if os.path.isabs(path) else os.path.normpath(os.path.join(base_dir, path))
+
+
+def _course_dir_name(index: int, name: str) -> str:
+    safe = re.sub(r'[\\/:*"<>|?\r\n\t]', "_", str(name)).strip() or "未命名"
+    return f"{index + 1:03d}_{safe}"
+
+
+def derive_course_seeds(batch_seed: Optional[int], count: int) -> List[int]:
+    """
+    由批次种子为每门课程派生独立种子（SeedSequence.spawn，互不重叠）；
+    派生结果为普通整数，单门课程可用 cli.py --seed 原样复现
+    """
+    children = np.random.SeedSequence(batch_seed).spawn(count)
+    return [int.from_bytes(child.generate_state(2, np.uint64).tobytes(), "little") for child in children]
+
+
+def load_manifest(manifest_path: str, output_root: Optional[str] = None, manifest: Optional[dict] = None) -> List[dict]:
+    """
+    读取批量清单，展开为各课程的运行参数（路径已解析，种子与输出目录已分配）
+    :param manifest: 已读取的清单内容；为空时从 manifest_path 读取（相对路径仍相对于清单文件所在目录）
+    :return: [{"index", "name", "relation_payload", "input", "config", "output_dir"}, ...]
+    """
+    if manifest is None:
+        manifest = load_json(manifest_path)
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    root = output_root or _resolve(manifest.get("output_root") or "batch_outputs", base_dir)
+    courses = manifest.get("courses") or []
+    if not courses:
+        raise ValueError("批量清单中没有课程")
+    seeds = derive_course_seeds(manifest.get("seed"), len(courses))
+    defaults = manifest.get("defaults") or {}
+
+    entries = []
+    for index, course in enumerate(courses):
+        config = dict(defaults)
+        if course.get("config"):
+            config.update(load_json(_resolve(course["config"], base_dir)))
+        for key in COURSE_KEYS:
+            if course.get(key) is not None:
+                config[key] = course[key]
+        if course.get("name") and not config.get("course_name"):
+            config["course_name"] = course["name"]
+        if config.get("previous_achievement_file"):
+            config["previous_achievement_file"] = _resolve(config["previous_achievement_file"], base_dir)
+        if config.get("seed") is None:
+            config["seed"] = seeds[index]
+
+        input_file = _resolve(course.get("input") or "", base_dir)
+        relation_payload = (load_json(_resolve(course["relation"], base_dir)) if course.get("relation")
+                            else config.get("relation_payload") or {})
+        name = course_name_from_config(config, input_file)
+        entries.append({
+            "index": index,
+            "name": name,
+            "relation_payload": relation_payload,
+            "input": input_file,
+            "config": config,
+            "output_dir": os.path.join(root, _course_dir_name(index, name)),
+        })
+    return entries
+
+
+def _run_batch_entry(entry: dict) -> dict:
+    """工作进程入口：处理一门课程，异常转为结果记录（不中断整个批次）"""
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    record = {"index": entry["index"], "course": entry["name"], "mode": entry["config"].get("mode", "forward"),
+              "output_dir": entry["output_dir"], "seed": entry["config"].get("seed")}
+    try:
+        summary = run_course(entry["relation_payload"], entry["input"], entry["config"], entry["output_dir"],
+                             status_prefix=f"[{entry['name']}] ")
+        record.update(summary)
+        record["status"] = "ok"
+    except CourseValidationError as exc:
+        record.update(status="invalid", error=str(exc))
+    except Exception as exc:
+        record.update(status="failed", error=f"{type(exc).__name__}: {exc}")
+    record.setdefault("seconds", round(time.perf_counter() - start, 3))
+    # 本进程处理该课程消耗的 CPU 时间（工作进程逐门课程串行处理，差值即该课程的 CPU 时间）
+    record["cpu_seconds"] = round(time.process_time() - cpu_start, 3)
+    return record
+
+
+def run_batch(entries: List[dict], workers: Optional[int] = None) -> List[dict]:
+    """多进程并行处理各课程，按清单顺序返回结果记录"""
+    workers = max(1, min(workers or os.cpu_count() or 1, len(entries)))
+    if workers == 1:
+        return [_run_batch_entry(entry) for entry in entries]
+
+    records = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_run_batch_entry, entry) for entry in entries]
+        for future in as_completed(futures):
+            record = future.result()
+            print(f"[批量] {record['course']}: {record['status']} ({record['seconds']}s)")
+            records.append(record)
+    return sorted(records, key=lambda r: r["index"])
+
+
+def write_batch_summary(records: List[dict], output_root: str, wall_seconds: float) -> str:
+    """汇总各课程总达成度与耗时，写出 batch_summary.json / batch_summary.csv"""
+    os.makedirs(output_root, exist_ok=True)
+    summary = {
+        "courses": len(records),
+        "ok": sum(r["status"] == "ok" for r in records),
+        "wall_seconds": round(wall_seconds, 3),
+        "cpu_seconds": round(sum(r.get("cpu_seconds", 0) for r in records), 3),
+        "results": records,
+    }
+    json_path = os.path.join(output_root, "batch_summary.json")
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+
+    with open(os.path.join(output_root, "batch_summary.csv"), "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.writer(f)
+        writer.writerow(["序号", "课程", "模式", "状态", "课程总评平均分", "总达成度", "耗时(秒)", "CPU(秒)", "种子", "输出目录", "错误"])
+        for r in records:
+            writer.writerow([
+                r["index"] + 1, r["course"], r.get("mode", ""), r["status"], r.get("overall", ""),
+                (r.get("achievement") or {}).get("总达成度", ""), r.get("seconds", ""), r.get("cpu_seconds", ""), r.get("seed", ""),
+                r["output_dir"], r.get("error", ""),
+            ])
+    return json_path
+
+
+def main_batch(manifest_path: str, output_root: Optional[str] = None, workers: Optional[int] = None) -> int:
+    start = time.perf_counter()
+    try:
+        manifest = load_json(manifest_path)
+        entries = load_manifest(manifest_path, output_root, manifest)
+    except (OSError, ValueError) as exc:
+        print(f"读取批量清单失败：{exc}", file=sys.stderr)
+        return EXIT_USAGE
+
+    root = os.path.dirname(entries[0]["output_dir"])
+    records = run_batch(entries, workers or manifest.get("workers"))
+    summary_path = write_batch_summary(records, root, time.perf_counter() - start)
+
+    for r in records:
+        total = (r.get("achievement") or {}).get("总达成度", "")
+        print(f"{r['index'] + 1:>3} {r['course']}  {r['status']}  总达成度={total}  {r.get('seconds')}s"
+              + (f"  {r['error']}" if r.get("error") else ""))
+    print(f"汇总：{summary_path}")
+
+    if any(r["status"] == "failed" for r in records):
+        return EXIT_FAILED
+    if any(r["status"] == "invalid" for r in records):
+        return EXIT_VALIDATION
+    return EXIT_OK
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="课程目标达成度计算（命令行，无界面）")
+    parser.add_argument("--relation", help="关系表 JSON（导出的课程考核与课程目标对应关系）；缺省时取配置文件中的 relation_payload")
+    parser.add_argument("--input", help="成绩文件（.xlsx / .csv / .parquet）")
+    parser.add_argument("--manifest", help="批量清单 JSON（多门课程并行处理，见模块说明）")
+    parser.add_argument("--workers", type=int, help="批量处理的进程数，缺省为 CPU 核数")
+    parser.add_argument("--config", help="配置 JSON（与界面 config.json 字段一致）")
+    parser.add_argument("--output-dir", help="输出目录；缺省为应用根目录下的 outputs（批量时为各课程子目录的根目录）")
+    parser.add_argument("--mode", choices=("forward", "reverse"), help="正向 / 逆向（缺省取配置，再缺省为 forward）")
+    parser.add_argument("--spread", choices=SPREAD_MODES, dest="spread_mode", help="逆向分数跨度")
+    parser.add_argument("--distribution", choices=DISTRIBUTIONS, help="逆向分数分布")
+    parser.add_argument("--seed", type=int, help="运行种子（逆向结果可按种子复现）")
+    parser.add_argument("--previous", dest="previous_achievement_file", help="上一轮达成度表")
+    parser.add_argument("--course-name", dest="course_name", help="课程名称（用于输出文件名）")
+    parser.add_argument("--incremental", action="store_true", default=None,
+                        help="正向模式：与上次导出比对，只重算并修补成绩有变化的学生")
+    return parser
+
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit as exc:
+        return EXIT_OK if exc.code == 0 else EXIT_USAGE
+
+    if args.manifest:
+        return main_batch(args.manifest, args.output_dir, args.workers)
+    if not args.input:
+        print("缺少 --input（或使用 --manifest 批量处理）", file=sys.stderr)
+        return EXIT_USAGE
+
+    try:
+        config = load_json(args.config) if args.config else {}
+        relation_payload = load_json(args.relation) if args.relation else config.get("relation_payload") or {}
+    except (OSError, ValueError) as exc:
+        print(f"读取配置失败：{exc}", file=sys.stderr)
+        return EXIT_USAGE
+
+    for key in ("mode", "spread_mode", "distribution", "seed", "previous_achievement_file", "course_name", "incremental"):
+        value = getattr(args, key)
+        if value is not None:
+            config[key] = value
+
+    try:
+        summary = run_course(relation_payload, args.input, config, args.output_dir)
+    except CourseValidationError as exc:
+        print(f"校验失败：{exc}", file=sys.stderr)
+        return EXIT_VALIDATION
+    except Exception as exc:
+        print(f"处理失败：{exc}", file=sys.stderr)
+        return EXIT_FAILED
+
+    print(json.dumps(summary, ensure_ascii=False))
+    return EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -13,35 +13,10 @@ from utils import normalize_score, get_grade_level, calculate_final_score, calcu
 import time
 import random
 from docx import Document
-from docx.shared import Pt, Cm
-from docx.oxml import OxmlElement
-from docx.oxml.ns import qn
-from docx.enum.table import WD_TABLE_ALIGNMENT, WD_ALIGN_VERTICAL, WD_ROW_HEIGHT_RULE
-from docx.enum.text import WD_ALIGN_PARAGRAPH
+from io_app.docx_tables import DocxTable
 from pathlib import Path
 
 class AIReportMixin:
-        def _set_cell_border(self, cell, size=4, color='000000'):
-            tc = cell._tc
-            tcPr = tc.get_or_add_tcPr()
-            tcBorders = tcPr.find(qn('w:tcBorders'))
-            if tcBorders is None:
-                tcBorders = OxmlElement('w:tcBorders')
-                tcPr.append(tcBorders)
-            for edge in ('top', 'left', 'bottom', 'right'):
-                elem = tcBorders.find(qn(f'w:{edge}'))
-                if elem is None:
-                    elem = OxmlElement(f'w:{edge}')
-                    tcBorders.append(elem)
-                if size:
-                    elem.set(qn('w:val'), 'single')
-                    elem.set(qn('w:sz'), str(size))
-                    elem.set(qn('w:space'), '0')
-                    elem.set(qn('w:color'), color)
-                else:
-                    elem.set(qn('w:val'), 'nil')
-
-
         def test_deepseek_api(self, api_key: str) -> str:
             """测试 DeepSeek API 连接"""
             url = "https://api.deepseek.com/v1/chat/completions"
@@ -219,7 +194,7 @@ class AIReportMixin:
                 raise ValueError(f"\u52a0\u8f7d\u4e0a\u4e00\u5b66\u5e74\u8fbe\u6210\u5ea6\u8868\u5931\u8d25: {str(e)}")
 
         def generate_improvement_report(self, answers: list[str] | None, output_dir: str | None = None) -> str:
-            base_dir = Path(output_dir) if output_dir else Path(get_outputs_dir())
+            base_dir = Path(output_dir) if output_dir else Path(self._get_output_dir())
             base_dir.mkdir(parents=True, exist_ok=True)
 
             course_name = getattr(self, 'course_name', '')
@@ -260,52 +235,27 @@ class AIReportMixin:
                 rows.append((answers[idx].strip() if idx < len(answers) else '', 'answer'))
                 idx += 1
 
-            doc = Document()
-            table = doc.add_table(rows=len(rows), cols=2)
-            table.autofit = False
-            table.alignment = WD_TABLE_ALIGNMENT.CENTER
-
             total_width_cm = 14.64
             left_col_cm = 1.0
             right_col_cm = total_width_cm - left_col_cm
-            table.columns[0].width = Cm(left_col_cm)
-            table.columns[1].width = Cm(right_col_cm)
+            table = DocxTable([left_col_cm, right_col_cm], border_size=0)
 
-            fixed_size = Pt(15)  # 标题字体
-            answer_size = Pt(14)  # 正文字体
+            fixed_size = 15  # 标题字体
+            answer_size = 14  # 正文字体
 
-            for r_idx, (text, kind) in enumerate(rows):
-                row = table.rows[r_idx]
-                row.cells[0].text = ''
-                p = row.cells[1].paragraphs[0]
-                p.text = ''
-                p.alignment = WD_ALIGN_PARAGRAPH.LEFT
-                pf = p.paragraph_format
-                pf.first_line_indent = None
-                pf.space_before = Pt(0)
-                pf.space_after = Pt(0)
-
-                run = p.add_run(text)
-                run.font.name = '仿宋'
-                run._element.rPr.rFonts.set(qn('w:eastAsia'), '仿宋')
-                if kind == 'answer':
-                    run.font.size = answer_size
-                    run.bold = False
-                elif kind == 'heading':
-                    run.font.size = fixed_size
-                    run.bold = True
-                else:
-                    run.font.size = fixed_size
-                    run.bold = False
-
-                row.cells[0].vertical_alignment = WD_ALIGN_VERTICAL.TOP
-                row.cells[1].vertical_alignment = WD_ALIGN_VERTICAL.TOP
-
-            for row in table.rows:
-                for cell in row.cells:
-                    self._set_cell_border(cell, size=0)
+            for text, kind in rows:
+                table.add_row(
+                    ['', text],
+                    bold=(kind == 'heading'),
+                    align='left',
+                    valign='top',
+                    font_size=answer_size if kind == 'answer' else fixed_size,
+                )
 
+            doc = Document()
+            table.add_to(doc)
             doc.save(output_file)
+            self._register_report_document('{{INSERT_DOC_6}}', doc, output_file)
             return str(output_file)
 
         def store_api_key(self, api_key: str) -> None:
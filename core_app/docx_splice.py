@@ -0,0 +1,203 @@
+"""
+Word 文档拼接：将即将丢弃的源文档正文元素移动（而非深拷贝）到目标文档，
+同时合并被引用的样式、编号定义与关系部件（图片、超链接等），跳过分节属性
+"""
+import io
+import re
+from copy import deepcopy
+
+from docx.opc.constants import CONTENT_TYPE as CT, RELATIONSHIP_TYPE as RT
+from docx.opc.packuri import PackURI
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls, qn
+from docx.parts.image import ImagePart
+from docx.parts.numbering import NumberingPart
+
+
+_NS_R = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_STYLE_REFS = (qn("w:pStyle"), qn("w:rStyle"), qn("w:tblStyle"))
+_STYLE_LINKS = (qn("w:basedOn"), qn("w:next"), qn("w:link"))
+
+
+class DocumentSplicer:
+    """
+    向同一个目标文档依次拼接多个源文档
+    - 样式：目标中已有同名（styleId）样式时沿用目标定义，缺失的样式连同 basedOn/next/link 链一并复制；
+    - 编号：源文档用到的每个编号定义复制为目标中新的 abstractNum/num，并重写 numId；
+    - 关系：图片按内容去重加入目标包，外部链接重新登记，其他内部部件改名后挂到目标文档；
+    - 分节属性（正文末尾及段落内的 sectPr）不插入，版式以模板为准。
+    源文档的正文元素被移出，调用后源文档不应再使用。
+    """
+
+    def __init__(self, target_doc):
+        self.target = target_doc
+        self.target_part = target_doc.part
+        self._target_styles = target_doc.styles.element
+        self._target_numbering = None
+        self._partnames = None
+
+    # ---------- 对外接口 ----------
+    def splice(self, source, anchor):
+        """
+        将源文档正文移动到 anchor 元素之后
+        :param source: python-docx Document，或正文元素列表（无法合并样式与关系时只移动元素）
+        :param anchor: 目标文档中的插入点元素
+        :return: 插入的元素个数
+        """
+        if hasattr(source, "element"):
+            elements = [el for el in source.element.body if el.tag != qn("w:sectPr")]
+        else:
+            source, elements = None, [el for el in source if el.tag != qn("w:sectPr")]
+
+        for el in elements:
+            for sect in el.iter(qn("w:sectPr")):
+                sect.getparent().remove(sect)
+
+        if source is not None:
+            copied_styles = self._merge_styles(source, elements)
+            self._merge_numbering(source, elements + copied_styles)
+            self._merge_relationships(source, elements)
+
+        for el in elements:
+            anchor.addnext(el)
+            anchor = el
+        return len(elements)
+
+    # ---------- 样式 ----------
+    def _merge_styles(self, source, elements):
+        """复制目标中缺失的被引用样式，返回新复制的样式元素"""
+        existing = {s.get(qn("w:styleId")) for s in self._target_styles.iterchildren(qn("w:style"))}
+        source_styles = {s.get(qn("w:styleId")): s for s in source.styles.element.iterchildren(qn("w:style"))}
+
+        pending = []
+        for el in elements:
+            for ref in el.iter(*_STYLE_REFS):
+                pending.append(ref.get(qn("w:val")))
+
+        copied = []
+        while pending:
+            style_id = pending.pop()
+            if style_id in existing or style_id not in source_styles:
+                continue
+            style = deepcopy(source_styles[style_id])
+            self._target_styles.append(style)
+            existing.add(style_id)
+            copied.append(style)
+            pending.extend(link.get(qn("w:val")) for link in style.iter(*_STYLE_LINKS))
+        return copied
+
+    # ---------- 编号 ----------
+    def _numbering_element(self):
+        if self._target_numbering is None:
+            try:
+                part = self.target_part.part_related_by(RT.NUMBERING)
+            except KeyError:
+                part = NumberingPart(
+                    PackURI("/word/numbering.xml"), CT.WML_NUMBERING,
+                    parse_xml(f"<w:numbering {nsdecls('w')}/>"), self.target_part.package,
+                )
+                self.target_part.relate_to(part, RT.NUMBERING)
+            self._target_numbering = part.element
+        return self._target_numbering
+
+    def _merge_numbering(self, source, elements):
+        """为源文档用到的编号定义在目标中新建 abstractNum/num，并重写元素中的 numId"""
+        refs = [num_id for el in elements for num_id in el.iter(qn("w:numId"))]
+        used = {ref.get(qn("w:val")) for ref in refs} - {"0", None}
+        if not used:
+            return
+        try:
+            source_numbering = source.part.part_related_by(RT.NUMBERING).element
+        except KeyError:
+            return
+        source_nums = {n.get(qn("w:numId")): n for n in source_numbering.iterchildren(qn("w:num"))}
+        source_abstracts = {a.get(qn("w:abstractNumId")): a for a in source_numbering.iterchildren(qn("w:abstractNum"))}
+
+        target = self._numbering_element()
+        abstracts = list(target.iterchildren(qn("w:abstractNum")))
+        nums = list(target.iterchildren(qn("w:num")))
+        next_abstract = max([int(a.get(qn("w:abstractNumId"))) for a in abstracts] + [-1]) + 1
+        next_num = max([int(n.get(qn("w:numId"))) for n in nums] + [0]) + 1
+
+        mapping = {}
+        for old_id in sorted(used, key=int):
+            num = source_nums.get(old_id)
+            if num is None:
+                continue
+            abstract = source_abstracts.get(num.find(qn("w:abstractNumId")).get(qn("w:val")))
+            if abstract is None:
+                continue
+            # abstractNum 必须位于全部 num 之前
+            new_abstract = deepcopy(abstract)
+            new_abstract.set(qn("w:abstractNumId"), str(next_abstract))
+            if abstracts:
+                abstracts[-1].addnext(new_abstract)
+            else:
+                target.insert(0, new_abstract)
+            abstracts.append(new_abstract)
+
+            new_num = deepcopy(num)
+            new_num.set(qn("w:numId"), str(next_num))
+            new_num.find(qn("w:abstractNumId")).set(qn("w:val"), str(next_abstract))
+            target.append(new_num)
+
+            mapping[old_id] = str(next_num)
+            next_abstract += 1
+            next_num += 1
+
+        for ref in refs:
+            new_id = mapping.get(ref.get(qn("w:val")))
+            if new_id is not None:
+                ref.set(qn("w:val"), new_id)
+
+    # ---------- 关系部件 ----------
+    def _merge_relationships(self, source, elements):
+        """将元素引用的关系（r:id / r:embed / r:link 等）重新登记到目标文档并改写引用"""
+        mapping = {}
+        for el in elements:
+            for node in el.iter():
+                for attr, r_id in node.attrib.items():
+                    if not attr.startswith(f"{{{_NS_R}}}"):
+                        continue
+                    if r_id not in mapping:
+                        mapping[r_id] = self._relate(source, r_id)
+                    if mapping[r_id] is not None:
+                        node.set(attr, mapping[r_id])
+
+    def _relate(self, source, r_id):
+        rel = source.part.rels.get(r_id)
+        if rel is None:
+            return None
+        if rel.is_external:
+            return self.target_part.relate_to(rel.target_ref, rel.reltype, is_external=True)
+        part = rel.target_part
+        if isinstance(part, ImagePart):
+            try:
+                image_part = self.target_part.package.get_or_add_image_part(io.BytesIO(part.blob))
+                return self.target_part.relate_to(image_part, rel.reltype)
+            except Exception:
+                pass
+        self._adopt_part(part, source.part, set())
+        return self.target_part.relate_to(part, rel.reltype)
+
+    def _adopt_part(self, part, source_main, seen):
+        """按目标包中未使用的名称重命名部件（及其下级部件），避免与目标中的同名部件冲突"""
+        if part is source_main or id(part) in seen:
+            return
+        seen.add(id(part))
+        if self._partnames is None:
+            self._partnames = {str(p.partname) for p in self.target_part.package.iter_parts()}
+        partname = str(part.partname)
+        folder, filename = partname.rsplit("/", 1)
+        stem, dot, ext = filename.rpartition(".")
+        if not dot:
+            stem, ext = filename, ""
+        stem = re.sub(r"\d+$", "", stem)
+        index = 1
+        while f"{folder}/{stem}{index}{dot}{ext}" in self._partnames:
+            index += 1
+        part.partname = PackURI(f"{folder}/{stem}{index}{dot}{ext}")
+        self._partnames.add(str(part.partname))
+        for rel in part.rels.values():
+            if not rel.is_external:
+                self._adopt_part(rel.target_part, source_main, seen)
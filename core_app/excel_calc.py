@@ -1,43 +1,48 @@
 import os
 import numpy as np
 import pandas as pd
-import json
-import re
-import requests
-from typing import List, Dict,Callable, Optional
+from typing import List, Callable, Optional
 from openpyxl.styles import Alignment, PatternFill, Font, Border, Side
 import openpyxl
-from openpyxl.utils.dataframe import dataframe_to_rows
-from apply_noise import GradeReverseEngine
-from utils import normalize_score, get_grade_level, calculate_final_score, calculate_achievement_level, adjust_column_widths, get_outputs_dir
-import time
-import random
-from docx import Document
-from docx.shared import Pt, Cm
-from docx.oxml import OxmlElement
-from docx.oxml.ns import qn
-from docx.enum.table import WD_TABLE_ALIGNMENT, WD_ALIGN_VERTICAL, WD_ROW_HEIGHT_RULE
-from docx.enum.text import WD_ALIGN_PARAGRAPH
+from openpyxl.cell.cell import MergedCell
+from openpyxl.packaging.custom import StringProperty
+from core_app.forward_calc import AchievementResult, ForwardCalculator, GradeAggregates, RelationMatrix
+from io_app.detail_writer import DetailWorkbookWriter
+from io_app.run_cache import GradeRunCache
+from io_app.score_readers import load_score_input, read_score_headers
+from io_app.score_table import ScoreTable
+from io_app.xlsx_patch import patch_workbook_cells
+from utils import get_grade_level, calculate_final_score, adjust_column_widths
 
 class ExcelCalcMixin:
-        def calculate_score_bounds(self, target_score: float, spread_mode: str) -> tuple:
+        def calculate_score_bounds(self, target_score, spread_mode: str) -> tuple:
+            """按跨度模式计算分数上下限；target_score 为数组时逐元素计算并返回数组"""
             spread_ranges = {'large': 23, 'medium': 13, 'small': 8}
             base_spread = spread_ranges[spread_mode]
 
-            if target_score < 40:
-                spread = min(base_spread, target_score + 5)
-            else:
-                spread = base_spread
+            target = np.asarray(target_score, dtype=float)
+            spread = np.where(target < 40, np.minimum(base_spread, target + 5), base_spread)
+            min_bound = np.maximum(0.0, target - spread)
+            max_bound = np.minimum(99.0, target + spread)
 
-            min_bound = max(0.0, target_score - spread)
-            max_bound = min(99.0, target_score + spread)
-            
+            if target.ndim == 0:
+                return float(min_bound), float(max_bound)
             return min_bound, max_bound
 
         def generate_initial_scores(self, target, n, min_bound, max_bound, dist_type):
-            """生成初始整数分数，分段体现正态分布或偏态分布"""
-            scores = np.zeros(n, dtype=int)
-            mean = target
+            """
+            生成初始整数分数，分段体现正态分布或偏态分布
+            target / min_bound / max_bound 为形状 (k,) 的数组时整批生成 (k, n)，每行独立打乱与抽样
+            """
+            rng = self.reverse_engine.rng
+            batch = any(np.ndim(v) > 0 for v in (target, min_bound, max_bound))
+            mean, min_bound, max_bound = (
+                v[:, None] for v in np.broadcast_arrays(
+                    *(np.atleast_1d(np.asarray(v, dtype=float)) for v in (target, min_bound, max_bound))
+                )
+            )
+            k = mean.shape[0]
+            scores = np.zeros((k, n), dtype=int)
             std = (max_bound - min_bound) / 2
 
             if dist_type == 'normal':
@@ -65,101 +70,96 @@ class ExcelCalcMixin:
             else:
                 segments = [(min_bound, max_bound, 1.0)]
 
-            remaining_indices = list(range(n))
+            # 每行一次打乱后按比例切分：每段取排列中连续的一段下标，整段批量抽取整数分数
+            if k == 1:
+                order = rng.permutation(n)[None, :]
+            else:
+                order = rng.permuted(np.broadcast_to(np.arange(n), (k, n)), axis=1)
+            rows = np.arange(k)[:, None]
+            bound_lo, bound_hi = np.trunc(min_bound), np.trunc(max_bound)
+            start = 0
             for segment_min, segment_max, proportion in segments:
-                num_scores = max(1, int(round(proportion * n)))
-                if num_scores == 0:
-                    continue
-                low = max(int(segment_min), int(min_bound))
-                high = min(int(segment_max), int(max_bound)) + 1
-                if low >= high:
-                    low = max(int(min_bound), int(segment_min - 1))
-                    high = min(int(max_bound) + 1, int(segment_max + 1))
-                    if low >= high:
-                        low = int(min_bound)
-                        high = int(max_bound) + 1
-                chosen_indices = np.random.choice(remaining_indices, min(num_scores, len(remaining_indices)), replace=False)
-                for idx in chosen_indices:
-                    try:
-                        scores[idx] = np.random.randint(low, high)
-                    except ValueError as e:
-                        print(f"Error in np.random.randint: low={low}, high={high}, error={str(e)}")
-                        scores[idx] = np.random.randint(int(min_bound), int(max_bound) + 1)
-                    remaining_indices.remove(idx)
-
-            for idx in remaining_indices:
-                scores[idx] = np.random.randint(int(min_bound), int(max_bound) + 1)
-
-            return scores
+                num_scores = min(max(1, int(round(proportion * n))), n - start)
+                if num_scores <= 0:
+                    break
+                # 区间为空时先放宽1分，仍为空则退回整个上下限
+                low = np.maximum(np.trunc(segment_min), bound_lo)
+                high = np.minimum(np.trunc(segment_max), bound_hi) + 1
+                empty = low >= high
+                low = np.where(empty, np.maximum(bound_lo, np.trunc(segment_min - 1)), low)
+                high = np.where(empty, np.minimum(bound_hi + 1, np.trunc(segment_max + 1)), high)
+                empty = low >= high
+                low = np.where(empty, bound_lo, low)
+                high = np.where(empty, bound_hi + 1, high)
+                scores[rows, order[:, start:start + num_scores]] = rng.integers(
+                    low.astype(int), high.astype(int), size=(k, num_scores)
+                )
+                start += num_scores
+
+            # 各段比例取整后剩余的学生在整个区间内均匀抽取
+            scores[rows, order[:, start:]] = rng.integers(
+                bound_lo.astype(int), bound_hi.astype(int) + 1, size=(k, n - start)
+            )
+
+            return scores if batch else scores[0]
 
         def adjust_scores(self, scores, target, weights, min_bound, max_bound, dist_type):
-            """逐步调整分数以满足加权和约束，同时保留分布形态"""
-            weights_array = np.array(weights)
-            scores = np.array(scores, dtype=float)
-            max_attempts = 1000
-            attempt = 0
+            """
+            将初始分数确定性地调整到加权和目标，同时保留分布形态
+            1. 精确投影：在 [min_bound, max_bound] 内求离初始分数最近、加权和等于目标的解；
+            2. 整数量化：量化到整数分并修复加权和（有限轮、整批向量化）；
+            3. 整数网格无法在 0.1 内命中的行，改为量化到 0.1 分。
+            :param scores: 初始分数，形状 (m,) 或批量 (n, m)
+            :param target: 加权和目标，标量或形状 (n,)
+            :param min_bound: 分数下限，标量或形状 (n,)；max_bound 同理
+            :return: 调整后的分数，形状与 scores 相同
+            """
+            engine = self.reverse_engine
+            weights_array = np.asarray(weights, dtype=float)
+            draft = np.asarray(scores, dtype=float)
+            single = draft.ndim == 1
+            draft = np.atleast_2d(draft)
+            n = draft.shape[0]
+            targets = np.broadcast_to(np.asarray(target, dtype=float), (n,)).astype(float)
+            lower = np.broadcast_to(np.asarray(min_bound, dtype=float), (n,)).astype(float)
+            upper = np.broadcast_to(np.asarray(max_bound, dtype=float), (n,)).astype(float)
+
+            projected = engine.project_to_weighted_total(draft, weights_array, targets, upper, lower)
+            result = engine.quantize_to_grid(projected, weights_array, targets, 1, upper, lower, tolerance=0.1)
+            missed = np.abs(result @ weights_array - targets) > 0.1
+            if missed.any():
+                result[missed] = engine.quantize_to_grid(
+                    projected[missed], weights_array, targets[missed], 0.1,
+                    upper[missed], lower[missed], tolerance=0.1
+                )
 
-            while attempt < max_attempts:
-                current_sum = np.sum(scores * weights_array)
-                diff = target - current_sum
+            diff = np.abs(result @ weights_array - targets)
+            off = np.flatnonzero(diff > 0.1)
+            if off.size:
+                print(f"[分数调整] {off.size} 行加权和偏差超过 0.1（最大 {diff[off].max():.2f}）")
 
-                if abs(diff) <= 0.1:
-                    break
+            return result[0] if single else result
 
-                indices = np.argsort(-weights_array)
-                for idx in indices:
-                    weight = weights[idx]
-                    if weight > 0:
-                        adjustment = diff / weight
-                        if adjustment > 0:
-                            adjustment = max(1, int(adjustment))
-                        else:
-                            adjustment = min(-1, int(adjustment))
-                        new_score = scores[idx] + adjustment
-                        if min_bound <= new_score <= max_bound:
-                            scores[idx] = new_score
-                            break
-
-                attempt += 1
-
-            current_sum = np.sum(scores * weights_array)
-            diff = target - current_sum
-            if abs(diff) > 0.1:
-                indices = np.argsort(weights_array)
-                for idx in indices:
-                    weight = weights[idx]
-                    if weight > 0:
-                        adjustment = round(diff / weight, 1)
-                        new_score = scores[idx] + adjustment
-                        if min_bound <= new_score <= max_bound:
-                            scores[idx] = new_score
-                            break
-
-            current_sum = np.sum(scores * weights_array)
-            diff = target - current_sum
-            if abs(diff) > 0.1:
-                print(f"Warning: Final weighted sum deviation {abs(diff):.2f} exceeds 0.1 for target {target}")
-
-            return scores
-
-        def generate_weighted_scores(self, target_sum: float, weights: List[float], all_scores: List[List[float]], 
-                                    spread_mode: str = 'medium', distribution: str = 'uniform') -> List[float]:
+        def generate_weighted_scores(self, target_sum, weights: List[float], all_scores: List[List[float]], 
+                                    spread_mode: str = 'medium', distribution: str = 'uniform') -> List:
             """
             基于分布模式和跨度范围生成成绩，确保加权和偏差 ≤ 0.1。
+            target_sum 为数组时批量生成，返回每行一组成绩的列表。
             """
             n = len(weights)
+            batch = np.ndim(target_sum) > 0
+            targets = np.atleast_1d(np.asarray(target_sum, dtype=float))
+
+            result = np.zeros((targets.size, n))
+            active = np.flatnonzero(np.abs(targets) >= 0.0001)
+            if active.size:
+                min_bound, max_bound = self.calculate_score_bounds(targets[active], spread_mode)
+                initial = self.generate_initial_scores(targets[active], n, min_bound, max_bound, distribution)
+                result[active] = self.adjust_scores(
+                    initial, targets[active], weights, min_bound, max_bound, distribution
+                )
 
-            if abs(target_sum) < 0.0001:
-                return np.zeros(n).tolist()
-
-            min_bound, max_bound = self.calculate_score_bounds(target_sum, spread_mode)
-            scores = self.generate_initial_scores(target_sum, n, min_bound, max_bound, distribution)
-            optimized_scores = self.adjust_scores(scores, target_sum, weights, min_bound, max_bound, distribution)
-
-            print(f"Generated scores: {optimized_scores.tolist()}")
-            print(f"Distribution - Mean: {np.mean(optimized_scores):.2f}, Std: {np.std(optimized_scores):.2f}")
-
-            return optimized_scores.tolist()
+            return result.tolist() if batch else result[0].tolist()
 
         def process_grades(self, num_objectives, weights, usual_ratio, midterm_ratio, final_ratio, 
                           spread_mode='medium', distribution='uniform',progress_callback: Optional[Callable[[int], None]] = None):
@@ -168,7 +168,7 @@ class ExcelCalcMixin:
             if not course_name:
                 raise ValueError("请输入课程名称")
                 
-            output_dir = get_outputs_dir()
+            output_dir = self._get_output_dir()
             detail_output = os.path.join(output_dir, f'{course_name}成绩单详情.xlsx')
 
             try:
@@ -186,7 +186,12 @@ class ExcelCalcMixin:
             all_midterm_scores = [[] for _ in range(num_objectives)]
             all_final_scores = [[] for _ in range(num_objectives)]
             
-            for idx, row in df.iterrows():
+            # 三个成绩列整列批量分解，循环中只按行取用
+            batch_usual = self.generate_weighted_scores(df['平时成绩'].to_numpy(dtype=float), weights, all_usual_scores, spread_mode, distribution)
+            batch_midterm = self.generate_weighted_scores(df['期中成绩'].to_numpy(dtype=float), weights, all_midterm_scores, spread_mode, distribution)
+            batch_final = self.generate_weighted_scores(df['期末成绩'].to_numpy(dtype=float), weights, all_final_scores, spread_mode, distribution)
+
+            for pos, (idx, row) in enumerate(df.iterrows()):
                 self.status_label.setText(f"正在处理第 {idx+1}/{len(df)} 个学生的成绩...")
                 if progress_callback:
                     progress_callback(idx)  # 调用进度回调
@@ -196,13 +201,9 @@ class ExcelCalcMixin:
                 total_final = row['期末成绩']
                 total_score = row['总和']
                 
-                try:
-                    usual_scores = self.generate_weighted_scores(total_usual, weights, all_usual_scores, spread_mode, distribution)
-                    midterm_scores = self.generate_weighted_scores(total_midterm, weights, all_midterm_scores, spread_mode, distribution)
-                    final_scores = self.generate_weighted_scores(total_final, weights, all_final_scores, spread_mode, distribution)
-                except Exception as e:
-                    print(f"Error generating scores for student {name}: {str(e)}")
-                    raise
+                usual_scores = batch_usual[pos]
+                midterm_scores = batch_midterm[pos]
+                final_scores = batch_final[pos]
 
                 for i in range(num_objectives):
                     all_usual_scores[i].append(usual_scores[i])
@@ -303,7 +304,7 @@ class ExcelCalcMixin:
 
         def generate_objective_analysis_report(self, result_df: pd.DataFrame, course_name: str, weights, usual_ratio, midterm_ratio, final_ratio) -> float:
             """生成课程目标达成度分析报告"""
-            output_dir = get_outputs_dir()
+            output_dir = self._get_output_dir()
             analysis_output = os.path.join(output_dir, f'{course_name}课程目标达成度分析表.xlsx')
             
             objectives = sorted([i for i in result_df['课程目标'].unique() if isinstance(i, int)])
@@ -430,27 +431,42 @@ class ExcelCalcMixin:
                 return [0 for _ in weights]
             return [w / total for w in weights]
 
+        def _record_random_seed(self, wb):
+            """将本次运行种子写入工作簿自定义属性（文件 > 属性 > 自定义 中可见），用于复现"""
+            if isinstance(wb, DetailWorkbookWriter):
+                wb.set_custom_property("random_seed", str(self.reverse_engine.seed))
+            else:
+                wb.custom_doc_props.append(StringProperty(name="random_seed", value=str(self.reverse_engine.seed)))
+
         def _validate_forward_headers(self, file_path: str):
             """\u6821\u9a8c\u6b63\u5411\u6a21\u677f\u8868\u5934\u662f\u5426\u4e0e\u5173\u7cfb\u8868\u4e00\u81f4"""
-            if not self.relation_payload:
-                raise ValueError("\u8bf7\u5148\u586b\u5199\u8bfe\u7a0b\u8003\u6838\u4e0e\u8bfe\u7a0b\u76ee\u6807\u5bf9\u5e94\u5173\u7cfb")
-
-            wb = openpyxl.load_workbook(file_path)
-            ws = wb.active
-            max_col = ws.max_column
+            # 只读表头：xlsx 与模板识别共用同一次探测结果，CSV 读前两行，Parquet 只读 schema
+            rows = read_score_headers(file_path, 2, self._expected_forward_columns())
+            row1, row2 = (rows + [[], []])[:2]
+            self._check_forward_header_rows(row1, row2)
+
+        def _expected_forward_columns(self):
+            """正向成绩列 [(环节, 考核方式), ...]，没有考核方式的环节记为“无”"""
+            expected = []
+            for link in self._get_links():
+                methods = link.get("methods", [])
+                if not methods:
+                    methods = [{"name": "\u65e0"}]
+                for m in methods:
+                    expected.append(((link.get("name") or "").strip(), (m.get("name") or "\u65e0").strip()))
+            return expected
 
-            def header_value(row, col):
-                cell = ws.cell(row=row, column=col)
-                if cell.value is not None:
-                    return str(cell.value).strip()
-                for rng in ws.merged_cells.ranges:
-                    if rng.min_row <= row <= rng.max_row and rng.min_col <= col <= rng.max_col:
-                        v = ws.cell(rng.min_row, rng.min_col).value
-                        return str(v).strip() if v is not None else ""
-                return ""
+        def _expected_reverse_columns(self):
+            """逆向成绩列（环节名）"""
+            links = self._get_links()
+            if links:
+                return [link.get("name", "").strip() for link in links]
+            return ["平时考核", "期中考核", "期末考核"]
 
-            row1 = [header_value(1, c) for c in range(1, max_col + 1)]
-            row2 = [header_value(2, c) for c in range(1, max_col + 1)]
+        def _check_forward_header_rows(self, row1, row2):
+            """校验正向表头两行（环节 / 考核方式）是否与关系表一致"""
+            if not self.relation_payload:
+                raise ValueError("\u8bf7\u5148\u586b\u5199\u8bfe\u7a0b\u8003\u6838\u4e0e\u8bfe\u7a0b\u76ee\u6807\u5bf9\u5e94\u5173\u7cfb")
 
             if not row2:
                 raise ValueError("\u6b63\u5411\u6a21\u677f\u7b2c1\u5217\u5fc5\u987b\u4e3a\u201c\u59d3\u540d\u201d")
@@ -458,16 +474,9 @@ class ExcelCalcMixin:
                 if not (row2[0] == "" and row1[0] == "\u59d3\u540d"):
                     raise ValueError("\u6b63\u5411\u6a21\u677f\u7b2c1\u5217\u5fc5\u987b\u4e3a\u201c\u59d3\u540d\u201d")
 
-            links = self._get_links()
-            expected_methods = []
-            expected_links = []
-            for link in links:
-                methods = link.get("methods", [])
-                if not methods:
-                    methods = [{"name": "\u65e0"}]
-                for m in methods:
-                    expected_methods.append((m.get("name") or "\u65e0").strip())
-                    expected_links.append((link.get("name") or "").strip())
+            expected = self._expected_forward_columns()
+            expected_links = [link for link, _ in expected]
+            expected_methods = [method for _, method in expected]
 
             actual_methods = [str(v).strip() for v in row2[1:1+len(expected_methods)]]
             if actual_methods != expected_methods:
@@ -477,220 +486,299 @@ class ExcelCalcMixin:
             if actual_links != expected_links:
                 raise ValueError("\u6b63\u5411\u6a21\u677f\u4e00\u7ea7\u8868\u5934\u4e0e\u5173\u7cfb\u8868\u4e0d\u4e00\u81f4\uff0c\u8bf7\u91cd\u65b0\u4e0b\u8f7d\u6a21\u677f")
 
-        def _validate_reverse_headers(self, df: pd.DataFrame):
-            """校验逆向模板表头"""
-            links = self._get_links()
-            if links:
-                expected = ["姓名"] + [link.get("name", "").strip() for link in links]
+        def _validate_reverse_headers(self, df):
+            """校验逆向模板表头（DataFrame 或列式 ScoreTable）"""
+            if isinstance(df, ScoreTable):
+                header = df.header_rows[0] if df.header_rows else []
+                first_value = df.names[0] if len(df) else None
             else:
-                expected = ["姓名", "平时考核", "期中考核", "期末考核"]
+                header = list(df.columns)
+                first_value = df.iloc[0, 0] if not df.empty else None
+            self._check_reverse_header_row(header, first_value)
+
+        def _check_reverse_header_row(self, header, first_value=None):
+            """
+            校验逆向表头行是否与关系表环节一致
+            :param first_value: 表体首行首列的值（正向模板此处为“姓名”）
+            """
+            expected = ["姓名"] + self._expected_reverse_columns()
 
-            actual = [str(c).strip() for c in df.columns]
+            actual = [str(c).strip() for c in header]
             actual = [c for c in actual if c and not c.startswith("Unnamed")]
             if actual != expected:
                 raise ValueError("逆向模板表头与关系表不一致，请重新下载逆向模板")
 
             # 识别正向模板（正向模板第2行第1列通常为“姓名”）
-            if not df.empty:
-                first_val = str(df.iloc[0, 0]).strip()
-                if first_val == "姓名":
-                    raise ValueError("检测到正向模板，请导入逆向模板成绩")
-        def process_forward_grades(self, spread_mode='medium', distribution='uniform'):
-            """\u6b63\u5411\u6210\u7ee9\u5bfc\u5165\u4e0e\u6821\u9a8c\uff0c\u8f93\u51fa\u8be6\u60c5\u6210\u7ee9\u660e\u7ec6\u8868"""
-            self._validate_forward_headers(self.input_file)
-            df = pd.read_excel(self.input_file, header=1)
-            df = df.fillna(0)
-
-            # 修正首列为空导致的列名问题
-            cols = list(df.columns)
-            if cols:
-                first = str(cols[0]) if cols[0] is not None else ""
-                if first.startswith("Unnamed") or first.strip() == "" or first == "nan":
-                    cols[0] = "\u59d3\u540d"
-                    df.columns = cols
-
-            if "\u59d3\u540d" not in df.columns:
-                raise ValueError("\u6b63\u5411\u6a21\u677f\u7f3a\u5c11\u201c\u59d3\u540d\u201d\u5217")
+            if first_value is not None and str(first_value).strip() == "姓名":
+                raise ValueError("检测到正向模板，请导入逆向模板成绩")
 
-            links = self._get_links()
-            obj_count = int(self.relation_payload.get("objectives_count", 0) or 0)
-            if obj_count <= 0:
-                obj_keys = set()
-                for link in links:
-                    for method in link.get("methods", []):
-                        obj_keys.update(method.get("supports", {}).keys())
-                obj_count = len(obj_keys)
-            obj_keys = [f"\u8bfe\u7a0b\u76ee\u6807{i+1}" for i in range(obj_count)]
-            obj_headers = [f"\u76ee\u6807{i+1}" for i in range(obj_count)]
+        def _validate_reverse_input(self, file_path: str):
+            """只读表头校验逆向成绩文件（xlsx / CSV / Parquet）"""
+            rows = read_score_headers(file_path, 2, self._expected_reverse_columns())
+            header = rows[0] if rows else []
+            first_value = rows[1][0] if len(rows) > 1 and rows[1] else None
+            self._check_reverse_header_row(header, first_value)
 
-            wb = openpyxl.Workbook()
-            ws = wb.active
-            ws.title = "\u6210\u7ee9\u660e\u7ec6"
-
-            header = ["\u59d3\u540d", "\u8003\u6838\u73af\u8282", "\u8003\u6838\u65b9\u5f0f"] + obj_headers + ["\u5c0f\u8ba1", "\u5408\u8ba1", "\u7b49\u7ea7"]
-            ws.append(header)
-
-            def format_link_label(name, ratio):
-                pct = int(round(ratio * 100))
-                if "\u8003\u6838" in name:
-                    base = name.replace("\u8003\u6838", "")
-                    return f"{base}\n\u8003\u6838\n({pct}%)"
-                return f"{name}\n({pct}%)"
-
-            def grade_label(score):
-                if score >= 90:
-                    return "\u4f18\u79c0"
-                if score >= 80:
-                    return "\u826f\u597d"
-                if score >= 70:
-                    return "\u4e2d\u7b49"
-                if score >= 60:
-                    return "\u53ca\u683c"
-                return "\u4e0d\u53ca\u683c"
-
-            row_cursor = 2
-            total_scores = []
-
-            for _, row in df.iterrows():
-                name = row.get("\u59d3\u540d")
-                if pd.isna(name) or str(name).strip() == "":
-                    continue
-                student_start = row_cursor
-                total_score = 0.0
-                total_obj_scores = [0.0 for _ in range(obj_count)]
-
-                for link in links:
-                    link_name = link.get("name", "")
-                    link_ratio = float(link.get("ratio", 0))
-                    methods = link.get("methods", []) or [{"name": "\u65e0", "supports": {}, "subtotal": 1.0}]
-
-                    link_label = format_link_label(link_name, link_ratio)
-                    link_start = row_cursor
-                    link_obj_scores = [0.0 for _ in range(obj_count)]
-                    link_score = 0.0
-
-                    for idx, m in enumerate(methods):
-                        m_name = m.get("name", "\u65e0")
-                        score = row.get(m_name, 0)
-                        try:
-                            score = float(score)
-                        except Exception:
-                            score = 0.0
-
-                        supports = m.get("supports", {}) or {}
-                        support_vals = [float(supports.get(k, 0)) for k in obj_keys]
-                        # 按目标支撑权重分配到各课程目标
-                        obj_scores = [score * v for v in support_vals]
-
-                        for i, v in enumerate(obj_scores):
-                            link_obj_scores[i] += v
-
-                        method_weight = float(m.get("subtotal", 0))
-                        link_score += score * method_weight
-
-                        method_subtotal = sum(obj_scores)
-                        row_values = ["", link_label if row_cursor == link_start else "", m_name]
-                        row_values += [round(v, 2) for v in obj_scores]
-                        row_values += [round(method_subtotal, 2), "", ""]
-                        ws.append(row_values)
-                        row_cursor += 1
-
-                    # 环节合计行
-                    total_row = ["", link_label if row_cursor == link_start else "", "\u73af\u8282\u5408\u8ba1"]
-                    total_row += [round(v, 2) for v in link_obj_scores]
-                    total_row += ["", round(link_score, 2), ""]
-                    ws.append(total_row)
-                    row_cursor += 1
+        def load_input_table(self, forward: bool = True) -> ScoreTable:
+            """
+            先只读表头校验，再将 input_file 读取为列式成绩表（xlsx / CSV / Parquet）
+            界面导入时读取一次，导出时经 process_forward_grades / process_reverse_grades 的 table 参数复用
+            """
+            if forward:
+                self._validate_forward_headers(self.input_file)
+                return load_score_input(self.input_file, 2, self._expected_forward_columns())
+            self._validate_reverse_input(self.input_file)
+            return load_score_input(self.input_file, 1, self._expected_reverse_columns())
+
+        def _report_coercions(self, table: ScoreTable):
+            """输出无法识别为数字、按0分计的单元格"""
+            if table.coerced:
+                print(f"[数据转换] {len(table.coerced)} 个单元格无法识别为数字，已按0分计：{table.coercion_summary()}")
+
+        def process_forward_grades(self, spread_mode='medium', distribution='uniform', table: Optional[ScoreTable] = None,
+                                   incremental: bool = False):
+            """
+            正向成绩导入与校验，输出详情成绩明细表
+            :param table: 已读取的列式成绩表；为空时按 input_file 类型（xlsx / CSV / Parquet）读取
+            :param incremental: 与上次导出的分数矩阵比对，只重算并修补变化的学生；缓存不可用时全量生成
+            """
+            # 每次运行重新登记报告文档，不沿用上一次运行（或上一门课程）的文档
+            self.report_documents = {}
+            if table is None:
+                table = self.load_input_table(forward=True)
+            else:
+                self._check_forward_header_rows(*table.header_rows[:2])
+            self._report_coercions(table)
 
-                    ws.merge_cells(start_row=link_start, start_column=2, end_row=row_cursor - 1, end_column=2)
+            if incremental:
+                avg_score = self._update_forward_outputs(table)
+                if avg_score is not None:
+                    return avg_score
 
-                    total_score += link_score * link_ratio
-                    for i, v in enumerate(link_obj_scores):
-                        total_obj_scores[i] += v * link_ratio
+            # 关系表编译为矩阵后一次算出全部学生的目标分、环节分与总评
+            result = ForwardCalculator(table, self.relation_payload).run()
+            return self._render_grade_outputs(result, save_cache=True)
 
-                grade = grade_label(total_score)
-                final_row = ["", "100%", "\u8bfe\u7a0b\u603b\u8bc4"]
-                final_row += [round(v, 2) for v in total_obj_scores]
-                final_row += ["", round(total_score, 2), grade]
-                ws.append(final_row)
-                row_cursor += 1
+        def _update_forward_outputs(self, table: ScoreTable) -> Optional[float]:
+            """
+            增量更新正向输出：与上次导出缓存的分数矩阵比对，只重算变化学生的明细行，
+            方法平均分、等级人数与目标达成度由运行累计量更新，成绩明细按单元格修补，表2/表5重新生成
+            :return: 全班课程总评平均分；缓存不可用（首次导出、关系表或名单变化、明细被改动）时返回 None
+            """
+            detail_output_path, eval_output_path = self._grade_output_paths()
+            cache = GradeRunCache.load(detail_output_path)
+            relation_key = GradeRunCache.relation_fingerprint(self.relation_payload)
+            if cache is None or not cache.matches(relation_key, table.names, detail_output_path):
+                print("[增量] 没有可用的上次导出缓存，全量生成")
+                return None
+
+            relation = RelationMatrix(self.relation_payload)
+            scores = table.take(relation.method_names)
+            if scores.shape != cache.method_scores.shape:
+                print("[增量] 成绩列与上次导出不一致，全量生成")
+                return None
+
+            aggregates = GradeAggregates(relation, cache.method_sums, cache.total_scores, cache.grade_counts)
+            rows = np.flatnonzero(np.any(scores != cache.method_scores, axis=1))
+            print(f"[增量] {len(rows)} 名学生成绩有变化")
+
+            # 只对变化学生做矩阵计算，并按新旧差值更新汇总量
+            changed = ForwardCalculator(None, relation).compute(table.names[rows].tolist(), scores[rows])
+            aggregates.update(rows, cache.method_scores[rows], scores[rows], changed.total_scores)
+
+            # 每名学生的明细块行数相同，第 s 名学生从第 2 + s×块高 行开始（第1行为表头）
+            detail_cells = {}
+            block_height = None
+            for k, name, grade, link_blocks, total_obj, total_score in self._detail_students(changed, self._detail_layout(relation)):
+                if block_height is None:
+                    block_height = DetailWorkbookWriter.student_block_height(link_blocks)
+                first_row = 2 + int(rows[k]) * block_height
+                student_rows = DetailWorkbookWriter.student_rows(name, grade, link_blocks, total_obj, total_score)
+                for offset, values in enumerate(student_rows):
+                    for col, value in enumerate(values):
+                        detail_cells[(first_row + offset, col + 1)] = value
+
+            stats_ws, avg_score = self._build_stats_sheet(relation, aggregates)
+            self._build_eval_sheet(AchievementResult.from_aggregates(aggregates), eval_output_path)
+            stats_cells = {
+                (cell.row, cell.column): None if isinstance(cell, MergedCell) else cell.value
+                for row in stats_ws.iter_rows(min_row=1, max_row=stats_ws.max_row, max_col=stats_ws.max_column)
+                for cell in row
+            }
+            # 明细工作簿：第1张为成绩明细，第2张为课程成绩统计
+            patch_workbook_cells(
+                detail_output_path, {0: detail_cells, 1: stats_cells},
+                properties={"random_seed": str(self.reverse_engine.seed)},
+            )
+
+            GradeRunCache(
+                relation_key, cache.names, scores, aggregates.method_sums, aggregates.total_scores,
+                aggregates.grade_counts, GradeRunCache.file_key(detail_output_path),
+            ).save(detail_output_path)
+            return avg_score
+
+        def _format_link_label(self, name, ratio):
+            pct = int(round(ratio * 100))
+            if "考核" in name:
+                base = name.replace("考核", "")
+                return f"{base}\n考核\n({pct}%)"
+            return f"{name}\n({pct}%)"
+
+        def _grade_label(self, score):
+            if score >= 90:
+                return "优秀"
+            if score >= 80:
+                return "良好"
+            if score >= 70:
+                return "中等"
+            if score >= 60:
+                return "及格"
+            return "不及格"
+
+        def _fmt_ratio(self, val):
+            try:
+                val = float(val)
+            except Exception:
+                val = 0.0
+            pct = val * 100 if val <= 1 else val
+            if abs(pct - round(pct)) < 0.01:
+                return f"{int(round(pct))}%"
+            return f"{pct:.2f}%"
 
-                # 填充姓名与等级（合并单元格）
-                ws.cell(row=student_start, column=1, value=name)
-                grade_col = len(header)
-                ws.cell(row=student_start, column=grade_col, value=grade)
+        def _render_grade_outputs(self, result, suffix: str = "", embed_eval: bool = False, save_cache: bool = False):
+            """
+            正向、逆向共用的输出渲染：成绩明细、表2（课程成绩统计）、表5（达成情况评价结果）
+            :param result: 已计算的 ForwardCalculator（学生×方法 分数矩阵 + 关系矩阵）
+            :param suffix: 输出文件名后缀（逆向为“（逆向）”）
+            :param embed_eval: 是否将表5同时写入成绩明细工作簿
+            :param save_cache: 是否保存分数矩阵与汇总量，供下次增量更新
+            :return: 全班课程总评平均分
+            """
+            relation = result.relation
+            obj_headers = [f"目标{i+1}" for i in range(relation.objective_count)]
+            detail_output_path, eval_output_path = self._grade_output_paths(suffix)
+
+            # ===== 成绩明细：按行流式写出（xlsxwriter constant_memory） =====
+            writer = DetailWorkbookWriter(detail_output_path, obj_headers)
+            layout = self._detail_layout(relation)
+            for _, name, grade, link_blocks, total_obj, total_score in self._detail_students(result, layout):
+                writer.add_student(name, grade, link_blocks, total_obj, total_score)
+
+            aggregates = GradeAggregates.from_result(result)
+            stats_ws, avg_score = self._build_stats_sheet(relation, aggregates)
+            eval_ws = self._build_eval_sheet(AchievementResult.from_aggregates(aggregates), eval_output_path)
+
+            writer.add_sheet_from(stats_ws)
+            if embed_eval:
+                writer.add_sheet_from(eval_ws)
+            self._record_random_seed(writer)
+            writer.close()
+
+            if save_cache:
+                try:
+                    GradeRunCache(
+                        GradeRunCache.relation_fingerprint(self.relation_payload), result.names, result.method_scores,
+                        aggregates.method_sums, aggregates.total_scores, aggregates.grade_counts,
+                        GradeRunCache.file_key(detail_output_path),
+                    ).save(detail_output_path)
+                except Exception as e:
+                    print(f"[增量] 缓存保存失败: {e}")
 
-                ws.merge_cells(start_row=student_start, start_column=1, end_row=row_cursor - 1, end_column=1)
-                ws.merge_cells(start_row=student_start, start_column=grade_col, end_row=row_cursor - 1, end_column=grade_col)
-                total_scores.append(total_score)
+            return avg_score
 
-            # 统一样式与边框
-            align = Alignment(horizontal='center', vertical='center', wrap_text=True)
+        def _grade_output_paths(self, suffix: str = ""):
+            """成绩明细与表5工作簿的输出路径"""
+            output_dir = self._get_output_dir()
+            safe_name = self._safe_filename(self.course_name_input.text())
+            detail_output_path = os.path.join(output_dir, f"{safe_name}成绩明细{suffix}.xlsx")
+            eval_output_path = os.path.join(output_dir, f"{safe_name}课程目标达成情况评价结果{suffix}.xlsx")
+            return detail_output_path, eval_output_path
+
+        def _detail_layout(self, relation):
+            """成绩明细中与学生无关的部分：环节标签、各环节方法下标、各方法小计权重"""
+            link_labels = [self._format_link_label(name, ratio) for name, ratio in zip(relation.link_names, relation.link_ratios)]
+            link_method_idx = [relation.link_methods(l_idx) for l_idx in range(len(relation.links))]
+            method_subtotals = relation.supports.sum(axis=1)
+            return link_labels, link_method_idx, method_subtotals
+
+        def _detail_students(self, result, layout):
+            """
+            逐个学生生成成绩明细块的内容（全量写出与增量修补共用）
+            :return: 迭代 (学生下标, 姓名, 等级, 环节块, 各目标总分, 课程总评)
+            """
+            relation = result.relation
+            link_labels, link_method_idx, method_subtotals = layout
+            link_obj_rounded = np.round(result.link_obj_scores, 2)
+            link_score_rounded = np.round(result.link_scores, 2)
+            total_obj_rounded = np.round(result.total_obj_scores, 2)
+
+            for s_idx, name in enumerate(result.names):
+                method_obj = np.round(result.method_obj_scores(s_idx), 2)
+                method_sub = np.round(result.method_scores[s_idx] * method_subtotals, 2)
+                link_blocks = []
+                for l_idx, link_label in enumerate(link_labels):
+                    method_rows = [
+                        (relation.method_names[j], method_obj[j].tolist(), float(method_sub[j]))
+                        for j in link_method_idx[l_idx]
+                    ]
+                    link_blocks.append((
+                        link_label, method_rows,
+                        link_obj_rounded[s_idx, l_idx].tolist(), float(link_score_rounded[s_idx, l_idx]),
+                    ))
+                total_score = float(result.total_scores[s_idx])
+                yield (s_idx, name, self._grade_label(total_score), link_blocks,
+                       total_obj_rounded[s_idx].tolist(), round(total_score, 2))
+
+        def _build_stats_sheet(self, relation, aggregates: GradeAggregates):
+            """
+            表2：课程成绩统计（同时导出 Word 版本）
+            :return: (统计表工作表, 全班课程总评平均分)
+            """
+            links = relation.links
+            total_scores = aggregates.total_scores
             thin = Side(style='thin')
-            border = Border(left=thin, right=thin, top=thin, bottom=thin)
-            for r in ws.iter_rows(min_row=1, max_row=ws.max_row, min_col=1, max_col=ws.max_column):
-                for cell in r:
-                    cell.alignment = align
-                    cell.border = border
-
+            cell_align = Alignment(horizontal='center', vertical='center', wrap_text=True)
+            cell_border = Border(left=thin, right=thin, top=thin, bottom=thin)
 
-            # 成绩统计表
-            stats_ws = wb.create_sheet(title="\u8bfe\u7a0b\u6210\u7ee9\u7edf\u8ba1")
-            total_count = len(total_scores)
-            max_score = round(max(total_scores), 2) if total_scores else 0
-            min_score = round(min(total_scores), 2) if total_scores else 0
-            avg_score = round(float(np.mean(total_scores)) if total_scores else 0.0, 2)
+            wb = openpyxl.Workbook()
+            stats_ws = wb.active
+            stats_ws.title = "课程成绩统计"
+            total_count = aggregates.count
+            max_score = round(float(total_scores.max()), 2) if total_count else 0
+            min_score = round(float(total_scores.min()), 2) if total_count else 0
+            avg_score = round(aggregates.average, 2)
 
-            grade_bins = [
-                (90, 100, "\u4f18\u79c0"),
-                (80, 89.999, "\u826f\u597d"),
-                (70, 79.999, "\u4e2d\u7b49"),
-                (60, 69.999, "\u53ca\u683c"),
-                (0, 59.999, "\u4e0d\u53ca\u683c"),
-            ]
-            counts = []
-            ratios = []
-            for lo, hi, _ in grade_bins:
-                c = sum(1 for s in total_scores if lo <= s <= hi)
-                counts.append(c)
-                ratios.append(round(c / total_count, 4) if total_count else 0)
-
-            def _fmt_ratio(val):
-                try:
-                    val = float(val)
-                except Exception:
-                    val = 0.0
-                pct = val * 100 if val <= 1 else val
-                if abs(pct - round(pct)) < 0.01:
-                    return f"{int(round(pct))}%"
-                return f"{pct:.2f}%"
+            counts = [int(c) for c in aggregates.grade_counts]
+            ratios = aggregates.grade_ratios
 
             composition_parts = []
             for link in links:
-                name = link.get("name", "")
-                ratio = link.get("ratio", 0)
-                if name:
-                    composition_parts.append(f"{name}\uff08{_fmt_ratio(ratio)}\uff09")
+                lname = link.get("name", "")
+                lratio = link.get("ratio", 0)
+                if lname:
+                    composition_parts.append(f"{lname}（{self._fmt_ratio(lratio)}）")
             composition_text = " + ".join(composition_parts)
 
-            stats_ws.append(["\u6210\u7ee9\u6784\u6210", composition_text, "", "", "", ""])
+            stats_ws.append(["成绩构成", composition_text, "", "", "", ""])
             stats_ws.merge_cells("B1:F1")
-            stats_ws.append(["\u6700\u9ad8\u6210\u7ee9", max_score, "\u6700\u4f4e\u6210\u7ee9", min_score, "\u5e73\u5747\u6210\u7ee9", avg_score])
+            stats_ws.append(["最高成绩", max_score, "最低成绩", min_score, "平均成绩", avg_score])
             stats_ws.append([
-                "\u6210\u7ee9\u7b49\u7ea7",
-                "90-100\n(\u4f18\u79c0)",
-                "80-89\n(\u826f\u597d)",
-                "70-79\n(\u4e2d\u7b49)",
-                "60-69\n(\u53ca\u683c)",
-                "<60\n(\u4e0d\u53ca\u683c)",
+                "成绩等级",
+                "90-100\n(优秀)",
+                "80-89\n(良好)",
+                "70-79\n(中等)",
+                "60-69\n(及格)",
+                "<60\n(不及格)",
             ])
-            stats_ws.append(["\u4eba\u6570"] + counts)
-            stats_ws.append(["\u5360\u8003\u6838\u4eba\u6570\u7684\u6bd4\u4f8b"] + [f"{r*100:.2f}%" for r in ratios])
+            stats_ws.append(["人数"] + counts)
+            stats_ws.append(["占考核人数的比例"] + [f"{r*100:.2f}%" for r in ratios])
+
+            # 导出表2的Word版本
             self._export_stats_docx(composition_text, max_score, min_score, avg_score, counts, ratios)
 
             # 统计表字体样式与加粗区域
-            base_font = Font(name="\u4eff\u5b8b", size=12)
-            bold_font = Font(name="\u4eff\u5b8b", size=12, bold=True)
+            base_font = Font(name="仿宋", size=12)
+            bold_font = Font(name="仿宋", size=12, bold=True)
             fixed_cells = {
                 "A1", "A2", "C2", "E2", "A3", "A4", "A5",
                 "B3", "C3", "D3", "E3", "F3",
@@ -705,107 +793,63 @@ class ExcelCalcMixin:
             other_cm = (total_cm - first_cm) / 5
             cm_to_width = 4.0  # cm 转 Excel 列宽系数
             stats_ws.column_dimensions["A"].width = round(first_cm * cm_to_width, 2)
-            for col in ["B", "C", "D", "E", "F"]:
-                stats_ws.column_dimensions[col].width = round(other_cm * cm_to_width, 2)
+            for col_letter in ["B", "C", "D", "E", "F"]:
+                stats_ws.column_dimensions[col_letter].width = round(other_cm * cm_to_width, 2)
 
-            # 统计表样式
-            stat_align = Alignment(horizontal='center', vertical='center', wrap_text=True)
-            stat_border = Border(left=thin, right=thin, top=thin, bottom=thin)
             for r in stats_ws.iter_rows(min_row=1, max_row=stats_ws.max_row, min_col=1, max_col=stats_ws.max_column):
                 for cell in r:
-                    cell.alignment = stat_align
-                    cell.border = stat_border
-
+                    cell.alignment = cell_align
+                    cell.border = cell_border
             stats_ws.row_dimensions[3].height = 36
-            # EVAL_TABLE_5
+
+            return stats_ws, avg_score
+
+        def _build_eval_sheet(self, achievement: AchievementResult, eval_output_path: str):
+            """
+            表5：课程目标达成情况评价结果，保存工作簿并导出 Word 版本，本轮达成度记入 current_achievement
+            :param achievement: 目标×环节 分权重与实际得分的矩阵计算结果（与 Word 版本共用）
+            """
+            thin = Side(style='thin')
+            cell_align = Alignment(horizontal='center', vertical='center', wrap_text=True)
+            cell_border = Border(left=thin, right=thin, top=thin, bottom=thin)
+
             eval_wb = openpyxl.Workbook()
             eval_ws = eval_wb.active
-            eval_ws.title = "\u8bfe\u7a0b\u76ee\u6807\u8fbe\u6210\u60c5\u51b5\u8bc4\u4ef7\u7ed3\u679c"
-            eval_headers = [
-                "\u8bfe\u7a0b\u5206\u76ee\u6807",
-                "\u8003\u6838\u73af\u8282",
-                "\u5206\u6743\u91cd",
-                "\u5206\u503c/\u6ee1\u5206",
-                "\u5b66\u751f\u5b9e\u9645\u5f97\u5206\u5e73\u5747\u5206",
-                "\u5206\u76ee\u6807\u8fbe\u6210\u503c",
-                "\u4e0a\u4e00\u8f6e\u6559\u5b66\u5206\u76ee\u6807\u8fbe\u6210\u503c",
-            ]
-            eval_ws.append(eval_headers)
-
-            # \u8ba1\u7b97\u5404\u8003\u6838\u65b9\u5f0f\u5e73\u5747\u5206\uff08\u57fa\u4e8e\u5bfc\u5165\u6210\u7ee9\uff09
-            method_avgs = {}
-            for link in links:
-                for m in link.get("methods", []) or []:
-                    m_name = m.get("name")
-                    if not m_name:
-                        continue
-                    if m_name in df.columns:
-                        try:
-                            method_avgs[m_name] = float(df[m_name].mean())
-                        except Exception:
-                            method_avgs[m_name] = 0.0
-                    else:
-                        method_avgs[m_name] = 0.0
+            eval_ws.title = "课程目标达成情况评价结果"
+            eval_ws.append([
+                "课程分目标",
+                "考核环节",
+                "分权重",
+                "分值/满分",
+                "学生实际得分平均分",
+                "分目标达成值",
+                "上一轮教学分目标达成值",
+            ])
 
             prev_data = self.previous_achievement_data or {}
-            current_achievement = {}
-            total_obj_weight = 0.0
-            total_obj_actual = 0.0
+            current_achievement = achievement.achievement_dict()
+            target_weights = [[round(v, 2) for v in row] for row in achievement.target_weights.tolist()]
+            actual_scores = [[round(v, 2) for v in row] for row in achievement.actual_scores.tolist()]
 
             row_cursor = 2
-            for idx, obj_key in enumerate(obj_keys):
-                obj_name = f"\u8bfe\u7a0b\u76ee\u6807{idx + 1}"
+            for idx, obj_name in enumerate(achievement.obj_names):
                 obj_start = row_cursor
-                obj_weight_sum = 0.0
-                obj_actual_sum = 0.0
-
-                for link in links:
-                    link_name = link.get("name", "")
-                    if "\u5e73\u65f6" in link_name:
-                        display_link = "\u5e73\u65f6\u6210\u7ee9"
-                    elif "\u671f\u4e2d" in link_name:
-                        display_link = "\u671f\u4e2d\u8003\u6838"
-                    elif "\u671f\u672b" in link_name:
-                        display_link = "\u671f\u672b\u8003\u6838"
-                    else:
-                        display_link = link_name
-
-                    link_ratio = float(link.get("ratio", 0))
-                    methods = link.get("methods", []) or []
-
-                    support_sum = 0.0
-                    actual_sum = 0.0
-                    for m in methods:
-                        supports = m.get("supports", {}) or {}
-                        weight = float(supports.get(obj_key, 0))
-                        support_sum += weight
-                        m_name = m.get("name")
-                        m_avg = float(method_avgs.get(m_name, 0))
-                        actual_sum += m_avg * weight
-
-                    target_weight = link_ratio * 100.0 * support_sum
-                    actual_score = link_ratio * actual_sum
-
-                    obj_weight_sum += target_weight
-                    obj_actual_sum += actual_score
-
+                for l_idx, display_link in enumerate(achievement.link_names):
                     eval_ws.append([
                         obj_name if row_cursor == obj_start else "",
                         display_link,
-                        round(target_weight, 2),
+                        target_weights[idx][l_idx],
                         100,
-                        round(actual_score, 2),
+                        actual_scores[idx][l_idx],
                         "",
                         "",
                     ])
                     row_cursor += 1
 
-                achievement = round(obj_actual_sum / obj_weight_sum, 3) if obj_weight_sum > 0 else 0
-                current_achievement[obj_name] = achievement
                 prev_val = prev_data.get(obj_name, 0) if prev_data else 0
                 prev_val = 0 if prev_val is None else prev_val
 
-                eval_ws.cell(row=obj_start, column=6, value=achievement)
+                eval_ws.cell(row=obj_start, column=6, value=current_achievement[obj_name])
                 eval_ws.cell(row=obj_start, column=7, value=prev_val)
 
                 if row_cursor - 1 > obj_start:
@@ -813,12 +857,10 @@ class ExcelCalcMixin:
                     eval_ws.merge_cells(start_row=obj_start, start_column=6, end_row=row_cursor - 1, end_column=6)
                     eval_ws.merge_cells(start_row=obj_start, start_column=7, end_row=row_cursor - 1, end_column=7)
 
-                total_obj_weight += obj_weight_sum
-                total_obj_actual += obj_actual_sum
-
-            total_attainment = round(total_obj_actual / total_obj_weight, 3) if total_obj_weight > 0 else 0
-            current_achievement["总达成度"] = total_attainment
+            total_attainment = current_achievement["总达成度"]
             self.current_achievement = current_achievement
+
+            # 期望值：在上一轮与本轮达成值之间随机取值
             expected_attainment = 0.7
             prev_total = 0
             for key in ["课程目标达成值", "课程总目标", "课程总达成值", "total_value"]:
@@ -828,7 +870,7 @@ class ExcelCalcMixin:
             if prev_total and total_attainment:
                 low = min(prev_total, total_attainment)
                 high = max(prev_total, total_attainment)
-                expected_attainment = round(random.uniform(low, high), 3)
+                expected_attainment = round(float(self.reverse_engine.rng.uniform(low, high)), 3)
             else:
                 expected_attainment = total_attainment
 
@@ -839,16 +881,14 @@ class ExcelCalcMixin:
                 eval_ws.merge_cells(start_row=row_idx, start_column=1, end_row=row_idx, end_column=5)
                 eval_ws.merge_cells(start_row=row_idx, start_column=6, end_row=row_idx, end_column=7)
 
-            _append_summary("\u8bfe\u7a0b\u76ee\u6807\u8fbe\u6210\u503c", total_attainment)
-            _append_summary("\u8bfe\u7a0b\u76ee\u6807\u8fbe\u6210\u671f\u671b\u503c", expected_attainment)
-            _append_summary("\u4e0a\u4e00\u8f6e\u6559\u5b66\u8bfe\u7a0b\u76ee\u6807\u8fbe\u6210\u503c", None, prev_total)
+            _append_summary("课程目标达成值", total_attainment)
+            _append_summary("课程目标达成期望值", expected_attainment)
+            _append_summary("上一轮教学课程目标达成值", None, prev_total)
 
-            eval_align = Alignment(horizontal='center', vertical='center', wrap_text=True)
-            eval_border = Border(left=thin, right=thin, top=thin, bottom=thin)
             for r in eval_ws.iter_rows(min_row=1, max_row=eval_ws.max_row, min_col=1, max_col=eval_ws.max_column):
                 for cell in r:
-                    cell.alignment = eval_align
-                    cell.border = eval_border
+                    cell.alignment = cell_align
+                    cell.border = cell_border
 
             eval_ws.column_dimensions["A"].width = 14
             eval_ws.column_dimensions["B"].width = 12
@@ -858,33 +898,28 @@ class ExcelCalcMixin:
             eval_ws.column_dimensions["F"].width = 12
             eval_ws.column_dimensions["G"].width = 16
 
-            output_dir = get_outputs_dir()
-            safe_name = self._safe_filename(self.course_name_input.text())
-            detail_output_path = os.path.join(output_dir, f"{safe_name}\u6210\u7ee9\u660e\u7ec6.xlsx")
-            eval_output_path = os.path.join(output_dir, f"{safe_name}\u8bfe\u7a0b\u76ee\u6807\u8fbe\u6210\u60c5\u51b5\u8bc4\u4ef7\u7ed3\u679c.xlsx")
+            # ===== 保存 =====
             eval_wb.save(eval_output_path)
             try:
-                self._export_eval_result_docx(links, obj_keys, method_avgs, prev_data, total_attainment, expected_attainment, prev_total)
-            except Exception:
-                pass
-            wb.save(detail_output_path)
+                self._export_eval_result_docx(achievement, prev_data, total_attainment, expected_attainment, prev_total)
+            except Exception as e:
+                print(f"导出表5 Word失败: {e}")
 
-            return round(float(np.mean(total_scores)) if total_scores else 0.0, 2)
+            return eval_ws
 
-        def _generate_forward_score_table(self, students_method_scores: list, links: list) -> str:
+        def _generate_forward_score_table(self, result) -> str:
             """
             根据逆向推算的明细数据，生成二维正向成绩表。
             格式：行=学生，列=考核环节下的方法，带两行表头/合并单元格
             用于后期正向验证。
             
             Args:
-                students_method_scores: 学生方法级分数列表
-                    格式: [{"name": "张三", "method_scores": {"平时考核-作业": 85, ...}}, ...]
-                links: 关系表中的考核环节配置
+                result: 已计算的 ForwardCalculator（学生×方法 分数矩阵）
             
             Returns:
                 生成的Excel文件路径
             """
+            relation = result.relation
             wb = openpyxl.Workbook()
             ws = wb.active
             ws.title = "正向成绩表"
@@ -897,40 +932,19 @@ class ExcelCalcMixin:
             ws.cell(row=2, column=1, value="姓名")
             ws.merge_cells(start_row=1, start_column=1, end_row=2, end_column=1)
             
-            col = 2
-            method_col_map = {}  # 用于记录每个方法对应的列号，key为 "{link_name}||{method_name}"
-            
-            for link in links:
-                link_name = link.get("name", "")
-                methods = link.get("methods", []) or [{"name": "无"}]
-                start_col = col
-                
-                for method in methods:
-                    m_name = method.get("name", "无")
-                    ws.cell(row=2, column=col, value=m_name)
-                    # 使用 link_name-method_name 作为唯一key
-                    method_col_map[f"{link_name}||{m_name}"] = col
-                    col += 1
-                
-                end_col = col - 1
+            # 方法列与关系矩阵的方法顺序一致，第 j 个方法位于第 j+2 列
+            for j, m_name in enumerate(relation.method_names):
+                ws.cell(row=2, column=j + 2, value=m_name)
+            for l_idx, link_name in enumerate(relation.link_names):
+                method_idx = relation.link_methods(l_idx)
+                start_col, end_col = int(method_idx[0]) + 2, int(method_idx[-1]) + 2
                 ws.cell(row=1, column=start_col, value=link_name)
                 if end_col > start_col:
                     ws.merge_cells(start_row=1, start_column=start_col, end_row=1, end_column=end_col)
             
             # 填充学生数据
-            row_idx = 3
-            for student in students_method_scores:
-                name = student.get("name", "")
-                method_scores = student.get("method_scores", {})
-                
-                ws.cell(row=row_idx, column=1, value=name)
-                
-                # 填充各方法的分数
-                for key, col_num in method_col_map.items():
-                    score = method_scores.get(key, 0)
-                    ws.cell(row=row_idx, column=col_num, value=round(score, 1) if isinstance(score, (int, float)) else score)
-                
-                row_idx += 1
+            for name, scores in zip(result.names, np.round(result.method_scores, 1).tolist()):
+                ws.append([name] + scores)
             
             # 应用样式
             align = Alignment(horizontal='center', vertical='center', wrap_text=True)
@@ -947,48 +961,42 @@ class ExcelCalcMixin:
             
             # 调整列宽
             ws.column_dimensions['A'].width = 10
-            for c in range(2, col):
+            for c in range(2, relation.method_count + 2):
                 ws.column_dimensions[openpyxl.utils.get_column_letter(c)].width = 12
             
             # 保存文件
-            output_dir = get_outputs_dir()
+            output_dir = self._get_output_dir()
             safe_name = self._safe_filename(self.course_name_input.text())
             output_path = os.path.join(output_dir, f"{safe_name}正向成绩表（逆向生成）.xlsx")
+            self._record_random_seed(wb)
             wb.save(output_path)
             
             return output_path
 
-        def process_reverse_grades(self, spread_mode='medium', distribution='uniform'):
+        def process_reverse_grades(self, spread_mode='medium', distribution='uniform', table: Optional[ScoreTable] = None):
             """
             逆向成绩导入与生成明细
+            :param table: 已读取的列式成绩表；为空时按 input_file 类型（xlsx / CSV / Parquet）读取
             
             流程：
             1. 读取逆向模板（环节总分）
-            2. 逆向推算出方法级分数（使用 spread_mode 和 distribution）
-            3. 用方法级分数生成与正向一致的成绩明细表
+            2. 逆向推算出 学生×方法 分数矩阵（使用 spread_mode 和 distribution）
+            3. 用分数矩阵生成与正向一致的成绩明细表、表2、表5（与正向共用渲染）
             4. 生成二维正向成绩表（用于正向验证）
-            5. 生成表2（课程成绩统计）+ Word版
-            6. 生成表5（课程目标达成情况评价结果）+ 独立Excel + Word版
             """
+            # 每次运行重新登记报告文档，不沿用上一次运行（或上一门课程）的文档
+            self.report_documents = {}
+
             # ===== 第一步：读取和验证输入 =====
-            df_input = pd.read_excel(self.input_file)
-            df_input = df_input.fillna(0)
-            self._validate_reverse_headers(df_input)
+            if table is None:
+                table = self.load_input_table(forward=False)
+            self._validate_reverse_headers(table)
+            self._report_coercions(table)
 
             links = self._get_links()
             if not links:
                 raise ValueError("逆向模式必须先填写[课程考核与课程目标对应关系表]")
-
-            # 获取课程目标信息
-            obj_count = int(self.relation_payload.get("objectives_count", 0) or 0)
-            if obj_count <= 0:
-                obj_keys_set = set()
-                for link in links:
-                    for method in link.get("methods", []):
-                        obj_keys_set.update(method.get("supports", {}).keys())
-                obj_count = len(obj_keys_set)
-            obj_keys = [f"课程目标{i+1}" for i in range(obj_count)]
-            obj_headers = [f"目标{i+1}" for i in range(obj_count)]
+            relation = RelationMatrix(self.relation_payload)
 
             # ===== 第二步：逆向推算方法级分数 =====
             dist_map = {
@@ -1001,433 +1009,74 @@ class ExcelCalcMixin:
             }
             dist_type = dist_map.get(distribution, "normal")
 
-            # 存储每个学生的方法级分数
-            # 使用 {link_name}||{method_name} 作为key，避免同名方法冲突
-            students_method_scores = []
-
-            for _, row in df_input.iterrows():
-                name = row.get("姓名")
-                if pd.isna(name) or str(name).strip() == "":
-                    continue
-                
-                student_data = {"name": name, "method_scores": {}}
-
-                for link in links:
-                    link_name = link.get("name", "")
-                    link_score = row.get(link_name, 0)
-                    try:
-                        link_score = float(link_score)
-                    except Exception:
-                        link_score = 0.0
-
-                    methods = link.get("methods", []) or [{"name": "无", "subtotal": 1.0}]
-                    weights = [float(m.get("subtotal", 0)) for m in methods]
-                    weights = self._normalize_weights(weights)
-
-                    # 构建分布结构
-                    structure = {}
-                    for m, w in zip(methods, weights):
-                        structure[m.get("name", "无")] = {"weight": w, "type": dist_type}
-
-                    # 逆向推算 - 传入 spread_mode
-                    if structure and sum(weights) > 0:
-                        breakdown = self.reverse_engine.generate_breakdown(
-                            link_score,
-                            structure,
-                            noise_config=self.noise_config,
-                            spread_mode=spread_mode,  # 新增：传递 spread_mode
-                        )
-                    else:
-                        breakdown = {m.get("name", "无"): 0 for m in methods}
-
-                    # 记录方法级分数，使用 {link_name}||{method_name} 作为key
-                    for m in methods:
-                        m_name = m.get("name", "无")
-                        full_key = f"{link_name}||{m_name}"
-                        student_data["method_scores"][full_key] = breakdown.get(m_name, 0)
-
-                students_method_scores.append(student_data)
-
-            # ===== 第三步：生成与正向一致的成绩明细表 =====
-            wb = openpyxl.Workbook()
-            ws = wb.active
-            ws.title = "成绩明细"
-
-            header = ["姓名", "考核环节", "考核方式"] + obj_headers + ["小计", "合计", "等级"]
-            ws.append(header)
-
-            def format_link_label(name, ratio):
-                pct = int(round(ratio * 100))
-                if "考核" in name:
-                    base = name.replace("考核", "")
-                    return f"{base}\n考核\n({pct}%)"
-                return f"{name}\n({pct}%)"
-
-            def grade_label(score):
-                if score >= 90:
-                    return "优秀"
-                if score >= 80:
-                    return "良好"
-                if score >= 70:
-                    return "中等"
-                if score >= 60:
-                    return "及格"
-                return "不及格"
-
-            row_cursor = 2
-            total_scores = []
-            method_scores_all = {}  # 用于计算各方法的平均分
-
-            for student in students_method_scores:
-                name = student["name"]
-                method_scores = student["method_scores"]
-                
-                student_start = row_cursor
-                total_score = 0.0
-                total_obj_scores = [0.0 for _ in range(obj_count)]
-
-                for link in links:
-                    link_name = link.get("name", "")
-                    link_ratio = float(link.get("ratio", 0))
-                    methods = link.get("methods", []) or [{"name": "无", "supports": {}, "subtotal": 1.0}]
-
-                    link_label = format_link_label(link_name, link_ratio)
-                    link_start = row_cursor
-                    link_obj_scores = [0.0 for _ in range(obj_count)]
-                    link_score = 0.0
-
-                    for idx, m in enumerate(methods):
-                        m_name = m.get("name", "无")
-                        full_key = f"{link_name}||{m_name}"
-                        score = method_scores.get(full_key, 0)
-                        
-                        # 累积用于计算平均分（使用完整key）
-                        if full_key not in method_scores_all:
-                            method_scores_all[full_key] = []
-                        method_scores_all[full_key].append(score)
-
-                        supports = m.get("supports", {}) or {}
-                        support_vals = [float(supports.get(k, 0)) for k in obj_keys]
-                        obj_scores = [score * v for v in support_vals]
-
-                        for i, v in enumerate(obj_scores):
-                            link_obj_scores[i] += v
-
-                        method_weight = float(m.get("subtotal", 0))
-                        link_score += score * method_weight
-
-                        method_subtotal = sum(obj_scores)
-                        row_values = ["", link_label if row_cursor == link_start else "", m_name]
-                        row_values += [round(v, 2) for v in obj_scores]
-                        row_values += [round(method_subtotal, 2), "", ""]
-                        ws.append(row_values)
-                        row_cursor += 1
-
-                    # 环节合计行
-                    total_row = ["", link_label if row_cursor == link_start else "", "环节合计"]
-                    total_row += [round(v, 2) for v in link_obj_scores]
-                    total_row += ["", round(link_score, 2), ""]
-                    ws.append(total_row)
-                    row_cursor += 1
-
-                    ws.merge_cells(start_row=link_start, start_column=2, end_row=row_cursor - 1, end_column=2)
-
-                    total_score += link_score * link_ratio
-                    for i, v in enumerate(link_obj_scores):
-                        total_obj_scores[i] += v * link_ratio
-
-                grade = grade_label(total_score)
-                final_row = ["", "100%", "课程总评"]
-                final_row += [round(v, 2) for v in total_obj_scores]
-                final_row += ["", round(total_score, 2), grade]
-                ws.append(final_row)
-                row_cursor += 1
-
-                # 填充姓名和等级（合并单元格）
-                ws.cell(row=student_start, column=1, value=name)
-                grade_col = len(header)
-                ws.cell(row=student_start, column=grade_col, value=grade)
-
-                ws.merge_cells(start_row=student_start, start_column=1, end_row=row_cursor - 1, end_column=1)
-                ws.merge_cells(start_row=student_start, start_column=grade_col, end_row=row_cursor - 1, end_column=grade_col)
-                total_scores.append(total_score)
-
-            # 应用样式
-            align = Alignment(horizontal='center', vertical='center', wrap_text=True)
-            thin = Side(style='thin')
-            border = Border(left=thin, right=thin, top=thin, bottom=thin)
-            for r in ws.iter_rows(min_row=1, max_row=ws.max_row, min_col=1, max_col=ws.max_column):
-                for cell in r:
-                    cell.alignment = align
-                    cell.border = border
-
-            # ===== 第四步：生成表2（课程成绩统计） =====
-            stats_ws = wb.create_sheet(title="课程成绩统计")
-            total_count = len(total_scores)
-            max_score = round(max(total_scores), 2) if total_scores else 0
-            min_score = round(min(total_scores), 2) if total_scores else 0
-            avg_score = round(float(np.mean(total_scores)) if total_scores else 0.0, 2)
-
-            grade_bins = [
-                (90, 100, "优秀"),
-                (80, 89.999, "良好"),
-                (70, 79.999, "中等"),
-                (60, 69.999, "及格"),
-                (0, 59.999, "不及格"),
-            ]
-            counts = []
-            ratios = []
-            for lo, hi, _ in grade_bins:
-                c = sum(1 for s in total_scores if lo <= s <= hi)
-                counts.append(c)
-                ratios.append(round(c / total_count, 4) if total_count else 0)
-
-            def _fmt_ratio(val):
-                try:
-                    val = float(val)
-                except Exception:
-                    val = 0.0
-                pct = val * 100 if val <= 1 else val
-                if abs(pct - round(pct)) < 0.01:
-                    return f"{int(round(pct))}%"
-                return f"{pct:.2f}%"
-
-            composition_parts = []
+            # 按环节整列批量逆向推算，避免逐学生逐环节调用
+            # 每个环节只编译一次分解计划（按结构哈希缓存）
+            link_specs = []
             for link in links:
-                lname = link.get("name", "")
-                lratio = link.get("ratio", 0)
-                if lname:
-                    composition_parts.append(f"{lname}（{_fmt_ratio(lratio)}）")
-            composition_text = " + ".join(composition_parts)
-
-            stats_ws.append(["成绩构成", composition_text, "", "", "", ""])
-            stats_ws.merge_cells("B1:F1")
-            stats_ws.append(["最高成绩", max_score, "最低成绩", min_score, "平均成绩", avg_score])
-            stats_ws.append([
-                "成绩等级",
-                "90-100\n(优秀)",
-                "80-89\n(良好)",
-                "70-79\n(中等)",
-                "60-69\n(及格)",
-                "<60\n(不及格)",
-            ])
-            stats_ws.append(["人数"] + counts)
-            stats_ws.append(["占考核人数的比例"] + [f"{r*100:.2f}%" for r in ratios])
-
-            # 导出表2的Word版本
-            self._export_stats_docx(composition_text, max_score, min_score, avg_score, counts, ratios)
-
-            # 统计表样式
-            base_font = Font(name="仿宋", size=12)
-            bold_font = Font(name="仿宋", size=12, bold=True)
-            fixed_cells = {
-                "A1", "A2", "C2", "E2", "A3", "A4", "A5",
-                "B3", "C3", "D3", "E3", "F3",
-            }
-            for r in stats_ws.iter_rows(min_row=1, max_row=5, min_col=1, max_col=6):
-                for cell in r:
-                    cell.font = bold_font if cell.coordinate in fixed_cells else base_font
-
-            total_cm = 14.64
-            first_cm = 3.75
-            other_cm = (total_cm - first_cm) / 5
-            cm_to_width = 4.0
-            stats_ws.column_dimensions["A"].width = round(first_cm * cm_to_width, 2)
-            for col_letter in ["B", "C", "D", "E", "F"]:
-                stats_ws.column_dimensions[col_letter].width = round(other_cm * cm_to_width, 2)
-
-            stat_align = Alignment(horizontal='center', vertical='center', wrap_text=True)
-            stat_border = Border(left=thin, right=thin, top=thin, bottom=thin)
-            for r in stats_ws.iter_rows(min_row=1, max_row=stats_ws.max_row, min_col=1, max_col=stats_ws.max_column):
-                for cell in r:
-                    cell.alignment = stat_align
-                    cell.border = stat_border
-            stats_ws.row_dimensions[3].height = 36
-
-            # ===== 第五步：生成表5（课程目标达成情况评价结果） =====
-            # 计算各方法平均分（用于表5计算）
-            # method_avgs_full 使用 {link_name}||{method_name} 作为key，避免同名方法混算
-            method_avgs_full = {k: float(np.mean(v)) for k, v in method_scores_all.items()}
-
-            # 创建表5内容（嵌入到主工作簿）
-            eval_ws = wb.create_sheet(title="课程目标达成情况评价结果")
-            eval_headers = [
-                "课程分目标",
-                "考核环节",
-                "分权重",
-                "分值/满分",
-                "学生实际得分平均分",
-                "分目标达成值",
-                "上一轮教学分目标达成值",
-            ]
-            eval_ws.append(eval_headers)
-
-            prev_data = self.previous_achievement_data or {}
-            current_achievement = {}
-            total_obj_weight = 0.0
-            total_obj_actual = 0.0
-
-            eval_row_cursor = 2
-            for idx, obj_key in enumerate(obj_keys):
-                obj_name = f"课程目标{idx + 1}"
-                obj_start = eval_row_cursor
-                obj_weight_sum = 0.0
-                obj_actual_sum = 0.0
-
-                for link in links:
-                    link_name = link.get("name", "")
-                    if "平时" in link_name:
-                        display_link = "平时成绩"
-                    elif "期中" in link_name:
-                        display_link = "期中考核"
-                    elif "期末" in link_name:
-                        display_link = "期末考核"
-                    else:
-                        display_link = link_name
-
-                    link_ratio = float(link.get("ratio", 0))
-                    methods = link.get("methods", []) or []
-
-                    support_sum = 0.0
-                    actual_sum = 0.0
-                    for m in methods:
-                        supports = m.get("supports", {}) or {}
-                        weight = float(supports.get(obj_key, 0))
-                        support_sum += weight
-                        m_name = m.get("name")
-                        full_key = f"{link_name}||{m_name}"
-                        m_avg = float(method_avgs_full.get(full_key, 0))
-                        actual_sum += m_avg * weight
-
-                    target_weight = link_ratio * 100.0 * support_sum
-                    actual_score = link_ratio * actual_sum
-
-                    obj_weight_sum += target_weight
-                    obj_actual_sum += actual_score
-
-                    eval_ws.append([
-                        obj_name if eval_row_cursor == obj_start else "",
-                        display_link,
-                        round(target_weight, 2),
-                        100,
-                        round(actual_score, 2),
-                        "",
-                        "",
-                    ])
-                    eval_row_cursor += 1
-
-                achievement = round(obj_actual_sum / obj_weight_sum, 3) if obj_weight_sum > 0 else 0
-                current_achievement[obj_name] = achievement
-                prev_val = prev_data.get(obj_name, 0) if prev_data else 0
-                prev_val = 0 if prev_val is None else prev_val
-
-                eval_ws.cell(row=obj_start, column=6, value=achievement)
-                eval_ws.cell(row=obj_start, column=7, value=prev_val)
-
-                if eval_row_cursor - 1 > obj_start:
-                    eval_ws.merge_cells(start_row=obj_start, start_column=1, end_row=eval_row_cursor - 1, end_column=1)
-                    eval_ws.merge_cells(start_row=obj_start, start_column=6, end_row=eval_row_cursor - 1, end_column=6)
-                    eval_ws.merge_cells(start_row=obj_start, start_column=7, end_row=eval_row_cursor - 1, end_column=7)
-
-                total_obj_weight += obj_weight_sum
-                total_obj_actual += obj_actual_sum
-
-            # 计算总达成度
-            total_attainment = round(total_obj_actual / total_obj_weight, 3) if total_obj_weight > 0 else 0
-            current_achievement["总达成度"] = total_attainment
-            self.current_achievement = current_achievement
-            
-            # 计算期望值
-            expected_attainment = 0.7
-            prev_total = 0
-            for key in ["课程目标达成值", "课程总目标", "课程总达成值", "total_value"]:
-                if key in prev_data:
-                    prev_total = prev_data.get(key, 0) or 0
-                    break
-            if prev_total and total_attainment:
-                low = min(prev_total, total_attainment)
-                high = max(prev_total, total_attainment)
-                expected_attainment = round(random.uniform(low, high), 3)
+                link_name = link.get("name", "")
+                link_totals = table.column(link_name)
+                if link_totals is None:
+                    link_totals = np.zeros(len(table), dtype=float)
+
+                methods = link.get("methods", []) or [{"name": "无", "subtotal": 1.0}]
+                weights = [float(m.get("subtotal", 0)) for m in methods]
+                weights = self._normalize_weights(weights)
+
+                # 构建分布结构
+                structure = {}
+                for m, w in zip(methods, weights):
+                    structure[m.get("name", "无")] = {"weight": w, "type": dist_type}
+
+                plan = None
+                if structure and sum(weights) > 0:
+                    plan = self.reverse_engine.compile_plan(structure, self.noise_config, spread_mode)
+                link_specs.append((link_name, methods, link_totals, plan))
+
+            planned = [spec for spec in link_specs if spec[3] is not None]
+            matrices = {}
+            if self.method_correlation is not None and planned:
+                # 相关潜在能力模式：整班所有环节一次相关采样
+                print(f"[相关模式] 方法相关矩阵: {np.shape(self.method_correlation)}")
+                results = self.reverse_engine.generate_correlated_breakdown(
+                    np.column_stack([spec[2] for spec in planned]),
+                    [spec[3] for spec in planned],
+                    correlation=self.method_correlation,
+                    score_step=self.score_step,
+                )
+                for spec, matrix, noise_rows in zip(planned, results, self.reverse_engine.last_noise_rows_by_link):
+                    matrices[id(spec)] = matrix
+                    if spec[3].noise_ratio > 0:
+                        print(f"[噪声注入] {spec[0]}: {noise_rows.size} 人")
             else:
-                expected_attainment = total_attainment
-
-            def _append_summary(label, value=None, prev=None):
-                display_val = value if value is not None else (prev if prev is not None else 0)
-                eval_ws.append([label, "", "", "", "", display_val, ""])
-                row_idx = eval_ws.max_row
-                eval_ws.merge_cells(start_row=row_idx, start_column=1, end_row=row_idx, end_column=5)
-                eval_ws.merge_cells(start_row=row_idx, start_column=6, end_row=row_idx, end_column=7)
-
-            _append_summary("课程目标达成值", total_attainment)
-            _append_summary("课程目标达成期望值", expected_attainment)
-            _append_summary("上一轮教学课程目标达成值", None, prev_total)
-
-            # 表5样式
-            eval_align = Alignment(horizontal='center', vertical='center', wrap_text=True)
-            eval_border = Border(left=thin, right=thin, top=thin, bottom=thin)
-            for r in eval_ws.iter_rows(min_row=1, max_row=eval_ws.max_row, min_col=1, max_col=eval_ws.max_column):
-                for cell in r:
-                    cell.alignment = eval_align
-                    cell.border = eval_border
-
-            eval_ws.column_dimensions["A"].width = 14
-            eval_ws.column_dimensions["B"].width = 12
-            eval_ws.column_dimensions["C"].width = 10
-            eval_ws.column_dimensions["D"].width = 12
-            eval_ws.column_dimensions["E"].width = 18
-            eval_ws.column_dimensions["F"].width = 12
-            eval_ws.column_dimensions["G"].width = 16
+                # 每个环节使用由运行种子派生的独立随机流，结果可按种子复现
+                link_engines = self.reverse_engine.spawn(len(link_specs))
+                for spec, link_engine in zip(link_specs, link_engines):
+                    if spec[3] is None:
+                        continue
+                    matrices[id(spec)] = link_engine.generate_breakdown_batch(spec[2], spec[3], score_step=self.score_step)
+                    if spec[3].noise_ratio > 0:
+                        print(f"[噪声注入] {spec[0]}: {link_engine.last_noise_rows.size} 人")
+
+            # 各环节分解结果按关系矩阵的方法顺序拼成 学生×方法 分数矩阵
+            scores = np.zeros((len(table), relation.method_count), dtype=float)
+            for l_idx, spec in enumerate(link_specs):
+                plan = spec[3]
+                if plan is None:
+                    continue
+                col_index = {name: j for j, name in enumerate(plan.names)}
+                for j in relation.link_methods(l_idx):
+                    col = col_index.get(relation.method_names[j])
+                    if col is not None:
+                        scores[:, j] = matrices[id(spec)][:, col]
 
-            # ===== 第六步：保存所有文件 =====
-            output_dir = get_outputs_dir()
-            safe_name = self._safe_filename(self.course_name_input.text())
-            
-            # 1. 保存主Excel（成绩明细 + 统计表 + 达成度评价结果）
-            output_path = os.path.join(output_dir, f"{safe_name}成绩明细（逆向）.xlsx")
-            wb.save(output_path)
+            # ===== 第三步：成绩明细、表2、表5（与正向共用渲染） =====
+            result = ForwardCalculator(table, relation).compute(table.names.tolist(), scores)
+            avg_score = self._render_grade_outputs(result, suffix="（逆向）", embed_eval=True)
 
-            # 2. 生成二维正向成绩表（用于正向验证）
+            # ===== 第四步：生成二维正向成绩表（用于正向验证） =====
             try:
-                self._generate_forward_score_table(students_method_scores, links)
+                self._generate_forward_score_table(result)
             except Exception as e:
                 print(f"生成正向成绩表失败: {e}")
 
-            # 3. 生成独立的表5 Excel文件（与正向保持一致）
-            try:
-                eval_wb = openpyxl.Workbook()
-                eval_ws_standalone = eval_wb.active
-                eval_ws_standalone.title = "课程目标达成情况评价结果"
-                
-                # 复制表5内容到独立文件
-                for row in eval_ws.iter_rows(values_only=True):
-                    eval_ws_standalone.append(row)
-                
-                # 应用样式
-                for r in eval_ws_standalone.iter_rows(min_row=1, max_row=eval_ws_standalone.max_row, min_col=1, max_col=7):
-                    for cell in r:
-                        cell.alignment = eval_align
-                        cell.border = eval_border
-                
-                eval_ws_standalone.column_dimensions["A"].width = 14
-                eval_ws_standalone.column_dimensions["B"].width = 12
-                eval_ws_standalone.column_dimensions["C"].width = 10
-                eval_ws_standalone.column_dimensions["D"].width = 12
-                eval_ws_standalone.column_dimensions["E"].width = 18
-                eval_ws_standalone.column_dimensions["F"].width = 12
-                eval_ws_standalone.column_dimensions["G"].width = 16
-                
-                eval_output_path = os.path.join(output_dir, f"{safe_name}课程目标达成情况评价结果（逆向）.xlsx")
-                eval_wb.save(eval_output_path)
-            except Exception as e:
-                print(f"生成独立表5 Excel失败: {e}")
-
-            # 4. 导出表5的Word版本
-            try:
-                self._export_eval_result_docx(
-                    links, obj_keys, method_avgs_full, prev_data,
-                    total_attainment, expected_attainment, prev_total
-                )
-            except Exception as e:
-                print(f"导出表5 Word失败: {e}")
-
-            return round(float(np.mean(total_scores)) if total_scores else 0.0, 2)
+            return avg_score
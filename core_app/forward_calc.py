@@ -1,9 +1,271 @@
+import numpy as np
+import pandas as pd
+
+from io_app.score_table import ScoreTable
+
+
+class RelationMatrix:
+    """
+    课程考核与课程目标对应关系的矩阵形式（由关系表 payload 编译一次）
+    - supports: 方法×目标 支撑矩阵，形状 (M, K)
+    - subtotals: 各方法在所属环节内的小计权重，形状 (M,)
+    - link_ratios: 各环节占总评比例，形状 (L,)
+    - link_of_method: 各方法所属环节下标，形状 (M,)
+    方法按环节顺序展开；没有方法的环节补一个“无”方法（无支撑、小计为1），与明细表一致。
+    """
+
+    def __init__(self, payload: dict):
+        payload = payload or {}
+        links = payload.get("links", []) or []
+
+        obj_count = int(payload.get("objectives_count", 0) or 0)
+        if obj_count <= 0:
+            obj_keys = set()
+            for link in links:
+                for method in link.get("methods", []):
+                    obj_keys.update(method.get("supports", {}).keys())
+            obj_count = len(obj_keys)
+        self.obj_keys = [f"课程目标{i+1}" for i in range(obj_count)]
+
+        self.links = links
+        self.link_names = [link.get("name", "") for link in links]
+        self.link_ratios = np.array([float(link.get("ratio", 0)) for link in links], dtype=float)
+
+        method_names = []
+        link_of_method = []
+        subtotals = []
+        supports = []
+        # 环节是否有真实方法（评价表中空环节不参与目标支撑）
+        self.link_has_methods = []
+        for l_idx, link in enumerate(links):
+            methods = link.get("methods", []) or []
+            self.link_has_methods.append(bool(methods))
+            if not methods:
+                methods = [{"name": "无", "supports": {}, "subtotal": 1.0}]
+            for m in methods:
+                method_names.append(m.get("name", "无"))
+                link_of_method.append(l_idx)
+                subtotals.append(float(m.get("subtotal", 0)))
+                m_supports = m.get("supports", {}) or {}
+                supports.append([float(m_supports.get(k, 0)) for k in self.obj_keys])
+
+        self.method_names = method_names
+        self.link_of_method = np.array(link_of_method, dtype=int)
+        self.subtotals = np.array(subtotals, dtype=float)
+        self.supports = np.array(supports, dtype=float).reshape(len(method_names), obj_count)
+        # 方法→环节 0/1 归属矩阵，形状 (M, L)
+        self.membership = np.zeros((len(method_names), len(links)), dtype=float)
+        self.membership[np.arange(len(method_names)), self.link_of_method] = 1.0
+
+    @property
+    def method_count(self) -> int:
+        return len(self.method_names)
+
+    @property
+    def objective_count(self) -> int:
+        return len(self.obj_keys)
+
+    def link_methods(self, l_idx: int) -> np.ndarray:
+        """第 l_idx 个环节的方法下标"""
+        return np.flatnonzero(self.link_of_method == l_idx)
+
+    def keyed_method_values(self, values) -> dict:
+        """按 {link_name}||{method_name} 组织各方法的值（只含真实方法，供评价表使用）"""
+        return {
+            f"{self.link_names[l_idx]}||{name}": float(v)
+            for name, v, l_idx in zip(self.method_names, values, self.link_of_method)
+            if name and self.link_has_methods[l_idx]
+        }
+
+
 class ForwardCalculator:
-    """正向计算占位实现，后续替换为 Step 1-5 逻辑"""
+    """
+    正向达成度矩阵计算：学生×方法 分数矩阵与关系矩阵相乘，一次得到全部学生的
+    方法目标分、环节目标分、环节得分、课程总评与各目标总分
+    """
 
     def __init__(self, student_df, config):
+        """
+        :param student_df: 正向模板读取的成绩表（首列为“姓名”，其余列以考核方式命名），
+                           DataFrame 或列式 ScoreTable
+        :param config: 关系表 payload，或已编译的 RelationMatrix
+        """
         self.student_df = student_df
         self.config = config
+        self.relation = config if isinstance(config, RelationMatrix) else RelationMatrix(config)
 
     def run(self):
-        raise NotImplementedError("正向计算逻辑尚未实现")
+        """从成绩表读取分数并计算，结果保存在实例属性上并返回自身"""
+        rel = self.relation
+        df = self.student_df
+        if isinstance(df, ScoreTable):
+            # 列式成绩表：按考核方式表头直接取分数矩阵
+            return self.compute(df.names.tolist(), df.take(rel.method_names))
+
+        names = df["姓名"] if "姓名" in df.columns else pd.Series([""] * len(df), index=df.index)
+        valid = (names.notna() & (names.astype(str).str.strip() != "")).to_numpy(dtype=bool)
+
+        # 学生×方法 分数矩阵：按方法名取列，无法转为数字的单元格记 0
+        scores = np.zeros((int(valid.sum()), rel.method_count), dtype=float)
+        columns = {}
+        for j, m_name in enumerate(rel.method_names):
+            if m_name not in df.columns:
+                continue
+            if m_name not in columns:
+                columns[m_name] = pd.to_numeric(df[m_name], errors="coerce").fillna(0.0).to_numpy(dtype=float)[valid]
+            scores[:, j] = columns[m_name]
+        return self.compute(names[valid].tolist(), scores)
+
+    def compute(self, names, scores):
+        """
+        由 学生×方法 分数矩阵直接计算（逆向模式由分解结果直接调用）
+        :param names: 学生姓名列表，长度 n
+        :param scores: 分数矩阵，形状 (n, M)，列顺序与 relation.method_names 一致
+        """
+        rel = self.relation
+        self.names = list(names)
+        scores = np.asarray(scores, dtype=float).reshape(len(self.names), rel.method_count)
+        self.method_scores = scores
+
+        # 环节目标分 (n, L, K)、环节得分 (n, L)
+        self.link_obj_scores = np.einsum("nm,ml,mk->nlk", scores, rel.membership, rel.supports)
+        self.link_scores = scores @ (rel.membership * rel.subtotals[:, None])
+        # 课程总评 (n,) 与各目标总分 (n, K)
+        self.total_scores = self.link_scores @ rel.link_ratios
+        self.total_obj_scores = np.einsum("nlk,l->nk", self.link_obj_scores, rel.link_ratios)
+        # 各方法全班平均分 (M,)
+        self.method_means = scores.mean(axis=0) if len(scores) else np.zeros(rel.method_count)
+        return self
+
+    def method_obj_scores(self, student: int) -> np.ndarray:
+        """单个学生各方法按目标支撑分配后的分数，形状 (M, K)"""
+        return self.method_scores[student][:, None] * self.relation.supports
+
+    def method_averages(self) -> dict:
+        """全班各方法平均分，key 为 {link_name}||{method_name}（供评价表使用）"""
+        return self.relation.keyed_method_values(self.method_means)
+
+
+# 课程成绩统计表的等级区间（闭区间，与表2表头一致）
+GRADE_BINS = [
+    (90, 100, "优秀"),
+    (80, 89.999, "良好"),
+    (70, 79.999, "中等"),
+    (60, 69.999, "及格"),
+    (0, 59.999, "不及格"),
+]
+
+
+def grade_bin_index(total_scores) -> np.ndarray:
+    """各学生课程总评所在等级区间下标，不落在任何区间时为 -1"""
+    totals = np.asarray(total_scores, dtype=float)
+    index = np.full(totals.shape, -1, dtype=int)
+    for b, (lo, hi, _) in reversed(list(enumerate(GRADE_BINS))):
+        index[(totals >= lo) & (totals <= hi)] = b
+    return index
+
+
+class GradeAggregates:
+    """
+    全班汇总量的运行累计：各方法分数和、课程总评和、各等级人数
+    增量更新时只按变化学生的新旧差值调整，不重新扫描全班
+    """
+
+    def __init__(self, relation: RelationMatrix, method_sums, total_scores, grade_counts=None):
+        self.relation = relation
+        self.total_scores = np.array(total_scores, dtype=float)
+        self.count = self.total_scores.size
+        self.method_sums = np.array(method_sums, dtype=float)
+        self.total_sum = float(self.total_scores.sum())
+        if grade_counts is None:
+            grade_counts = self._bin_counts(self.total_scores)
+        self.grade_counts = np.array(grade_counts, dtype=int)
+
+    @classmethod
+    def from_result(cls, result: "ForwardCalculator") -> "GradeAggregates":
+        return cls(result.relation, result.method_scores.sum(axis=0), result.total_scores)
+
+    @staticmethod
+    def _bin_counts(total_scores) -> np.ndarray:
+        index = grade_bin_index(total_scores)
+        return np.bincount(index[index >= 0], minlength=len(GRADE_BINS))
+
+    def update(self, rows, old_scores, new_scores, new_totals):
+        """
+        按变化学生更新累计量
+        :param rows: 变化学生的行号
+        :param old_scores: 这些学生原 学生×方法 分数，形状 (k, M)
+        :param new_scores: 新分数，形状 (k, M)
+        :param new_totals: 新课程总评，形状 (k,)
+        """
+        rows = np.asarray(rows, dtype=int)
+        new_totals = np.asarray(new_totals, dtype=float)
+        old_totals = self.total_scores[rows]
+        self.method_sums += (np.asarray(new_scores, dtype=float) - np.asarray(old_scores, dtype=float)).sum(axis=0)
+        self.total_sum += float(new_totals.sum() - old_totals.sum())
+        self.grade_counts += self._bin_counts(new_totals) - self._bin_counts(old_totals)
+        self.total_scores[rows] = new_totals
+
+    @property
+    def method_means(self) -> np.ndarray:
+        return self.method_sums / self.count if self.count else np.zeros_like(self.method_sums)
+
+    @property
+    def average(self) -> float:
+        return self.total_sum / self.count if self.count else 0.0
+
+    @property
+    def grade_ratios(self) -> list:
+        return [round(int(c) / self.count, 4) if self.count else 0 for c in self.grade_counts]
+
+
+def display_link_name(link_name: str) -> str:
+    """评价表（表5）中的考核环节名称：平时 / 期中 / 期末 环节使用统一名称"""
+    if "平时" in link_name:
+        return "平时成绩"
+    if "期中" in link_name:
+        return "期中考核"
+    if "期末" in link_name:
+        return "期末考核"
+    return link_name
+
+
+class AchievementResult:
+    """
+    表5（课程目标达成情况评价结果）的矩阵计算，xlsx 与 Word 两种输出共用同一结果
+    - target_weights: 目标×环节 分权重，link_ratio ⊙ (supportsᵀ · 归属矩阵) × 100，形状 (K, L)
+    - actual_scores: 目标×环节 学生实际得分平均分，link_ratio ⊙ (supportsᵀ · 方法平均分)，形状 (K, L)
+    - objective_achievements: 各目标达成值（未取整），形状 (K,)
+    - total_attainment: 课程目标达成值（未取整）
+    """
+
+    def __init__(self, relation: RelationMatrix, method_means):
+        self.relation = relation
+        self.obj_names = list(relation.obj_keys)
+        self.link_names = [display_link_name(name) for name in relation.link_names]
+
+        # 未命名的方法不参与实际得分（与按 {link_name}||{method_name} 取平均分一致）
+        named = np.array([bool(name) for name in relation.method_names], dtype=bool)
+        means = np.where(named, np.asarray(method_means, dtype=float), 0.0)
+        supports_t = relation.supports.T
+        self.target_weights = supports_t @ relation.membership * (relation.link_ratios * 100.0)
+        self.actual_scores = supports_t @ (relation.membership * means[:, None]) * relation.link_ratios
+
+        self.objective_weights = self.target_weights.sum(axis=1)
+        self.objective_actuals = self.actual_scores.sum(axis=1)
+        self.objective_achievements = np.divide(
+            self.objective_actuals, self.objective_weights,
+            out=np.zeros_like(self.objective_actuals), where=self.objective_weights > 0,
+        )
+        total_weight = float(self.objective_weights.sum())
+        self.total_attainment = float(self.objective_actuals.sum()) / total_weight if total_weight > 0 else 0.0
+
+    @classmethod
+    def from_aggregates(cls, aggregates: GradeAggregates) -> "AchievementResult":
+        return cls(aggregates.relation, aggregates.method_means)
+
+    def achievement_dict(self) -> dict:
+        """本轮达成度 {课程目标i: 值, 总达成度: 值}（保留3位小数）"""
+        values = {name: round(float(v), 3) for name, v in zip(self.obj_names, self.objective_achievements)}
+        values["总达成度"] = round(self.total_attainment, 3)
+        return values
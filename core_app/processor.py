@@ -9,7 +9,7 @@ from openpyxl.styles import Alignment, PatternFill, Font, Border, Side
 import openpyxl
 from openpyxl.utils.dataframe import dataframe_to_rows
 from apply_noise import GradeReverseEngine
-from utils import normalize_score, get_grade_level, calculate_final_score, calculate_achievement_level, adjust_column_widths
+from utils import normalize_score, get_grade_level, calculate_final_score, calculate_achievement_level, adjust_column_widths, get_outputs_dir
 import time
 import random
 from docx import Document
@@ -41,12 +41,74 @@ class GradeProcessor(AIReportMixin, WordExportMixin, ExcelCalcMixin):
             self.api_key = None
             self.relation_payload = relation_payload or {}
             self.noise_config = None
+            self.score_step = None
+            self.method_correlation = None
+            self.output_dir = None
+            # 本次运行生成的报告文档 {模板占位符: Document}，拼接报告时直接使用
+            self.report_documents = {}
             self.reverse_engine = GradeReverseEngine()
 
         def set_noise_config(self, config: dict):
             """\u8bbe\u7f6e\u566a\u58f0\u914d\u7f6e"""
             self.noise_config = config or None
 
+        def set_score_step(self, step: Optional[float] = None):
+            """设置逆向分数网格（1、0.5 或 0.1 分）；None 表示保留1位小数"""
+            if step not in (None, 1, 0.5, 0.1):
+                raise ValueError("分数网格只能为 1、0.5 或 0.1")
+            self.score_step = step
+
+        def set_method_correlation(self, correlation=None):
+            """
+            设置相关潜在能力模式（仅支持正态分布）：方法相关矩阵（按环节顺序排列全部方法）；
+            None 表示各环节独立生成。环节总分固定，标量相关系数会被环节内投影抵消，不再接受
+            """
+            if correlation is not None and np.ndim(correlation) != 2:
+                raise ValueError("方法相关需为方法相关矩阵（按环节顺序排列全部方法），不支持标量相关系数")
+            self.method_correlation = correlation
+
+        def set_random_seed(self, seed: Optional[int] = None):
+            """设置运行种子（相同种子 + 相同输入可逐位复现逆向结果）"""
+            self.reverse_engine = GradeReverseEngine(seed)
+
+        def set_output_dir(self, output_dir: Optional[str] = None):
+            """设置输出目录（命令行/批量运行时每门课程独立）；None 表示应用根目录下的 outputs"""
+            self.output_dir = output_dir or None
+
+        def _get_output_dir(self) -> str:
+            """本次运行的输出目录"""
+            if self.output_dir:
+                os.makedirs(self.output_dir, exist_ok=True)
+                return self.output_dir
+            return get_outputs_dir()
+
+        def _register_report_document(self, placeholder: str, doc, path):
+            """
+            登记已生成并保存的报告文档，ReportBuilder 拼接时不再从输出目录重新读取
+            :param path: 文档保存路径；记录保存后的大小与修改时间，用于判断文件是否又被改动
+            """
+            stat = os.stat(path)
+            self.report_documents[placeholder] = (doc, str(path), (stat.st_size, stat.st_mtime_ns))
+
+        def take_report_documents(self) -> dict:
+            """
+            取出已登记的报告文档交给 ReportBuilder（拼接时正文被移走，取出后不再保留）
+            保存后又被编辑、替换或删除的文档不使用内存版本，由 ReportBuilder 从输出目录读取磁盘上的文件
+            """
+            documents, self.report_documents = self.report_documents, {}
+            current = {}
+            for placeholder, (doc, path, key) in documents.items():
+                try:
+                    stat = os.stat(path)
+                    unchanged = (stat.st_size, stat.st_mtime_ns) == key
+                except OSError:
+                    unchanged = False
+                if unchanged:
+                    current[placeholder] = doc
+                else:
+                    print(f"[报告拼接] {os.path.basename(path)} 保存后已改动，改为读取磁盘上的文件")
+            return current
+
         def set_relation_payload(self, payload: dict):
             """\u8bbe\u7f6e\u8bfe\u7a0b\u8003\u6838\u4e0e\u76ee\u6807\u5bf9\u5e94\u5173\u7cfb"""
             self.relation_payload = payload or {}
@@ -4,27 +4,57 @@ ReportBuilder - 用于将多个Word文档拼接到模板中
 import os
 import glob
 from docx import Document
-from copy import deepcopy
+from docx.text.paragraph import Paragraph
 from datetime import datetime
-from utils import get_outputs_dir
+
+from core_app.docx_splice import DocumentSplicer
+from core_app.report_template import compile_template
 
 
 class ReportBuilder:
     """报告构建器 - 将多个Word文档内容合并到模板中"""
+
+    # 定义要插入的文档（使用下划线格式，匹配函数会智能处理）
+    DOC_MAPPINGS = {
+        '{{INSERT_DOC_1}}': '1_课程基本信息表.docx',
+        '{{INSERT_DOC_2}}': '2_课程成绩统计表.docx',
+        '{{INSERT_DOC_3}}': '3_课程目标与毕业要求的对应关系表.docx',
+        '{{INSERT_DOC_4}}': '4_课程考核与课程目标对应关系表.docx',
+        '{{INSERT_DOC_5}}': '5_基于考核结果的课程目标达成情况评价结果表.docx',
+        '{{INSERT_DOC_6}}': '6_课程目标达成情况分析_存在问题及改进措施表.docx'
+    }
     
-    def __init__(self, template_path, output_dir):
+    def __init__(self, template_path, output_dir, documents=None):
         """
         初始化报告构建器
         
         Args:
             template_path: 模板文件路径
             output_dir: 输出目录
+            documents: 本次运行已在内存中生成的文档 {占位符: Document 或正文元素列表}
         """
         self.template_path = template_path
         self.output_dir = output_dir
+        self.documents = {}
         
         if not os.path.exists(output_dir):
             os.makedirs(output_dir)
+
+        for placeholder, document in (documents or {}).items():
+            self.register_document(placeholder, document)
+
+    def register_document(self, placeholder, document):
+        """
+        登记内存中的文档，拼接时直接使用，不再从输出目录查找并重新解析
+        （文档正文会被移入报告，登记后不应再使用该文档）
+
+        Args:
+            placeholder: 模板占位符（如 "{{INSERT_DOC_2}}"）
+            document: python-docx Document，或其正文元素列表
+        """
+        if placeholder not in self.DOC_MAPPINGS:
+            raise ValueError(f"未知的文档占位符: {placeholder}")
+        self.documents[placeholder] = document
     
     def build(self, course_open_info, course_basic_info, achievement_data):
         """
@@ -38,14 +68,15 @@ class ReportBuilder:
         Returns:
             str: 输出文件路径
         """
-        # 加载模板
-        doc = Document(self.template_path)
+        # 加载模板（按内容哈希复用已编译的模板，占位符位置已记录）
+        template = compile_template(self.template_path)
+        doc, text_runs, insert_paragraphs = template.new_document()
         
         # 1. 替换基本文本占位符
-        self._replace_text_placeholders(doc, course_open_info, course_basic_info)
+        self._replace_text_placeholders(text_runs, course_open_info, course_basic_info)
         
         # 2. 插入各个文档的内容
-        self._insert_documents(doc)
+        self._insert_documents(doc, insert_paragraphs)
         
         # 3. 保存输出文件
         output_path = self._generate_output_path(course_open_info)
@@ -53,8 +84,13 @@ class ReportBuilder:
         
         return output_path
     
-    def _replace_text_placeholders(self, doc, course_open_info, course_basic_info):
-        """替换文本占位符"""
+    def _replace_text_placeholders(self, text_runs, course_open_info, course_basic_info):
+        """
+        替换文本占位符
+        
+        Args:
+            text_runs: 编译模板时记录的 [(run 元素, 其中的占位符), ...]
+        """
         # 获取当前日期
         now = datetime.now()
         
@@ -69,25 +105,12 @@ class ReportBuilder:
             '{{report_date}}': f"{now.year} 年 {now.month} 月"
         }
         
-        # 替换段落中的占位符
-        for para in doc.paragraphs:
-            for key, value in replacements.items():
-                if key in para.text:
-                    inline = para.runs
-                    for run in inline:
-                        if key in run.text:
-                            run.text = run.text.replace(key, value)
-        
-        # 替换表格中的占位符
-        for table in doc.tables:
-            for row in table.rows:
-                for cell in row.cells:
-                    for para in cell.paragraphs:
-                        for key, value in replacements.items():
-                            if key in para.text:
-                                for run in para.runs:
-                                    if key in run.text:
-                                        run.text = run.text.replace(key, value)
+        for run, keys in text_runs:
+            text = run.text
+            for key in keys:
+                if key in replacements:
+                    text = text.replace(key, replacements[key])
+            run.text = text
     
     def _find_doc_by_prefix(self, outputs_dir, prefix_pattern):
         """
@@ -154,12 +177,17 @@ class ReportBuilder:
         
         return None
     
-    def _insert_documents(self, doc):
-        """在模板中插入各个文档的内容"""
-        # 获取outputs目录（统一到应用根目录）
-        outputs_dir = get_outputs_dir()
+    def _insert_documents(self, doc, insert_paragraphs):
+        """
+        在模板中插入各个文档的内容（优先使用已登记的内存文档，其余从输出目录查找）
+        
+        Args:
+            insert_paragraphs: 编译模板时记录的 [(段落元素, 占位符), ...]，按文档顺序
+        """
+        outputs_dir = self.output_dir
         
         print(f"\n{'='*60}")
+        print(f"[ReportBuilder] 内存文档: {', '.join(sorted(self.documents)) or '无'}")
         print(f"[ReportBuilder] 查找文档目录: {outputs_dir}")
         print(f"[ReportBuilder] 目录存在: {os.path.exists(outputs_dir)}")
         
@@ -171,82 +199,79 @@ class ReportBuilder:
                     print(f"  - {f}")
         print(f"{'='*60}\n")
         
-        # 定义要插入的文档（使用下划线格式，匹配函数会智能处理）
-        doc_mappings = {
-            '{{INSERT_DOC_1}}': '1_课程基本信息表.docx',
-            '{{INSERT_DOC_2}}': '2_课程成绩统计表.docx',
-            '{{INSERT_DOC_3}}': '3_课程目标与毕业要求的对应关系表.docx',
-            '{{INSERT_DOC_4}}': '4_课程考核与课程目标对应关系表.docx',
-            '{{INSERT_DOC_5}}': '5_基于考核结果的课程目标达成情况评价结果表.docx',
-            '{{INSERT_DOC_6}}': '6_课程目标达成情况分析_存在问题及改进措施表.docx'
-        }
-        
         # 收集需要处理的段落（从后往前处理，避免索引混乱）
         paragraphs_to_process = []
-        for i, para in enumerate(doc.paragraphs):
-            for placeholder, prefix in doc_mappings.items():
-                if placeholder in para.text:
-                    print(f"[占位符 {placeholder}]")
-                    print(f"  查找模式: {prefix}")
-                    # 使用智能匹配查找文档
-                    doc_path = self._find_doc_by_prefix(outputs_dir, prefix)
-                    filename = os.path.basename(doc_path) if doc_path else f"{prefix}"
-                    paragraphs_to_process.append((i, para, placeholder, doc_path, filename))
-                    
-                    if doc_path:
-                        print(f"  ✓ 找到文件: {filename}")
-                    else:
-                        print(f"  ✗ 未找到文件")
-                    print()
+        for i, (p_element, placeholder) in enumerate(insert_paragraphs):
+            para = Paragraph(p_element, doc._body)
+            prefix = self.DOC_MAPPINGS.get(placeholder)
+            if not prefix:
+                continue
+            print(f"[占位符 {placeholder}]")
+            if placeholder in self.documents:
+                # 内存文档的正文会被移入报告，只能使用一次
+                print(f"  ✓ 使用内存文档")
+                print()
+                paragraphs_to_process.append((i, para, placeholder, self.documents.pop(placeholder), prefix))
+                continue
+            print(f"  查找模式: {prefix}")
+            # 使用智能匹配查找文档
+            doc_path = self._find_doc_by_prefix(outputs_dir, prefix)
+            filename = os.path.basename(doc_path) if doc_path else f"{prefix}"
+            paragraphs_to_process.append((i, para, placeholder, doc_path, filename))
+            
+            if doc_path:
+                print(f"  ✓ 找到文件: {filename}")
+            else:
+                print(f"  ✗ 未找到文件")
+            print()
         
         # 从后往前处理（避免插入导致索引变化）
-        for i, para, placeholder, doc_path, filename in reversed(paragraphs_to_process):
-            if doc_path and os.path.exists(doc_path):
+        splicer = DocumentSplicer(doc)
+        for i, para, placeholder, source, filename in reversed(paragraphs_to_process):
+            if source is not None and (not isinstance(source, str) or os.path.exists(source)):
                 print(f"→ 插入文档: {filename}")
                 # 清空占位符段落
                 para.clear()
                 # 插入文档内容
-                self._insert_document_content(doc, para, doc_path)
+                self._insert_document_content(doc, para, source, splicer)
             else:
                 print(f"→ 警告: 跳过缺失文档 {filename}")
                 para.text = f"[缺失文档: {filename}]"
     
-    def _insert_document_content(self, target_doc, insert_point_para, source_doc_path):
+    def _insert_document_content(self, target_doc, insert_point_para, source, splicer=None):
         """
         在指定位置插入源文档的内容
         
-        使用深拷贝方式，直接复制XML元素
+        源文档随即丢弃，正文元素直接移动到模板中（不深拷贝），
+        并合并其引用的样式、编号与图片等部件，跳过分节属性
+
+        Args:
+            source: 源文档路径，或内存中的 Document / 正文元素列表
+            splicer: 同一目标文档共用的 DocumentSplicer
         """
         try:
-            # 加载源文档
-            source_doc = Document(source_doc_path)
-            
-            # 获取插入点
-            main_body = target_doc.element.body
-            insert_after_element = insert_point_para._element
-            insert_index = main_body.index(insert_after_element)
+            if isinstance(source, str):
+                source = Document(source)
+            splicer = splicer or DocumentSplicer(target_doc)
             
             # 插入所有元素（段落和表格）
-            offset = 1
-            for element in source_doc.element.body:
-                # 深拷贝元素
-                new_element = deepcopy(element)
-                # 插入到目标位置
-                main_body.insert(insert_index + offset, new_element)
-                offset += 1
+            insert_after_element = insert_point_para._element
+            count = splicer.splice(source, insert_after_element)
             
-            print(f"  ✓ 成功插入 {offset-1} 个元素")
+            print(f"  ✓ 成功插入 {count} 个元素")
             
             # 添加一个空段落作为分隔
+            main_body = target_doc.element.body
             separator = target_doc.add_paragraph()._element
-            main_body.insert(insert_index + offset, separator)
+            main_body.insert(main_body.index(insert_after_element) + count + 1, separator)
             
         except Exception as e:
             print(f"  ✗ 插入失败: {e}")
             import traceback
             traceback.print_exc()
             # 在出错位置插入错误提示
-            insert_point_para.text = f"[文档插入失败: {os.path.basename(source_doc_path)} - {str(e)}]"
+            name = os.path.basename(source) if isinstance(source, str) else "内存文档"
+            insert_point_para.text = f"[文档插入失败: {name} - {str(e)}]"
     
     def _generate_output_path(self, course_open_info):
         """生成输出文件路径"""
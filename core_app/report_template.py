@@ -0,0 +1,131 @@
+"""
+报告模板编译：一次解析 report_template.docx，记录全部占位符位置（合并被拆分到多个 run 的占位符），
+按文件内容哈希缓存；之后每次生成报告按记录的位置直接替换，不再全文扫描
+"""
+import hashlib
+import io
+import re
+from collections import OrderedDict
+
+from docx import Document
+from docx.oxml.ns import qn
+
+
+PLACEHOLDER_RE = re.compile(r"\{\{[A-Za-z0-9_]+\}\}")
+INSERT_DOC_RE = re.compile(r"\{\{INSERT_DOC_\d+\}\}")
+
+# 已编译的模板：{内容 sha1: CompiledTemplate}
+_CACHE = OrderedDict()
+_CACHE_SIZE = 4
+
+
+def _element_path(element, root):
+    """元素相对 root 的子节点下标路径"""
+    path = []
+    while element is not root:
+        parent = element.getparent()
+        path.append(parent.index(element))
+        element = parent
+    return tuple(reversed(path))
+
+
+def _resolve_path(root, path):
+    element = root
+    for index in path:
+        element = element[index]
+    return element
+
+
+def _merge_split_runs(p):
+    """
+    将跨越多个 run 的占位符合并到其起始 run 中（沿用起始 run 的格式），
+    保证每个占位符完整位于一个 run 内
+    :return: 合并后段落的 run 列表
+    """
+    while True:
+        runs = list(p.iterchildren(qn("w:r")))
+        texts = [r.text for r in runs]
+        starts = []
+        pos = 0
+        for text in texts:
+            starts.append(pos)
+            pos += len(text)
+        full = "".join(texts)
+
+        split = None
+        for match in PLACEHOLDER_RE.finditer(full):
+            first = max(i for i, s in enumerate(starts) if s <= match.start())
+            last = max(i for i, s in enumerate(starts) if s < match.end())
+            if last > first:
+                split = (first, last)
+                break
+        if split is None:
+            return runs
+
+        first, last = split
+        runs[first].text = "".join(texts[first:last + 1])
+        for r in runs[first + 1:last + 1]:
+            p.remove(r)
+
+
+class CompiledTemplate:
+    """
+    编译后的报告模板
+    - text_runs: [(run 路径, 该 run 中的占位符), ...]，文本占位符（年份、课程名等）
+    - insert_paragraphs: [(段落路径, 占位符), ...]，正文中的 {{INSERT_DOC_n}} 段落（按文档顺序）
+    路径均为相对 w:body 的子节点下标，新文档中按路径直接定位。
+    """
+
+    def __init__(self, data: bytes):
+        self.digest = hashlib.sha1(data).hexdigest()
+        doc = Document(io.BytesIO(data))
+        body = doc.element.body
+
+        text_runs = []
+        insert_paragraphs = []
+        for p in body.iter(qn("w:p")):
+            if "{{" not in "".join(r.text for r in p.iterchildren(qn("w:r"))):
+                continue
+            for r in _merge_split_runs(p):
+                keys = PLACEHOLDER_RE.findall(r.text)
+                text_keys = [k for k in keys if not INSERT_DOC_RE.fullmatch(k)]
+                if text_keys:
+                    text_runs.append((r, tuple(dict.fromkeys(text_keys))))
+                # 文档插入点只能是正文的直接子段落
+                if p.getparent() is body:
+                    insert_paragraphs.extend((p, k) for k in keys if INSERT_DOC_RE.fullmatch(k))
+
+        self.text_runs = [(_element_path(r, body), keys) for r, keys in text_runs]
+        self.insert_paragraphs = [(_element_path(p, body), key) for p, key in insert_paragraphs]
+
+        # 保存合并 run 后的模板，每次生成报告从这份字节加载
+        buffer = io.BytesIO()
+        doc.save(buffer)
+        self.data = buffer.getvalue()
+
+    def new_document(self):
+        """
+        加载一份新的模板文档，并按记录的路径定位占位符
+        :return: (Document, [(run 元素, 占位符), ...], [(段落元素, 占位符), ...])
+        """
+        doc = Document(io.BytesIO(self.data))
+        body = doc.element.body
+        text_runs = [(_resolve_path(body, path), keys) for path, keys in self.text_runs]
+        insert_paragraphs = [(_resolve_path(body, path), key) for path, key in self.insert_paragraphs]
+        return doc, text_runs, insert_paragraphs
+
+
+def compile_template(path: str) -> CompiledTemplate:
+    """按文件内容哈希取已编译的模板，模板文件改动后自动重新编译"""
+    with open(path, "rb") as fh:
+        data = fh.read()
+    digest = hashlib.sha1(data).hexdigest()
+    template = _CACHE.get(digest)
+    if template is None:
+        template = CompiledTemplate(data)
+        _CACHE[digest] = template
+        while len(_CACHE) > _CACHE_SIZE:
+            _CACHE.popitem(last=False)
+    else:
+        _CACHE.move_to_end(digest)
+    return template
@@ -1,3 +1,27 @@
 from .excel_templates import create_forward_template, create_reverse_template
+from .detail_writer import DetailWorkbookWriter
+from .header_probe import HeaderProbe, probe_headers
+from .score_table import ScoreTable, build_score_table, load_score_table
+from .score_readers import load_score_csv, load_score_parquet, load_score_input, read_score_headers
+from .run_cache import GradeRunCache
+from .xlsx_patch import patch_workbook_cells
+from .docx_tables import DocxTable, ensure_table_text_style
 
-__all__ = ["create_forward_template", "create_reverse_template"]
+__all__ = [
+    "create_forward_template",
+    "create_reverse_template",
+    "DetailWorkbookWriter",
+    "HeaderProbe",
+    "probe_headers",
+    "ScoreTable",
+    "build_score_table",
+    "load_score_table",
+    "load_score_csv",
+    "load_score_parquet",
+    "load_score_input",
+    "read_score_headers",
+    "GradeRunCache",
+    "patch_workbook_cells",
+    "DocxTable",
+    "ensure_table_text_style",
+]
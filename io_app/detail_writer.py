@@ -0,0 +1,201 @@
+from typing import List, Sequence, Tuple
+
+import xlsxwriter
+from openpyxl.cell.cell import MergedCell
+from openpyxl.utils import column_index_from_string
+
+
+class DetailWorkbookWriter:
+    """
+    成绩明细工作簿流式写出（xlsxwriter constant_memory 模式）
+    - 按行顺序写出，每写完一行即落盘，内存占用与学生人数无关；
+    - 单元格样式只使用少量共享格式，不再逐单元格创建样式对象；
+    - 合并单元格在区域最后一行写完时登记（见 _close_merge）。
+    """
+
+    DETAIL_TITLE = "成绩明细"
+
+    def __init__(self, path: str, obj_headers: Sequence[str]):
+        self.path = path
+        self.book = xlsxwriter.Workbook(path, {"constant_memory": True})
+        self._formats = {}
+        # 当前块（一名学生的明细块或一张小表）已登记合并的单元格 {(行, 列)}，用于重叠检查；
+        # 各块行区间互不相交，块写完即清空，内存不随学生人数增长
+        self._block_cells = set()
+        self.cell_format = self._format(h="center", v="center", wrap=True, border=True)
+
+        self.ws = self.book.add_worksheet(self.DETAIL_TITLE)
+        self._require_merge_list(self.ws)
+        header = ["姓名", "考核环节", "考核方式"] + list(obj_headers) + ["小计", "合计", "等级"]
+        self.width = len(header)
+        self.grade_col = self.width - 1
+        self.ws.write_row(0, 0, header, self.cell_format)
+        self.row = 1
+
+    def _format(self, font_name=None, font_size=None, bold=False, h=None, v=None, wrap=False, border=False):
+        """按样式要素复用共享格式"""
+        key = (font_name, font_size, bold, h, v, wrap, border)
+        fmt = self._formats.get(key)
+        if fmt is None:
+            props = {}
+            if font_name:
+                props["font_name"] = font_name
+            if font_size:
+                props["font_size"] = font_size
+            if bold:
+                props["bold"] = True
+            if h:
+                props["align"] = h
+            if v:
+                props["valign"] = "vcenter" if v == "center" else v
+            if wrap:
+                props["text_wrap"] = True
+            if border:
+                props["border"] = 1
+            fmt = self._formats[key] = self.book.add_format(props)
+        return fmt
+
+    @staticmethod
+    def _write_cell(ws, row, col, value, fmt):
+        if value is None or value == "":
+            ws.write_blank(row, col, None, fmt)
+        else:
+            ws.write(row, col, value, fmt)
+
+    def _write_cells(self, ws, row, values, fmt):
+        for col, value in enumerate(values):
+            self._write_cell(ws, row, col, value, fmt)
+
+    @staticmethod
+    def _require_merge_list(ws):
+        """
+        确认工作表仍以 merge 列表保存合并区域（_close_merge 依赖此内部结构）
+        requirements.txt 将 xlsxwriter 固定在 3.x；升级后结构变化时在此直接报错，而不是静默丢失合并
+        """
+        if not isinstance(getattr(ws, "merge", None), list):
+            raise RuntimeError(
+                f"xlsxwriter {xlsxwriter.__version__} 的工作表没有 merge 列表，"
+                "无法在 constant_memory 模式下登记合并单元格，请安装 requirements.txt 指定的版本"
+            )
+
+    def _close_merge(self, ws, first_row, first_col, last_row, last_col):
+        """
+        在合并区域的最后一行写完后登记合并
+        constant_memory 下 merge_range 只能在区域首行调用，且会向后续各行写空白单元格，
+        导致这些行提前落盘、随后写入的数据被丢弃；首行落盘后再调用则直接返回 -1、不登记。
+        因此区域内单元格（锚点值与带格式的空白）均按行正常写出，这里只向工作表的合并列表
+        登记区域（与 merge_range 登记方式相同），并自行做 merge_range 的区域检查与当前块内的重叠检查。
+        """
+        if first_row == last_row and first_col == last_col:
+            return
+        if first_row > last_row or first_col > last_col:
+            raise ValueError(f"合并区域无效: ({first_row}, {first_col}) - ({last_row}, {last_col})")
+        cells = {(r, c) for r in range(first_row, last_row + 1) for c in range(first_col, last_col + 1)}
+        if self._block_cells & cells:
+            raise ValueError(f"{ws.name} 的合并区域重叠: ({first_row}, {first_col}) - ({last_row}, {last_col})")
+        self._block_cells |= cells
+        ws.merge.append([first_row, first_col, last_row, last_col])
+
+    @staticmethod
+    def student_rows(name, grade: str, link_blocks, total_obj_scores: Sequence[float], total_score: float) -> List[list]:
+        """
+        一名学生明细块各行的单元格值（合并区域内除锚点外留空）
+        写出与增量修补共用，保证两者逐单元格一致
+        """
+        rows = []
+        for link_label, method_rows, link_obj_scores, link_score in link_blocks:
+            link_first = True
+            for m_name, obj_scores, subtotal in method_rows:
+                values = [name if not rows else "", link_label if link_first else "", m_name]
+                rows.append(values + list(obj_scores) + [subtotal, "", grade if len(rows) == 0 else ""])
+                link_first = False
+            # 环节合计行
+            values = [name if not rows else "", link_label if link_first else "", "环节合计"]
+            rows.append(values + list(link_obj_scores) + ["", link_score, grade if len(rows) == 0 else ""])
+        values = [name if not rows else "", "100%", "课程总评"]
+        rows.append(values + list(total_obj_scores) + ["", total_score, grade])
+        return rows
+
+    @staticmethod
+    def student_block_height(link_blocks) -> int:
+        """一名学生明细块的行数：各环节方法行 + 环节合计行，再加课程总评行"""
+        return sum(len(method_rows) + 1 for _, method_rows, _, _ in link_blocks) + 1
+
+    def add_student(self,
+                    name,
+                    grade: str,
+                    link_blocks: List[Tuple[str, List[Tuple[str, Sequence[float], float]], Sequence[float], float]],
+                    total_obj_scores: Sequence[float],
+                    total_score: float):
+        """
+        写出一名学生的明细块
+        :param link_blocks: [(环节标签, [(方法名, 各目标分, 小计), ...], 环节各目标分, 环节得分), ...]
+        :param total_obj_scores: 课程总评各目标分
+        :param total_score: 课程总评
+        """
+        ws, fmt = self.ws, self.cell_format
+        student_start = self.row
+        rows = self.student_rows(name, grade, link_blocks, total_obj_scores, total_score)
+        for values in rows:
+            self._write_cells(ws, self.row, values, fmt)
+            self.row += 1
+
+        # 环节标签列在各环节最后一行（环节合计行）写完后登记合并
+        link_start = student_start
+        for _, method_rows, _, _ in link_blocks:
+            link_end = link_start + len(method_rows)
+            self._close_merge(ws, link_start, 1, link_end, 1)
+            link_start = link_end + 1
+        self._close_merge(ws, student_start, 0, self.row - 1, 0)
+        self._close_merge(ws, student_start, self.grade_col, self.row - 1, self.grade_col)
+        self._block_cells.clear()
+
+    def add_sheet_from(self, src_ws):
+        """
+        将一张 openpyxl 小表（统计表、评价表等）按值、合并、字体、对齐、边框、列宽、行高写入本工作簿
+        """
+        ws = self.book.add_worksheet(src_ws.title)
+        self._require_merge_list(ws)
+        for col_letter, dim in src_ws.column_dimensions.items():
+            if dim.width:
+                col_idx = column_index_from_string(col_letter) - 1
+                ws.set_column(col_idx, col_idx, dim.width)
+
+        merges_by_last_row = {}
+        for rng in src_ws.merged_cells.ranges:
+            merges_by_last_row.setdefault(rng.max_row, []).append(rng)
+
+        for row in src_ws.iter_rows(min_row=1, max_row=src_ws.max_row, max_col=src_ws.max_column):
+            r = row[0].row
+            height = src_ws.row_dimensions[r].height if r in src_ws.row_dimensions else None
+            if height:
+                ws.set_row(r - 1, height)
+            for cell in row:
+                value = None if isinstance(cell, MergedCell) else cell.value
+                self._write_cell(ws, r - 1, cell.column - 1, value, self._cell_format(cell))
+            for rng in merges_by_last_row.get(r, []):
+                self._close_merge(ws, rng.min_row - 1, rng.min_col - 1, rng.max_row - 1, rng.max_col - 1)
+        self._block_cells.clear()
+        return ws
+
+    def _cell_format(self, cell):
+        font = cell.font
+        align = cell.alignment
+        border = cell.border
+        has_border = bool(border is not None and border.left is not None and border.left.style)
+        return self._format(
+            font_name=font.name if font is not None and font.name != "Calibri" else None,
+            font_size=float(font.sz) if font is not None and font.sz and float(font.sz) != 11 else None,
+            bold=bool(font is not None and font.b),
+            h=align.horizontal if align is not None else None,
+            v=align.vertical if align is not None else None,
+            wrap=bool(align is not None and align.wrap_text),
+            border=has_border,
+        )
+
+    def set_custom_property(self, name: str, value: str):
+        self.book.set_custom_property(name, value)
+
+    def close(self):
+        self.book.close()
+
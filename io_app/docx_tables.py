@@ -0,0 +1,190 @@
+"""
+Word 表格批量生成：由行数据一次拼出整张表的 w:tbl XML 再解析为元素，
+边框与单元格边距设在表格级，字体字号由文档段落样式提供（默认仿宋 / 12pt），
+不再逐单元格调用 python-docx 接口创建 OxmlElement 与 run 级字体设置
+"""
+from typing import Iterable, Optional, Sequence, Union
+from xml.sax.saxutils import escape
+
+from docx.enum.style import WD_STYLE_TYPE
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls, qn
+from docx.shared import Cm, Pt
+from docx.table import Table
+
+
+TABLE_TEXT_STYLE = "表格文字"
+
+
+def ensure_table_text_style(doc, font_name: str = "仿宋", font_size: float = 12) -> str:
+    """
+    确保文档中存在表格文字段落样式（居中、段前段后为0），返回其 styleId
+    同名样式已存在时直接沿用
+    """
+    styles = doc.styles
+    try:
+        style = styles[TABLE_TEXT_STYLE]
+    except KeyError:
+        style = styles.add_style(TABLE_TEXT_STYLE, WD_STYLE_TYPE.PARAGRAPH)
+        style.base_style = styles["Normal"]
+        style.font.name = font_name
+        style.element.get_or_add_rPr().get_or_add_rFonts().set(qn("w:eastAsia"), font_name)
+        style.font.size = Pt(font_size)
+        fmt = style.paragraph_format
+        fmt.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        fmt.space_before = Pt(0)
+        fmt.space_after = Pt(0)
+    return style.style_id
+
+
+def _twips(cm: float) -> int:
+    return Cm(cm).twips
+
+
+class DocxTable:
+    """
+    一张 Word 表格的行数据与版式，render() 一次生成 XML
+    - col_widths_cm: 各列宽度（厘米）
+    - border_size: 表格级边框线宽（1/8 磅，4 即 0.5 磅）；0 表示无边框
+    - cell_margin: 表格级单元格边距（dxa），None 沿用 Word 默认边距
+    表格居中、固定列宽
+    """
+
+    def __init__(self, col_widths_cm: Sequence[float], border_size: int = 4, cell_margin: Optional[int] = None):
+        self.col_widths = [_twips(w) for w in col_widths_cm]
+        self.border_size = border_size
+        self.cell_margin = cell_margin
+        self.rows = []
+        self.merges = []
+
+    def add_row(self,
+                values: Sequence,
+                bold: Union[bool, Iterable[int]] = False,
+                height_cm: Optional[float] = None,
+                header: bool = False,
+                align: Optional[str] = None,
+                valign: str = "center",
+                font_size: Optional[float] = None):
+        """
+        追加一行
+        :param values: 各列文本（数字按 str 输出，None 记为空）；合并区域内只取左上角单元格的值
+        :param bold: 整行加粗，或需要加粗的列下标集合
+        :param height_cm: 固定行高（厘米），None 为自动
+        :param header: 是否为跨页重复的标题行
+        :param align: 段落对齐（left / center / right），None 沿用样式（居中）
+        :param valign: 单元格垂直对齐（top / center / bottom）
+        :param font_size: 字号（磅），None 沿用样式
+        :return: 行下标
+        """
+        bold_cols = set(range(len(self.col_widths))) if bold is True else set(bold or ())
+        self.rows.append((list(values), bold_cols, height_cm, header, align, valign, font_size))
+        return len(self.rows) - 1
+
+    def merge(self, first_row: int, first_col: int, last_row: int, last_col: int):
+        """合并单元格区域（行列下标从0开始，含两端）"""
+        self.merges.append((first_row, first_col, last_row, last_col))
+
+    # ---------- XML ----------
+    def _table_properties(self) -> str:
+        if self.border_size:
+            edge = f'w:val="single" w:sz="{self.border_size}" w:space="0" w:color="000000"'
+        else:
+            edge = 'w:val="nil"'
+        borders = "".join(f"<w:{name} {edge}/>" for name in ("top", "left", "bottom", "right", "insideH", "insideV"))
+        margins = ""
+        if self.cell_margin is not None:
+            margins = "".join(
+                f'<w:{name} w:w="{self.cell_margin}" w:type="dxa"/>' for name in ("top", "left", "bottom", "right")
+            )
+            margins = f"<w:tblCellMar>{margins}</w:tblCellMar>"
+        return (
+            "<w:tblPr>"
+            f'<w:tblW w:w="{sum(self.col_widths)}" w:type="dxa"/>'
+            '<w:jc w:val="center"/>'
+            f"<w:tblBorders>{borders}</w:tblBorders>"
+            '<w:tblLayout w:type="fixed"/>'
+            f"{margins}"
+            '<w:tblLook w:val="04A0" w:firstRow="1" w:lastRow="0" w:firstColumn="1" w:lastColumn="0" w:noHBand="0" w:noVBand="1"/>'
+            "</w:tblPr>"
+        )
+
+    @staticmethod
+    def _run_xml(text: str, bold: bool, font_size: Optional[float]) -> str:
+        if text == "":
+            return ""
+        props = ("<w:b/>" if bold else "") + (f'<w:sz w:val="{int(round(font_size * 2))}"/>' if font_size else "")
+        props = f"<w:rPr>{props}</w:rPr>" if props else ""
+        parts = []
+        for i, line in enumerate(text.split("\n")):
+            if i:
+                parts.append("<w:br/>")
+            for j, chunk in enumerate(line.split("\t")):
+                if j:
+                    parts.append("<w:tab/>")
+                if chunk:
+                    parts.append(f'<w:t xml:space="preserve">{escape(chunk)}</w:t>')
+        return f"<w:r>{props}{''.join(parts)}</w:r>"
+
+    def render(self, style_id: str) -> str:
+        """生成整张表的 w:tbl XML"""
+        # 合并区域：左上角单元格记录跨度，其余单元格标记为水平覆盖或纵向续接
+        spans = {}
+        covered = {}
+        for r0, c0, r1, c1 in self.merges:
+            spans[(r0, c0)] = (c1 - c0 + 1, "restart" if r1 > r0 else None)
+            for r in range(r0, r1 + 1):
+                for c in range(c0, c1 + 1):
+                    if (r, c) == (r0, c0):
+                        continue
+                    covered[(r, c)] = "skip" if c > c0 else (c1 - c0 + 1, "continue")
+
+        grid = "".join(f'<w:gridCol w:w="{w}"/>' for w in self.col_widths)
+        out = [f"<w:tbl {nsdecls('w')}>", self._table_properties(), f"<w:tblGrid>{grid}</w:tblGrid>"]
+        ncols = len(self.col_widths)
+        for r_idx, (values, bold_cols, height_cm, header, align, valign, font_size) in enumerate(self.rows):
+            tr_props = ""
+            if header:
+                tr_props += '<w:tblHeader w:val="1"/>'
+            if height_cm:
+                tr_props += f'<w:trHeight w:val="{_twips(height_cm)}" w:hRule="exact"/>'
+            out.append(f"<w:tr><w:trPr>{tr_props}</w:trPr>" if tr_props else "<w:tr>")
+
+            p_props = f'<w:pStyle w:val="{style_id}"/>' + (f'<w:jc w:val="{align}"/>' if align else "")
+            for c_idx in range(ncols):
+                state = covered.get((r_idx, c_idx))
+                if state == "skip":
+                    continue
+                if state is not None:
+                    span, v_merge = state
+                    text = ""
+                else:
+                    span, v_merge = spans.get((r_idx, c_idx), (1, None))
+                    value = values[c_idx] if c_idx < len(values) else ""
+                    text = "" if value is None else str(value)
+                width = sum(self.col_widths[c_idx:c_idx + span])
+                tc_props = f'<w:tcW w:w="{width}" w:type="dxa"/>'
+                if span > 1:
+                    tc_props += f'<w:gridSpan w:val="{span}"/>'
+                if v_merge == "restart":
+                    tc_props += '<w:vMerge w:val="restart"/>'
+                elif v_merge == "continue":
+                    tc_props += "<w:vMerge/>"
+                tc_props += f'<w:vAlign w:val="{valign}"/>'
+                run = self._run_xml(text, c_idx in bold_cols, font_size)
+                out.append(f"<w:tc><w:tcPr>{tc_props}</w:tcPr><w:p><w:pPr>{p_props}</w:pPr>{run}</w:p></w:tc>")
+            out.append("</w:tr>")
+        out.append("</w:tbl>")
+        return "".join(out)
+
+    def add_to(self, doc, font_name: str = "仿宋", font_size: float = 12) -> Table:
+        """将表格追加到文档正文末尾（分节属性之前），返回 python-docx Table"""
+        style_id = ensure_table_text_style(doc, font_name, font_size)
+        tbl = parse_xml(self.render(style_id))
+        body = doc.element.body
+        sect_pr = body.find(qn("w:sectPr"))
+        if sect_pr is not None:
+            sect_pr.addprevious(tbl)
+        else:
+            body.append(tbl)
+        return Table(tbl, doc._body)
@@ -0,0 +1,262 @@
+import os
+import posixpath
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from openpyxl.utils.cell import column_index_from_string, range_boundaries
+
+
+_NS_MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_NS_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_NS_PKG_REL = "http://schemas.openxmlformats.org/package/2006/relationships"
+_CHUNK = 1 << 16
+
+# 最近探测过的表头：{绝对路径: HeaderProbe}，按 (大小, 修改时间) 判断是否失效
+_CACHE = OrderedDict()
+_CACHE_SIZE = 8
+
+_CELL_REF = re.compile(r"([A-Z]+)(\d+)")
+_MERGE_REF = re.compile(rb'<(?:\w+:)?mergeCell\b[^>]*\bref="([^"]+)"')
+_DIMENSION_REF = re.compile(rb'<(?:\w+:)?dimension\b[^>]*\bref="([^"]+)"')
+_ROW_START = re.compile(rb'<(?:\w+:)?row\b[^>]*\br="(\d+)"')
+_SHEET_DATA_END = re.compile(rb"</(?:\w+:)?sheetData>|<(?:\w+:)?sheetData\s*/>")
+
+
+def sheet_paths(zf: zipfile.ZipFile) -> List[str]:
+    """按工作簿中的顺序列出各工作表 XML 在压缩包内的路径（workbook.xml + 关系文件）"""
+    workbook = ET.fromstring(zf.read("xl/workbook.xml"))
+    rels = ET.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+    targets = {rel.get("Id"): rel.get("Target") for rel in rels.findall(f"{{{_NS_PKG_REL}}}Relationship")}
+    paths = []
+    for sheet in workbook.findall(f"{{{_NS_MAIN}}}sheets/{{{_NS_MAIN}}}sheet"):
+        target = targets.get(sheet.get(f"{{{_NS_REL}}}id"))
+        if target is None:
+            continue
+        if target.startswith("/"):
+            paths.append(target.lstrip("/"))
+        else:
+            paths.append(posixpath.normpath(posixpath.join("xl", target)))
+    return paths
+
+
+def merge_anchor_index(merged, max_row: Optional[int] = None) -> Dict[Tuple[int, int], Tuple[int, int]]:
+    """
+    预先计算合并区域的 (行, 列) → 左上角锚点 映射，表头取值由逐个扫描合并区域变为字典查找
+    :param merged: [(min_row, min_col, max_row, max_col), ...]，行列从1开始
+    :param max_row: 只为不超过该行的单元格建立索引（表头只需前几行）
+    """
+    anchors = {}
+    for min_row, min_col, max_row_m, max_col in merged:
+        last_row = max_row_m if max_row is None else min(max_row_m, max_row)
+        for r in range(min_row, last_row + 1):
+            for c in range(min_col, max_col + 1):
+                anchors[(r, c)] = (min_row, min_col)
+    return anchors
+
+
+class HeaderProbe:
+    """
+    只读表头探测：直接读取 xlsx 压缩包中活动工作表的前几行与合并定义，
+    不加载整张工作表。模板识别与表头校验是每次导入的第一步，需要即时完成。
+    """
+
+    def __init__(self, path: str, header_rows: int = 2):
+        self.path = os.path.abspath(path)
+        stat = os.stat(self.path)
+        self.key = (stat.st_size, stat.st_mtime_ns)
+        self.row_count = header_rows
+        self.values: Dict[Tuple[int, int], object] = {}
+        self.merged: List[Tuple[int, int, int, int]] = []
+        self.max_column = 0
+
+        with zipfile.ZipFile(self.path) as zf:
+            sheet_path = self._active_sheet_path(zf)
+            raw_cells, dimension_cols = self._scan_sheet(zf, sheet_path)
+            shared = self._shared_strings(zf, raw_cells)
+
+        for (r, c), (cell_type, value) in raw_cells.items():
+            if cell_type == "s":
+                value = shared.get(int(value)) if value is not None else None
+            self.values[(r, c)] = value
+
+        self.max_column = max(
+            [dimension_cols] + [c for _, c in self.values] + [m[3] for m in self.merged if m[0] <= header_rows]
+        )
+        self.anchors = merge_anchor_index(self.merged, header_rows)
+
+    # ---------- 压缩包结构 ----------
+    @staticmethod
+    def _active_sheet_path(zf: zipfile.ZipFile) -> str:
+        """按 workbook.xml 的 activeTab 找到活动工作表"""
+        workbook = ET.fromstring(zf.read("xl/workbook.xml"))
+        view = workbook.find(f"{{{_NS_MAIN}}}bookViews/{{{_NS_MAIN}}}workbookView")
+        active = int(view.get("activeTab", 0)) if view is not None else 0
+        paths = sheet_paths(zf)
+        if not paths:
+            return "xl/worksheets/sheet1.xml"
+        return paths[active] if active < len(paths) else paths[0]
+
+    def _scan_sheet(self, zf: zipfile.ZipFile, sheet_path: str):
+        """
+        流式解压工作表 XML：表头行片段交给 XML 解析；其后的数据行只做字节查找，
+        直到找到位于 sheetData 之后的 <mergeCells> 定义
+        """
+        head = b""
+        header_end = None
+        with zf.open(sheet_path) as fh:
+            # 1. 读到第 row_count 行之后的行首（或 sheetData 结束）为止
+            while header_end is None:
+                chunk = fh.read(_CHUNK)
+                if not chunk:
+                    header_end = len(head)
+                    break
+                head += chunk
+                for match in _ROW_START.finditer(head):
+                    if int(match.group(1)) > self.row_count:
+                        header_end = match.start()
+                        break
+                if header_end is None:
+                    match = _SHEET_DATA_END.search(head)
+                    if match:
+                        header_end = match.start()
+
+            # 2. 跳过数据行，保留少量重叠避免标签被分块截断
+            rest = head[header_end:]
+            while b"mergeCells" not in rest:
+                chunk = fh.read(_CHUNK)
+                if not chunk:
+                    break
+                rest = rest[-32:] + chunk
+            if b"mergeCells" in rest:
+                rest += fh.read()
+
+        for ref in _MERGE_REF.findall(rest):
+            min_col, min_row, max_col, max_row = range_boundaries(ref.decode())
+            self.merged.append((min_row, min_col, max_row, max_col))
+
+        dimension_cols = 0
+        match = _DIMENSION_REF.search(head)
+        if match:
+            last = _CELL_REF.match(match.group(1).decode().split(":")[-1])
+            if last:
+                dimension_cols = column_index_from_string(last.group(1))
+
+        return self._parse_header_cells(head[:header_end]), dimension_cols
+
+    def _parse_header_cells(self, head: bytes) -> Dict[Tuple[int, int], Tuple[str, object]]:
+        """解析表头片段中的单元格：{(行, 列): (类型, 原始值)}"""
+        match = re.search(rb"<((?:\w+:)?sheetData)\b[^>]*?(/?)>", head)
+        if match is None or match.group(2):
+            return {}
+        root_match = re.search(rb"<((?:\w+:)?worksheet)\b[^>]*>", head)
+        if root_match is None:
+            return {}
+        # 沿用根元素的命名空间声明，补齐截断处的闭合标签
+        fragment = (root_match.group(0) + head[match.start():]
+                    + b"</" + match.group(1) + b"></" + root_match.group(1) + b">")
+        root = ET.fromstring(fragment)
+
+        cells = {}
+        r = 0
+        for row in root.iter(f"{{{_NS_MAIN}}}row"):
+            r = int(row.get("r", r + 1))
+            if r > self.row_count:
+                break
+            next_col = 1
+            for cell in row.findall(f"{{{_NS_MAIN}}}c"):
+                ref = cell.get("r")
+                col = column_index_from_string(_CELL_REF.match(ref).group(1)) if ref else next_col
+                next_col = col + 1
+                cell_type = cell.get("t", "n")
+                if cell_type == "inlineStr":
+                    value = "".join(t.text or "" for t in cell.iter(f"{{{_NS_MAIN}}}t"))
+                    cell_type = "str"
+                else:
+                    v = cell.find(f"{{{_NS_MAIN}}}v")
+                    value = v.text if v is not None else None
+                if value is None:
+                    continue
+                if cell_type == "n":
+                    value = float(value)
+                    value = int(value) if value.is_integer() else value
+                elif cell_type == "b":
+                    value = value == "1"
+                cells[(r, col)] = (cell_type, value)
+        return cells
+
+    @staticmethod
+    def _shared_strings(zf: zipfile.ZipFile, raw_cells) -> Dict[int, str]:
+        """只解析到表头引用的最大共享字符串下标为止"""
+        needed = {int(v) for t, v in raw_cells.values() if t == "s" and v is not None}
+        if not needed or "xl/sharedStrings.xml" not in zf.namelist():
+            return {}
+        last = max(needed)
+        strings = {}
+        index = 0
+        with zf.open("xl/sharedStrings.xml") as fh:
+            for _, elem in ET.iterparse(fh, events=("end",)):
+                if elem.tag != f"{{{_NS_MAIN}}}si":
+                    continue
+                if index in needed:
+                    # 富文本取全部 <t>，忽略注音 <rPh>
+                    parts = []
+                    for child in elem:
+                        if child.tag == f"{{{_NS_MAIN}}}t":
+                            parts.append(child.text or "")
+                        elif child.tag == f"{{{_NS_MAIN}}}r":
+                            parts.extend(t.text or "" for t in child.iter(f"{{{_NS_MAIN}}}t"))
+                    strings[index] = "".join(parts)
+                elem.clear()
+                index += 1
+                if index > last:
+                    break
+        return strings
+
+    # ---------- 表头取值 ----------
+    def cell_value(self, row: int, col: int):
+        return self.values.get((row, col))
+
+    def header_value(self, row: int, col: int) -> str:
+        """表头单元格文本；空单元格取其所在合并区域左上角的值"""
+        value = self.values.get((row, col))
+        if value is None:
+            anchor = self.anchors.get((row, col))
+            if anchor is None:
+                return ""
+            value = self.values.get(anchor)
+            if value is None:
+                return ""
+        return str(value).strip()
+
+    def header_rows(self, count: Optional[int] = None) -> List[List[str]]:
+        """前 count 行表头（已展开合并单元格）"""
+        count = self.row_count if count is None else min(count, self.row_count)
+        return [
+            [self.header_value(r, c) for c in range(1, self.max_column + 1)]
+            for r in range(1, count + 1)
+        ]
+
+    def merged_in_row(self, row: int) -> List[Tuple[int, int, int, int]]:
+        """完全位于第 row 行内的合并区域"""
+        return [m for m in self.merged if m[0] == row and m[2] == row]
+
+
+def probe_headers(path: str) -> HeaderProbe:
+    """
+    取得工作簿前两行表头的探测结果；同一文件（路径、大小、修改时间均未变）只探测一次
+    """
+    abs_path = os.path.abspath(path)
+    stat = os.stat(abs_path)
+    cached = _CACHE.get(abs_path)
+    if cached is not None and cached.key == (stat.st_size, stat.st_mtime_ns):
+        _CACHE.move_to_end(abs_path)
+        return cached
+
+    probe = HeaderProbe(abs_path)
+    _CACHE[abs_path] = probe
+    while len(_CACHE) > _CACHE_SIZE:
+        _CACHE.popitem(last=False)
+    return probe
@@ -0,0 +1,77 @@
+import hashlib
+import json
+import os
+from typing import Optional
+
+import numpy as np
+
+
+class GradeRunCache:
+    """
+    上一次正向导出的分数矩阵与汇总量（与成绩明细同目录的 .npz 隐藏文件）
+    - relation_key: 关系表指纹，关系表改动后缓存失效；
+    - names / method_scores: 学生姓名与 学生×方法 分数矩阵，用于比对出变化的学生；
+    - method_sums / total_scores / grade_counts: 汇总量的运行累计；
+    - detail_key: 成绩明细文件的 (大小, 修改时间)，明细被另存或手工改动后缓存失效。
+    """
+
+    def __init__(self, relation_key: str, names, method_scores, method_sums, total_scores, grade_counts, detail_key):
+        self.relation_key = relation_key
+        self.names = np.asarray(names, dtype=str)
+        self.method_scores = np.asarray(method_scores, dtype=float)
+        self.method_sums = np.asarray(method_sums, dtype=float)
+        self.total_scores = np.asarray(total_scores, dtype=float)
+        self.grade_counts = np.asarray(grade_counts, dtype=int)
+        self.detail_key = tuple(int(v) for v in detail_key)
+
+    @staticmethod
+    def cache_path(detail_path: str) -> str:
+        folder, filename = os.path.split(os.path.abspath(detail_path))
+        return os.path.join(folder, f".{os.path.splitext(filename)[0]}.cache.npz")
+
+    @staticmethod
+    def relation_fingerprint(payload: dict) -> str:
+        text = json.dumps(payload or {}, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def file_key(path: str):
+        stat = os.stat(path)
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def matches(self, relation_key: str, names, detail_path: str) -> bool:
+        """缓存是否仍对应当前关系表、学生名单与磁盘上的成绩明细"""
+        if self.relation_key != relation_key or not os.path.exists(detail_path):
+            return False
+        if self.detail_key != self.file_key(detail_path):
+            return False
+        names = np.asarray(names, dtype=str)
+        return names.shape == self.names.shape and bool(np.all(names == self.names))
+
+    def save(self, detail_path: str):
+        np.savez(
+            self.cache_path(detail_path),
+            relation_key=np.array(self.relation_key),
+            names=self.names,
+            method_scores=self.method_scores,
+            method_sums=self.method_sums,
+            total_scores=self.total_scores,
+            grade_counts=self.grade_counts,
+            detail_key=np.array(self.detail_key, dtype=np.int64),
+        )
+
+    @classmethod
+    def load(cls, detail_path: str) -> Optional["GradeRunCache"]:
+        """读取缓存；不存在或已损坏时返回 None"""
+        path = cls.cache_path(detail_path)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                return cls(
+                    str(data["relation_key"]), data["names"], data["method_scores"], data["method_sums"],
+                    data["total_scores"], data["grade_counts"], data["detail_key"].tolist(),
+                )
+        except Exception as e:
+            print(f"[增量] 缓存读取失败: {e}")
+            return None
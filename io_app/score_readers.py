@@ -0,0 +1,181 @@
+import csv
+import os
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from io_app.header_probe import probe_headers
+from io_app.score_table import ScoreTable, build_score_table, convert_score_columns, load_score_table
+
+
+NAME_COLUMN = "姓名"
+# 正向 Parquet 成绩列命名：{环节}||{考核方式}（考核方式在各环节中唯一时也可直接用方法名）
+PARQUET_KEY_SEP = "||"
+CSV_ENCODINGS = ("utf-8-sig", "gb18030")
+
+ExpectedColumns = Sequence[Union[str, Tuple[str, str]]]
+
+
+def score_input_kind(path: str) -> str:
+    """按扩展名判断成绩文件类型：xlsx / csv / parquet"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        return "csv"
+    if ext in (".parquet", ".pq"):
+        return "parquet"
+    return "xlsx"
+
+
+# ---------- CSV ----------
+def _read_csv(path: str, consume):
+    """
+    教务系统导出的 CSV 可能是 UTF-8（带 BOM）或 GBK：依次按各编码读取并交给 consume(reader) 解析，
+    解析途中任意位置解码失败都换下一种编码重读；都失败时按最后一种编码替换无法识别的字符
+    """
+    for encoding in CSV_ENCODINGS:
+        try:
+            with open(path, newline="", encoding=encoding) as fh:
+                return consume(csv.reader(fh))
+        except UnicodeDecodeError:
+            continue
+    with open(path, newline="", encoding=CSV_ENCODINGS[-1], errors="replace") as fh:
+        return consume(csv.reader(fh))
+
+
+def _csv_header_rows(reader, header_count: int) -> List[List[str]]:
+    """读取 CSV 表头行；正向一级表头（环节）中空白单元格沿用左侧环节名，与模板合并单元格一致"""
+    rows = []
+    for _ in range(header_count):
+        rows.append([str(v).strip() for v in next(reader, [])])
+    width = max((len(r) for r in rows), default=0)
+    rows = [r + [""] * (width - len(r)) for r in rows]
+    if header_count == 2 and rows:
+        link_row = rows[0]
+        for c in range(2, width):
+            if link_row[c] == "" and link_row[c - 1] != "":
+                link_row[c] = link_row[c - 1]
+    return rows
+
+
+def read_csv_headers(path: str, header_count: int = 2) -> List[List[str]]:
+    return _read_csv(path, lambda reader: _csv_header_rows(reader, header_count))
+
+
+def load_score_csv(path: str, header_count: int = 2) -> ScoreTable:
+    """
+    读取与成绩模板同样布局的 CSV（正向两行表头：环节 / 考核方式；逆向一行表头：环节）
+    """
+    def consume(reader):
+        header_rows = _csv_header_rows(reader, header_count)
+        return build_score_table(header_rows, reader, header_count + 1, source=path)
+
+    return _read_csv(path, consume)
+
+
+# ---------- Parquet ----------
+def _import_parquet():
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise ImportError("读取 Parquet 成绩文件需要安装 pyarrow：pip install pyarrow") from exc
+    return pq
+
+
+def _match_parquet_columns(schema_names: Sequence[str], expected: ExpectedColumns):
+    """
+    将关系表中的成绩列映射到 Parquet 列名
+    :param expected: 逆向为环节名列表；正向为 (环节, 考核方式) 列表
+    :return: [(表头, Parquet 列名或 None), ...]，正向表头为 (环节, 考核方式)
+    """
+    available = {str(name).strip(): name for name in schema_names}
+    method_counts = {}
+    for item in expected:
+        if isinstance(item, tuple):
+            method_counts[item[1]] = method_counts.get(item[1], 0) + 1
+
+    matched = []
+    for item in expected:
+        if isinstance(item, tuple):
+            link, method = item
+            column = available.get(f"{link}{PARQUET_KEY_SEP}{method}")
+            if column is None and method_counts[method] == 1:
+                column = available.get(method)
+        else:
+            column = available.get(str(item).strip())
+        matched.append((item, column))
+    return matched
+
+
+def _parquet_header_rows(matched, forward: bool, has_name: bool) -> List[List[str]]:
+    """按关系表顺序构造表头行（只包含文件中存在的列），供与模板相同的表头校验"""
+    name = NAME_COLUMN if has_name else ""
+    found = [item for item, column in matched if column is not None]
+    if forward:
+        return [[name] + [link for link, _ in found], [name] + [method for _, method in found]]
+    return [[name] + list(found)]
+
+
+def read_parquet_headers(path: str, expected: ExpectedColumns) -> List[List[str]]:
+    pq = _import_parquet()
+    names = pq.read_schema(path).names
+    matched = _match_parquet_columns(names, expected)
+    forward = any(isinstance(item, tuple) for item in expected)
+    return _parquet_header_rows(matched, forward, NAME_COLUMN in names)
+
+
+def load_score_parquet(path: str, expected: ExpectedColumns) -> ScoreTable:
+    """
+    按列投影读取 Parquet：只加载“姓名”与关系表需要的成绩列
+    :param expected: 逆向为环节名列表；正向为 (环节, 考核方式) 列表
+    """
+    pq = _import_parquet()
+    import pyarrow as pa
+
+    schema_names = pq.read_schema(path).names
+    matched = _match_parquet_columns(schema_names, expected)
+    forward = any(isinstance(item, tuple) for item in expected)
+    has_name = NAME_COLUMN in schema_names
+    header_rows = _parquet_header_rows(matched, forward, has_name)
+    columns = [column for _, column in matched if column is not None]
+    if not has_name:
+        return ScoreTable(header_rows, [], np.zeros((0, len(columns))), source=path)
+
+    table = pq.read_table(path, columns=list(dict.fromkeys([NAME_COLUMN] + columns)))
+    names = np.array(table.column(NAME_COLUMN).to_pylist(), dtype=object)
+    valid = np.array([n is not None and str(n).strip() != "" for n in names], dtype=bool)
+    row_numbers = (np.flatnonzero(valid) + 1).tolist()
+
+    arrays = []
+    for column in columns:
+        chunked = table.column(column)
+        if pa.types.is_integer(chunked.type) or pa.types.is_floating(chunked.type) or pa.types.is_decimal(chunked.type):
+            arrays.append(chunked.cast(pa.float64()).to_numpy(zero_copy_only=False)[valid])
+        else:
+            arrays.append(np.array(chunked.to_pylist(), dtype=object)[valid])
+    headers = [str(h).strip() for h in header_rows[-1][1:]]
+    values, coerced = convert_score_columns(headers, arrays, row_numbers)
+    return ScoreTable(header_rows, names[valid], values, coerced, source=path)
+
+
+# ---------- 统一入口 ----------
+def read_score_headers(path: str, header_count: int = 2, expected: Optional[ExpectedColumns] = None) -> List[List[str]]:
+    """
+    只读取成绩文件表头（xlsx 只读探测；CSV 读前几行；Parquet 只读 schema）
+    :param expected: Parquet 按列名映射时使用的关系表成绩列
+    """
+    kind = score_input_kind(path)
+    if kind == "csv":
+        return read_csv_headers(path, header_count)
+    if kind == "parquet":
+        return read_parquet_headers(path, expected or [])
+    return probe_headers(path).header_rows(header_count)
+
+
+def load_score_input(path: str, header_count: int = 2, expected: Optional[ExpectedColumns] = None) -> ScoreTable:
+    """按文件类型读取为列式成绩表（均不经过 pandas；CSV/Parquet 不经过 openpyxl）"""
+    kind = score_input_kind(path)
+    if kind == "csv":
+        return load_score_csv(path, header_count)
+    if kind == "parquet":
+        return load_score_parquet(path, expected or [])
+    return load_score_table(path, header_count)
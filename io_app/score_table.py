@@ -0,0 +1,167 @@
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from openpyxl import load_workbook
+
+from io_app.header_probe import probe_headers
+
+
+class ScoreTable:
+    """
+    列式成绩表：成绩模板表体按列存放，不经过 pandas
+    - header_rows: 表头行（已展开合并单元格），供表头校验使用
+    - columns: 分数列表头（末行表头去掉首列“姓名”）
+    - names: 学生姓名，形状 (n,)，空姓名的行已跳过
+    - values: 分数矩阵 float64，形状 (n, len(columns))，空单元格记 0
+    - coerced: 无法识别为数字、按 0 分计的单元格 [(Excel行号, 列表头, 原始值), ...]
+    """
+
+    def __init__(self, header_rows: List[List[str]], names, values, coerced=None, source: str = ""):
+        self.header_rows = header_rows
+        last = header_rows[-1] if header_rows else []
+        columns = [str(v).strip() for v in last[1:]]
+        while columns and columns[-1] == "":
+            columns.pop()
+        self.columns = columns
+        self.names = np.asarray(names, dtype=object)
+        self.values = np.asarray(values, dtype=float).reshape(len(self.names), -1)[:, :len(columns)]
+        if self.values.shape[1] < len(columns):
+            pad = np.zeros((len(self.names), len(columns) - self.values.shape[1]))
+            self.values = np.hstack([self.values, pad])
+        self.coerced = list(coerced or [])
+        self.source = source
+
+    def __len__(self):
+        return len(self.names)
+
+    def column(self, name: str) -> Optional[np.ndarray]:
+        """按表头取第一列同名分数，不存在时为 None"""
+        name = str(name).strip()
+        for j, col in enumerate(self.columns):
+            if col == name:
+                return self.values[:, j]
+        return None
+
+    def take(self, names: Sequence[str]) -> np.ndarray:
+        """
+        按表头顺序取多列组成矩阵，形状 (n, len(names))
+        同名表头按出现顺序依次对应（不同环节可能有同名考核方式），缺失的列记 0
+        """
+        positions = {}
+        for j, col in enumerate(self.columns):
+            positions.setdefault(col, []).append(j)
+        used = {}
+        out = np.zeros((len(self.names), len(names)), dtype=float)
+        for i, name in enumerate(names):
+            key = str(name).strip()
+            candidates = positions.get(key, [])
+            k = used.get(key, 0)
+            if k < len(candidates):
+                out[:, i] = self.values[:, candidates[k]]
+            elif candidates:
+                out[:, i] = self.values[:, candidates[-1]]
+            used[key] = k + 1
+        return out
+
+    def coercion_summary(self, limit: int = 5) -> str:
+        """无法识别为数字的单元格摘要（用于状态输出）"""
+        if not self.coerced:
+            return ""
+        shown = "、".join(f"第{r}行[{c}]={v!r}" for r, c, v in self.coerced[:limit])
+        more = f" 等{len(self.coerced)}处" if len(self.coerced) > limit else ""
+        return f"{shown}{more}"
+
+
+def _to_float(value) -> Tuple[float, bool]:
+    """单元格值转为分数：返回 (分数, 是否属于无法识别而按0计)"""
+    if value is None:
+        return 0.0, False
+    if isinstance(value, (int, float)):
+        value = float(value)
+        return (0.0, False) if np.isnan(value) else (value, False)
+    if isinstance(value, str):
+        text = value.strip()
+        if not text:
+            return 0.0, False
+        try:
+            value = float(text)
+            return (0.0, False) if np.isnan(value) else (value, False)
+        except ValueError:
+            pass
+    return 0.0, True
+
+
+def _normalize_name(value):
+    """与 pandas 读取一致：整数值的浮点姓名（学号）转为 int"""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def build_score_table(header_rows: List[List[str]], body_rows, first_row: int, source: str = "") -> ScoreTable:
+    """
+    由表头与表体行构造列式成绩表
+    :param body_rows: 可迭代的行（首列为姓名，其后为分数列）
+    :param first_row: 表体首行在原文件中的行号（用于转换报告）
+    """
+    last = header_rows[-1] if header_rows else []
+    width = max(len(last) - 1, 0)
+    headers = [str(v).strip() for v in last[1:]]
+
+    names = []
+    raw = []
+    row_numbers = []
+    for row_number, row in enumerate(body_rows, start=first_row):
+        if not row:
+            continue
+        name = row[0]
+        if name is None or str(name).strip() == "":
+            continue
+        cells = list(row[1:width + 1])
+        if len(cells) < width:
+            cells += [None] * (width - len(cells))
+        names.append(_normalize_name(name))
+        raw.append(cells)
+        row_numbers.append(row_number)
+
+    block = np.array(raw, dtype=object).reshape(len(names), width)
+    values, coerced = convert_score_columns(headers, [block[:, j] for j in range(width)], row_numbers)
+    return ScoreTable(header_rows, names, values, coerced, source)
+
+
+def convert_score_columns(headers: Sequence[str], columns, row_numbers: Sequence[int]):
+    """
+    逐列转换为分数矩阵：整列均为数字（或空）时整体转换，否则逐单元格转换并记录无法识别的单元格
+    :param columns: 各列的一维数组（与 headers 一一对应）
+    :return: (values (n, C) float64, coerced [(行号, 列表头, 原始值), ...])
+    """
+    values = np.zeros((len(row_numbers), len(columns)), dtype=float)
+    coerced = []
+    for j, col in enumerate(columns):
+        col = np.asarray(col)
+        try:
+            values[:, j] = np.nan_to_num(col.astype(float), nan=0.0)
+            continue
+        except (TypeError, ValueError):
+            pass
+        for i, cell in enumerate(col):
+            values[i, j], bad = _to_float(cell)
+            if bad:
+                coerced.append((row_numbers[i], headers[j], cell))
+    coerced.sort(key=lambda item: item[0])
+    return values, coerced
+
+
+def load_score_table(path: str, header_count: int = 2) -> ScoreTable:
+    """
+    流式读取成绩模板为列式成绩表（openpyxl 只读模式逐行取值，不构造 DataFrame）
+    :param header_count: 表头行数，正向模板为 2（环节/考核方式），逆向模板为 1
+    """
+    header_rows = probe_headers(path).header_rows(header_count)
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb.active
+        body = ws.iter_rows(min_row=header_count + 1, values_only=True)
+        return build_score_table(header_rows, body, header_count + 1, source=path)
+    finally:
+        wb.close()
@@ -0,0 +1,115 @@
+import os
+import re
+import shutil
+import tempfile
+import zipfile
+from typing import Dict, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from openpyxl.utils import get_column_letter
+from openpyxl.utils.cell import column_index_from_string
+
+from io_app.header_probe import sheet_paths
+
+
+_CELL = re.compile(rb'<c r="([A-Z]+)(\d+)"([^>]*?)(?:/>|>.*?</c>)', re.S)
+_STYLE = re.compile(rb'\bs="(\d+)"')
+_CUSTOM_PROPS = "docProps/custom.xml"
+
+
+def _cell_xml(ref: str, style: bytes, value) -> bytes:
+    """按 xlsxwriter 的写法生成单元格：数字 <v>，文本内联字符串，空值只保留样式"""
+    head = f'<c r="{ref}"'.encode() + style
+    if value is None or (isinstance(value, str) and value == ""):
+        return head + b"/>"
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return head + f"><v>{value:.16G}</v></c>".encode()
+    text = str(value)
+    space = ' xml:space="preserve"' if text != text.strip() else ""
+    return head + f' t="inlineStr"><is><t{space}>{escape(text)}</t></is></c>'.encode()
+
+
+def _patch_row(row_xml: bytes, row: int, cells: Dict[int, object]) -> bytes:
+    """替换一行中的指定单元格（保留原样式），缺失的单元格按列顺序插入"""
+    open_end = row_xml.index(b">") + 1
+    close_start = row_xml.rindex(b"</row>")
+    existing = []
+    for match in _CELL.finditer(row_xml, open_end, close_start):
+        existing.append((column_index_from_string(match.group(1).decode()), match.group(3), match.group(0)))
+
+    styles = {col: (_STYLE.search(attrs) or None) for col, attrs, _ in existing}
+    default_style = b""
+    for match in styles.values():
+        if match is not None:
+            default_style = b' s="' + match.group(1) + b'"'
+            break
+
+    merged = {col: xml for col, _, xml in existing}
+    for col, value in cells.items():
+        match = styles.get(col)
+        style = b' s="' + match.group(1) + b'"' if match is not None else default_style
+        merged[col] = _cell_xml(f"{get_column_letter(col)}{row}", style, value)
+    body = b"".join(merged[col] for col in sorted(merged))
+    return row_xml[:open_end] + body + row_xml[close_start:]
+
+
+def patch_sheet_xml(xml: bytes, updates: Dict[Tuple[int, int], object]) -> bytes:
+    """
+    修补工作表 XML 中的单元格值，只解析被修改的行
+    :param updates: {(行, 列): 值}，行列从1开始
+    """
+    by_row: Dict[int, Dict[int, object]] = {}
+    for (r, c), value in updates.items():
+        by_row.setdefault(r, {})[c] = value
+
+    parts = []
+    pos = 0
+    for r in sorted(by_row):
+        start = xml.find(f'<row r="{r}"'.encode(), pos)
+        if start < 0:
+            raise ValueError(f"工作表中没有第 {r} 行，无法增量修补")
+        end = xml.index(b"</row>", start) + len(b"</row>")
+        parts.append(xml[pos:start])
+        parts.append(_patch_row(xml[start:end], r, by_row[r]))
+        pos = end
+    parts.append(xml[pos:])
+    return b"".join(parts)
+
+
+def patch_custom_properties(xml: bytes, properties: Dict[str, str]) -> bytes:
+    """修改已有的文本型自定义属性（如 random_seed）的值"""
+    for name, value in properties.items():
+        pattern = re.compile(rb'(<property\b[^>]*\bname="' + re.escape(escape(name).encode()) + rb'"[^>]*>\s*<vt:lpwstr>).*?(</vt:lpwstr>)', re.S)
+        xml = pattern.sub(lambda m: m.group(1) + escape(str(value)).encode() + m.group(2), xml)
+    return xml
+
+
+def patch_workbook_cells(path: str, updates: Dict[int, Dict[Tuple[int, int], object]],
+                         properties: Optional[Dict[str, str]] = None):
+    """
+    就地修补 xlsx 中若干单元格的值：只重写涉及的工作表 XML，其余部件原样复制
+    :param updates: {工作表序号（从0开始，按工作簿顺序）: {(行, 列): 值}}
+    :param properties: 需同时更新的自定义属性 {名称: 文本值}
+    """
+    with zipfile.ZipFile(path) as zf:
+        paths = sheet_paths(zf)
+        patched = {}
+        for index, cells in updates.items():
+            if cells:
+                patched[paths[index]] = patch_sheet_xml(zf.read(paths[index]), cells)
+        if properties and _CUSTOM_PROPS in zf.namelist():
+            patched[_CUSTOM_PROPS] = patch_custom_properties(zf.read(_CUSTOM_PROPS), properties)
+
+        fd, tmp_path = tempfile.mkstemp(suffix=".xlsx", dir=os.path.dirname(os.path.abspath(path)))
+        os.close(fd)
+        try:
+            with zipfile.ZipFile(tmp_path, "w") as out:
+                for info in zf.infolist():
+                    data = patched.get(info.filename)
+                    out.writestr(info, data if data is not None else zf.read(info.filename))
+            # mkstemp 创建的临时文件权限为 0600，替换前沿用原文件的权限
+            shutil.copymode(path, tmp_path)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+    os.replace(tmp_path, path)
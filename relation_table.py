@@ -27,11 +27,10 @@ from PyQt6.QtWidgets import (
 
 try:
     from docx import Document
-    from docx.shared import Cm, Pt
     from docx.oxml import OxmlElement
     from docx.oxml.ns import qn
     from docx.enum.text import WD_ALIGN_PARAGRAPH
-    from docx.enum.table import WD_ALIGN_VERTICAL, WD_TABLE_ALIGNMENT, WD_ROW_HEIGHT_RULE
+    from io_app.docx_tables import DocxTable
 except Exception:
     Document = None
 
@@ -811,64 +810,6 @@ def _set_cell_border(cell, **kwargs):
         tcBorders.append(new_element)
 
 
-from docx.oxml import OxmlElement
-from docx.oxml.ns import qn
-
-def set_table_borders(table):
-    """
-    【核弹级】强制给整个表格加上边框（包括内部和外部）
-    这比给每个单元格加边框更稳定，不会因为合并单元格而断线。
-    """
-    tbl = table._tbl
-    tblPr = tbl.tblPr
-    
-    # 确保 tblPr 存在
-    if tblPr is None:
-        tblPr = OxmlElement('w:tblPr')
-        tbl.insert(0, tblPr)
-    
-    # 查找或创建 tblBorders 节点
-    tblBorders = tblPr.find(qn('w:tblBorders'))
-    if tblBorders is None:
-        tblBorders = OxmlElement('w:tblBorders')
-        tblPr.append(tblBorders)
-    
-    # 定义我们要设置的6条边：上下左右 + 内部横线 + 内部竖线
-    borders = {
-        'top': {"val": "single", "sz": "4", "color": "auto"},
-        'bottom': {"val": "single", "sz": "4", "color": "auto"},
-        'left': {"val": "single", "sz": "4", "color": "auto"},
-        'right': {"val": "single", "sz": "4", "color": "auto"},
-        'insideH': {"val": "single", "sz": "4", "color": "auto"}, # 内部横线
-        'insideV': {"val": "single", "sz": "4", "color": "auto"}  # 内部竖线
-    }
-    
-    # 循环应用每一个边框设置
-    for border_name, attrs in borders.items():
-        # 先删除旧的设置（防止冲突）
-        existing = tblBorders.find(qn(f'w:{border_name}'))
-        if existing is not None:
-            tblBorders.remove(existing)
-            
-        # 创建新的 XML 节点
-        border = OxmlElement(f'w:{border_name}')
-        for key, value in attrs.items():
-            border.set(qn(f'w:{key}'), value)
-        tblBorders.append(border)
-
-def set_first_column_bold(table):
-    """
-    将表格的第一列所有文字设置为加粗
-    """
-    for row in table.rows:
-        # 获取每一行的第1个单元格 (索引为0)
-        cell = row.cells[0]
-        
-        # 遍历单元格里的所有段落和文字块，把它们变粗
-        for paragraph in cell.paragraphs:
-            for run in paragraph.runs:
-                run.bold = True
-
 def export_relation_table(
     output_path: str,
     objectives_count: int,
@@ -879,101 +820,45 @@ def export_relation_table(
     obj_totals: List[float],
     total_sum: float,
 ):
-    doc = Document()
     cols = 2 + objectives_count + 2
-    method_rows = sum(1 if c <= 0 else c for c in link_counts)
-    rows = 2 + method_rows + 1
-    table = doc.add_table(rows=rows, cols=cols)
-    table.autofit = False
-    table.alignment = WD_TABLE_ALIGNMENT.CENTER
-
     total_width = 14.64
-    col_width = total_width / cols
-    for c in range(cols):
-        for r in range(rows):
-            table.cell(r, c).width = Cm(col_width)
-
-    def _mark_header(row):
-        tr = row._tr
-        trPr = tr.get_or_add_trPr()
-        tbl_header = OxmlElement('w:tblHeader')
-        tbl_header.set(qn('w:val'), 'true')
-        trPr.append(tbl_header)
-
-    def _set_cell_text(cell, text, bold=False):
-        cell.text = ''
-        p = cell.paragraphs[0]
-        p.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        run = p.add_run(text)
-        run.font.name = '\u4eff\u5b8b'
-        run._element.rPr.rFonts.set(qn('w:eastAsia'), '\u4eff\u5b8b')
-        run.font.size = Pt(12)
-        run.bold = bold
-        cell.vertical_alignment = WD_ALIGN_VERTICAL.CENTER
-
-    # Header row 1
-    _set_cell_text(table.cell(0, 0), '\u8003\u6838\u73af\u8282', bold=True)
-    _set_cell_text(table.cell(0, 1), '\u8003\u6838\u65b9\u5f0f', bold=True)
-    _set_cell_text(table.cell(0, 2), '\u8bfe\u7a0b\u76ee\u6807\u5206\u6743\u91cd', bold=True)
-    table.cell(0, 2).merge(table.cell(0, 1 + objectives_count))
-    _set_cell_text(table.cell(0, 2 + objectives_count), '\u5c0f\u8ba1', bold=True)
-    _set_cell_text(table.cell(0, 3 + objectives_count), '\u5408\u8ba1', bold=True)
-
-    # Header row 2
-    for i in range(objectives_count):
-        _set_cell_text(table.cell(1, 2 + i), f"\u8bfe\u7a0b\u76ee\u6807{i+1}", bold=True)
-
-    # Merge header vertical cells
+    table = DocxTable([total_width / cols] * cols, border_size=4)
+
+    # Header rows（跨页重复）；第一列整列加粗
+    header = ['\u8003\u6838\u73af\u8282', '\u8003\u6838\u65b9\u5f0f', '\u8bfe\u7a0b\u76ee\u6807\u5206\u6743\u91cd']
+    header += [''] * (objectives_count - 1) + ['\u5c0f\u8ba1', '\u5408\u8ba1']
+    table.add_row(header, bold=True, header=True)
+    table.add_row(['', ''] + [f"\u8bfe\u7a0b\u76ee\u6807{i+1}" for i in range(objectives_count)], bold=True, header=True)
+    table.merge(0, 2, 0, 1 + objectives_count)
     for col in [0, 1, 2 + objectives_count, 3 + objectives_count]:
-        table.cell(0, col).merge(table.cell(1, col))
-
-    _mark_header(table.rows[0])
-    _mark_header(table.rows[1])
+        table.merge(0, col, 1, col)
 
     # Fill rows
-    data_row = 2
     method_idx = 0
     for link_idx, link_name in enumerate(link_names):
         rows_for_link = 1 if link_counts[link_idx] <= 0 else link_counts[link_idx]
         link_label = f"{link_name}\n{_format_percent(link_ratios[link_idx] * 100)}"
-        _set_cell_text(table.cell(data_row, 0), link_label, bold=False)
+        methods = methods_data[method_idx:method_idx + rows_for_link]
+        link_total = sum(method["subtotal"] for method in methods)
+        link_start = len(table.rows)
+        for offset, method in enumerate(methods):
+            values = [link_label if offset == 0 else '', method["method_name"] or " "]
+            values += [_format_percent(value) for value in method["weights"]]
+            values += [_format_percent(method["subtotal"]), _format_percent(link_total) if offset == 0 else '']
+            table.add_row(values, bold={0})
+        method_idx += rows_for_link
         if rows_for_link > 1:
-            table.cell(data_row, 0).merge(table.cell(data_row + rows_for_link - 1, 0))
-            table.cell(data_row, 3 + objectives_count).merge(
-                table.cell(data_row + rows_for_link - 1, 3 + objectives_count)
-            )
-        link_total = 0.0
-        for _ in range(rows_for_link):
-            row = data_row
-            method = methods_data[method_idx]
-            _set_cell_text(table.cell(row, 1), method["method_name"] or " ", bold=False)
-            for obj_idx, value in enumerate(method["weights"]):
-                _set_cell_text(table.cell(row, 2 + obj_idx), _format_percent(value), bold=False)
-            _set_cell_text(table.cell(row, 2 + objectives_count), _format_percent(method["subtotal"]), bold=False)
-            link_total += method["subtotal"]
-            data_row += 1
-            method_idx += 1
-        _set_cell_text(
-            table.cell(data_row - rows_for_link, 3 + objectives_count),
-            _format_percent(link_total),
-            bold=False,
-        )
+            table.merge(link_start, 0, link_start + rows_for_link - 1, 0)
+            table.merge(link_start, 3 + objectives_count, link_start + rows_for_link - 1, 3 + objectives_count)
 
     # Total row
-    total_row = rows - 1
-    _set_cell_text(table.cell(total_row, 0), "100%", bold=True)
-    _set_cell_text(table.cell(total_row, 1), "\u8bfe\u7a0b\u76ee\u6807\u603b\u6743\u91cd", bold=True)
-    for obj_idx, value in enumerate(obj_totals):
-        _set_cell_text(table.cell(total_row, 2 + obj_idx), _format_percent(value), bold=False)
-    _set_cell_text(table.cell(total_row, 2 + objectives_count), _format_percent(total_sum), bold=False)
-    _set_cell_text(table.cell(total_row, 3 + objectives_count), _format_percent(100.0), bold=False)
-
-    # === 【修改这里】 ===
-    # 不需要遍历单元格了，直接给表格下达“全局显示边框”的指令
-    set_table_borders(table)
-    # ==================
-    # 2. 【新增】把第一列加粗
-    set_first_column_bold(table)
+    totals = ["100%", "\u8bfe\u7a0b\u76ee\u6807\u603b\u6743\u91cd"]
+    totals += [_format_percent(value) for value in obj_totals]
+    totals += [_format_percent(total_sum), _format_percent(100.0)]
+    table.add_row(totals, bold={0, 1})
+
+    doc = Document()
+    table.add_to(doc)
     doc.save(output_path)
 
 def export_relation_json(
@@ -0,0 +1,91 @@
+import os
+import sys
+
+import numpy as np
+import openpyxl
+import pytest
+
+# 测试直接导入仓库根目录下的模块（apply_noise、cli、core_app 等）
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def make_relation_payload(obj_count=3):
+    """三个环节（平时 / 期中 / 期末）的关系表 payload，各方法支撑在目标间均分"""
+    links = []
+    for link_name, ratio, methods in [
+        ("平时考核", 0.3, ["作业", "考勤", "实验"]),
+        ("期中考核", 0.2, ["期中考试"]),
+        ("期末考核", 0.5, ["期末考试", "大作业"]),
+    ]:
+        subtotal = round(1 / len(methods), 6)
+        links.append({
+            "name": link_name,
+            "ratio": ratio,
+            "methods": [
+                {
+                    "name": name,
+                    "supports": {f"课程目标{i + 1}": round(subtotal / obj_count, 6) for i in range(obj_count)},
+                    "subtotal": subtotal,
+                }
+                for name in methods
+            ],
+        })
+    return {"objectives_count": obj_count, "links": links}
+
+
+def write_forward_workbook(path, payload, n=30, seed=0):
+    """按关系表写出正向成绩模板（两行表头：环节 / 考核方式），返回分数矩阵"""
+    rng = np.random.default_rng(seed)
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.cell(1, 1, "姓名")
+    ws.cell(2, 1, "姓名")
+    ws.merge_cells(start_row=1, start_column=1, end_row=2, end_column=1)
+    col = 2
+    for link in payload["links"]:
+        start = col
+        for method in link["methods"]:
+            ws.cell(2, col, method["name"])
+            col += 1
+        ws.cell(1, start, link["name"])
+        if col - 1 > start:
+            ws.merge_cells(start_row=1, start_column=start, end_row=1, end_column=col - 1)
+    scores = rng.integers(30, 100, size=(n, col - 2))
+    for i in range(n):
+        ws.cell(3 + i, 1, f"学生{i}")
+        for j in range(col - 2):
+            ws.cell(3 + i, 2 + j, int(scores[i, j]))
+    wb.save(path)
+    return scores.astype(float)
+
+
+class TextValue:
+    """界面输入框的最小替身（text / setText）"""
+
+    def __init__(self, value=""):
+        self.value = str(value)
+
+    def text(self):
+        return self.value
+
+    def setText(self, value):
+        self.value = str(value)
+
+
+def make_processor(input_file, payload, output_dir, seed=7):
+    from core import GradeProcessor
+
+    processor = GradeProcessor(
+        TextValue("测试课程"), TextValue("3"), [TextValue("0.33")] * 3,
+        TextValue("0.3"), TextValue("0.2"), TextValue("0.5"), TextValue(),
+        str(input_file), relation_payload=payload,
+    )
+    processor.set_output_dir(str(output_dir))
+    processor.set_random_seed(seed)
+    processor.load_previous_achievement("")
+    return processor
+
+
+@pytest.fixture
+def relation_payload():
+    return make_relation_payload()
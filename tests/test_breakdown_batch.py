@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from apply_noise import GradeReverseEngine
+
+
+STRUCTURE = {
+    "作业": {"weight": 0.2, "type": "normal"},
+    "实验": {"weight": 0.3, "type": "left_skewed"},
+    "考勤": {"weight": 0.5, "type": "discrete", "levels": [60, 70, 80, 90, 100]},
+}
+WEIGHTS = np.array([0.2, 0.3, 0.5])
+
+
+def _totals(n=400, seed=3):
+    totals = np.round(np.random.default_rng(seed).uniform(0, 100, n), 1)
+    totals[:4] = [0.0, 1.5, 98.5, 100.0]
+    return totals
+
+
+@pytest.mark.parametrize("spread_mode", ["large", "medium", "small"])
+def test_weighted_totals_exact_without_step(spread_mode):
+    engine = GradeReverseEngine(seed=5)
+    totals = _totals()
+    scores = engine.generate_breakdown_batch(totals, STRUCTURE, spread_mode=spread_mode)
+    assert scores.shape == (totals.size, 3)
+    # 结果保留1位小数，加权和误差不超过舍入量
+    assert np.abs(scores @ WEIGHTS - totals).max() <= 0.05 + 1e-9
+    assert scores.min() >= 0.0 and scores.max() <= 100.0
+
+
+def test_extreme_totals_copied_to_every_method():
+    engine = GradeReverseEngine(seed=5)
+    scores = engine.generate_breakdown_batch(np.array([1.0, 99.0]), STRUCTURE)
+    assert np.array_equal(scores, [[1.0] * 3, [99.0] * 3])
+
+
+def test_same_seed_reproduces_breakdown():
+    totals = _totals()
+    noise = {"noise_ratio": 0.2, "severity_mode": "random", "allowed_items": ["作业", "实验"]}
+    first = GradeReverseEngine(seed=42).generate_breakdown_batch(totals, STRUCTURE, noise, score_step=0.5)
+    second = GradeReverseEngine(seed=42).generate_breakdown_batch(totals, STRUCTURE, noise, score_step=0.5)
+    other = GradeReverseEngine(seed=43).generate_breakdown_batch(totals, STRUCTURE, noise, score_step=0.5)
+    assert np.array_equal(first, second)
+    assert not np.array_equal(first, other)
+
+
+def test_spawned_engines_are_reproducible_and_independent():
+    a1, b1 = GradeReverseEngine(seed=9).spawn(2)
+    a2, b2 = GradeReverseEngine(seed=9).spawn(2)
+    assert a1.seed == b1.seed == 9
+    draws_a1, draws_b1 = a1.rng.random(8), b1.rng.random(8)
+    assert np.array_equal(draws_a1, a2.rng.random(8))
+    assert np.array_equal(draws_b1, b2.rng.random(8))
+    assert not np.array_equal(draws_a1, draws_b1)
+
+
+def test_compiled_plan_matches_structure_call():
+    totals = _totals(50)
+    engine = GradeReverseEngine(seed=1)
+    plan = engine.compile_plan(STRUCTURE)
+    from_plan = GradeReverseEngine(seed=1).generate_breakdown_batch(totals, plan)
+    from_structure = GradeReverseEngine(seed=1).generate_breakdown_batch(totals, STRUCTURE)
+    assert np.array_equal(from_plan, from_structure)
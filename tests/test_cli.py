@@ -0,0 +1,71 @@
+import json
+
+import openpyxl
+import pytest
+
+import cli
+from tests.conftest import write_forward_workbook
+
+
+@pytest.fixture
+def course_files(tmp_path, relation_payload):
+    relation = tmp_path / "relation.json"
+    relation.write_text(json.dumps(relation_payload, ensure_ascii=False), encoding="utf-8")
+    grades = tmp_path / "grades.xlsx"
+    write_forward_workbook(grades, relation_payload, n=12)
+    return relation, grades
+
+
+def _args(relation, grades, out, *extra):
+    return ["--relation", str(relation), "--input", str(grades), "--output-dir", str(out),
+            "--course-name", "测试课程", *extra]
+
+
+def test_forward_run_succeeds(tmp_path, course_files, capsys):
+    relation, grades = course_files
+    code = cli.main(_args(relation, grades, tmp_path / "out", "--seed", "3"))
+    assert code == cli.EXIT_OK
+    summary = json.loads(capsys.readouterr().out.strip().splitlines()[-1])
+    assert summary["mode"] == "forward"
+    assert summary["seed"] == 3
+    assert set(summary["achievement"]) >= {"课程目标1", "总达成度"}
+
+
+def test_bad_header_is_validation_failure(tmp_path, course_files):
+    relation, grades = course_files
+    wb = openpyxl.load_workbook(grades)
+    wb.active.cell(2, 2, "未知方法")
+    wb.save(grades)
+    assert cli.main(_args(relation, grades, tmp_path / "out")) == cli.EXIT_VALIDATION
+
+
+def test_missing_input_is_validation_failure(tmp_path, course_files):
+    relation, _ = course_files
+    assert cli.main(_args(relation, tmp_path / "missing.xlsx", tmp_path / "out")) == cli.EXIT_VALIDATION
+
+
+def test_bad_config_value_is_validation_failure(tmp_path, course_files):
+    relation, grades = course_files
+    config = tmp_path / "config.json"
+    config.write_text(json.dumps({"method_correlation": 0.5}), encoding="utf-8")
+    assert cli.main(_args(relation, grades, tmp_path / "out", "--config", str(config))) == cli.EXIT_VALIDATION
+
+
+def test_usage_errors(tmp_path, course_files):
+    relation, _ = course_files
+    assert cli.main(["--relation", str(relation)]) == cli.EXIT_USAGE
+    assert cli.main(["--mode", "sideways"]) == cli.EXIT_USAGE
+    assert cli.main(["--input", "x.xlsx", "--config", str(tmp_path / "missing.json")]) == cli.EXIT_USAGE
+
+
+def test_processing_error_is_failure(tmp_path, course_files, monkeypatch):
+    from core import GradeProcessor
+
+    relation, grades = course_files
+
+    def broken(self, *args, **kwargs):
+        raise ValueError("写出失败")
+
+    # 校验通过后处理阶段抛出的 ValueError 不应记为校验失败
+    monkeypatch.setattr(GradeProcessor, "process_forward_grades", broken)
+    assert cli.main(_args(relation, grades, tmp_path / "out")) == cli.EXIT_FAILED
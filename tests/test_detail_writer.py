@@ -0,0 +1,75 @@
+import openpyxl
+import pytest
+
+from io_app.detail_writer import DetailWorkbookWriter
+
+
+LINK_BLOCKS = [
+    ("平时考核(30%)", [("作业", [40.0, 40.0], 80.0), ("考勤", [45.0, 45.0], 90.0)], [42.5, 42.5], 85.0),
+    ("期末考核(70%)", [("期末考试", [35.0, 35.0], 70.0)], [35.0, 35.0], 70.0),
+]
+
+
+def _write(path, students=2):
+    writer = DetailWorkbookWriter(str(path), ["课程目标1", "课程目标2"])
+    for i in range(students):
+        writer.add_student(f"学生{i}", "中等", LINK_BLOCKS, [37.25, 37.25], 74.5)
+    return writer
+
+
+def test_student_block_layout(tmp_path):
+    path = tmp_path / "detail.xlsx"
+    _write(path).close()
+    ws = openpyxl.load_workbook(path).active
+
+    assert ws.title == DetailWorkbookWriter.DETAIL_TITLE
+    assert [c.value for c in ws[1]] == ["姓名", "考核环节", "考核方式", "课程目标1", "课程目标2", "小计", "合计", "等级"]
+    height = DetailWorkbookWriter.student_block_height(LINK_BLOCKS)
+    assert height == 6
+    assert ws.max_row == 1 + 2 * height
+
+    # 第一名学生：第2-7行
+    assert [ws.cell(r, 3).value for r in range(2, 8)] == ["作业", "考勤", "环节合计", "期末考试", "环节合计", "课程总评"]
+    assert [c.value for c in ws[2]] == ["学生0", "平时考核(30%)", "作业", 40, 40, 80, None, "中等"]
+    assert ws.cell(4, 7).value == 85
+    assert [c.value for c in ws[7]][1:7] == ["100%", "课程总评", 37.25, 37.25, None, 74.5]
+
+    merged = {str(r) for r in ws.merged_cells.ranges}
+    assert {"A2:A7", "B2:B4", "B5:B6", "H2:H7", "A8:A13", "B8:B10", "B11:B12", "H8:H13"} <= merged
+
+
+def test_rows_match_patch_values():
+    rows = DetailWorkbookWriter.student_rows("学生0", "中等", LINK_BLOCKS, [37.25, 37.25], 74.5)
+    assert len(rows) == DetailWorkbookWriter.student_block_height(LINK_BLOCKS)
+    # 合并区域内除锚点外留空
+    assert [row[0] for row in rows] == ["学生0", "", "", "", "", ""]
+    assert [row[-1] for row in rows] == ["中等", "", "", "", "", "中等"]
+
+
+def test_small_sheet_copied_with_merges(tmp_path):
+    src = openpyxl.Workbook().active
+    src.title = "课程成绩统计"
+    src["A1"] = "课程成绩统计表"
+    src.merge_cells("A1:C1")
+    src["A2"], src["B2"], src["C2"] = "优秀", "良好", "中等"
+    src["A3"], src["B3"], src["C3"] = 3, 5, 2
+    src.column_dimensions["A"].width = 20
+
+    path = tmp_path / "detail.xlsx"
+    writer = _write(path, students=1)
+    writer.add_sheet_from(src)
+    writer.close()
+
+    ws = openpyxl.load_workbook(path)["课程成绩统计"]
+    assert ws["A1"].value == "课程成绩统计表"
+    assert [str(r) for r in ws.merged_cells.ranges] == ["A1:C1"]
+    assert [c.value for c in ws[3]] == [3, 5, 2]
+    assert ws.column_dimensions["A"].width == pytest.approx(20, abs=1)
+
+
+def test_overlapping_merge_rejected(tmp_path):
+    writer = DetailWorkbookWriter(str(tmp_path / "detail.xlsx"), ["课程目标1"])
+    writer._close_merge(writer.ws, 1, 0, 3, 0)
+    with pytest.raises(ValueError):
+        writer._close_merge(writer.ws, 2, 0, 4, 1)
+    writer.close()
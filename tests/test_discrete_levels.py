@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from apply_noise import GradeReverseEngine
+
+
+def _scalar_valid_levels(levels, target):
+    """原逐个学生的规则：±15 分内的档位；没有时取最接近的档位（并列取列表中靠前的）"""
+    valid = [lv for lv in levels if abs(lv - target) <= 15]
+    return valid or [min(levels, key=lambda lv: abs(lv - target))]
+
+
+@pytest.mark.parametrize("levels", [[20, 95], [10, 50, 100], [0, 100], [60, 70, 80, 85, 90, 95], [95, 20]])
+def test_matches_scalar_rule(levels):
+    engine = GradeReverseEngine(seed=4)
+    targets = np.round(np.random.default_rng(2).uniform(0, 100, 4000), 1)
+    # 补上各档位 ±15 边界附近的目标
+    edges = np.array(levels, dtype=float)
+    targets = np.concatenate([targets, edges - 15, edges + 15, edges - 15.1, edges + 15.1, edges - 14.9])
+
+    scores = engine.dist_discrete(targets, levels=levels, size=targets.shape)
+    for target, score in zip(targets, scores):
+        assert score in _scalar_valid_levels(levels, target)
+
+
+def test_gap_fallback_uses_value_not_bucket_midpoint():
+    engine = GradeReverseEngine(seed=0)
+    # 空档 (35, 80) 的代表点为 57.5；档位应按目标本身取最接近的，而不是整段都取代表点的最近档位
+    levels = [20, 95]
+    targets = np.array([35.5, 57.4, 57.6, 79.9])
+    scores = engine.dist_discrete(targets, levels=levels, size=targets.shape)
+    assert scores.tolist() == [20, 20, 95, 95]
+
+
+def test_scalar_call_returns_float():
+    engine = GradeReverseEngine(seed=0)
+    assert engine.dist_discrete(55.0, levels=[20, 95]) == 20.0
+    assert engine.dist_discrete(60.0, levels=[20, 95]) == 95.0
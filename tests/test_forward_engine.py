@@ -0,0 +1,135 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from core_app.forward_calc import AchievementResult, ForwardCalculator, GradeAggregates, RelationMatrix
+from io_app.score_table import load_score_table
+from tests.conftest import make_relation_payload, write_forward_workbook
+
+
+def _legacy_forward(df, payload):
+    """矩阵引擎之前按学生逐行、逐环节、逐方法累加的正向计算（对照用）"""
+    obj_keys = [f"课程目标{i + 1}" for i in range(payload["objectives_count"])]
+    students = []
+    for _, row in df.iterrows():
+        name = row.get("姓名")
+        if pd.isna(name) or str(name).strip() == "":
+            continue
+        total_score = 0.0
+        total_obj_scores = [0.0] * len(obj_keys)
+        link_scores = []
+        for link in payload["links"]:
+            link_ratio = float(link.get("ratio", 0))
+            methods = link.get("methods", []) or [{"name": "无", "supports": {}, "subtotal": 1.0}]
+            link_obj_scores = [0.0] * len(obj_keys)
+            link_score = 0.0
+            for m in methods:
+                try:
+                    score = float(row.get(m.get("name", "无"), 0))
+                except Exception:
+                    score = 0.0
+                supports = m.get("supports", {}) or {}
+                for i, k in enumerate(obj_keys):
+                    link_obj_scores[i] += score * float(supports.get(k, 0))
+                link_score += score * float(m.get("subtotal", 0))
+            link_scores.append(link_score)
+            total_score += link_score * link_ratio
+            for i, v in enumerate(link_obj_scores):
+                total_obj_scores[i] += v * link_ratio
+        students.append((name, link_scores, total_obj_scores, total_score))
+    return students
+
+
+def _legacy_achievement(payload, method_avgs):
+    """矩阵化之前表5的 目标×环节×方法 三重循环（对照用）"""
+    obj_keys = [f"课程目标{i + 1}" for i in range(payload["objectives_count"])]
+    result = {}
+    total_weight = total_actual = 0.0
+    for idx, obj_key in enumerate(obj_keys):
+        weight_sum = actual_sum = 0.0
+        for link in payload["links"]:
+            link_ratio = float(link.get("ratio", 0))
+            support_sum = actual = 0.0
+            for m in link.get("methods", []) or []:
+                weight = float((m.get("supports", {}) or {}).get(obj_key, 0))
+                support_sum += weight
+                actual += float(method_avgs.get(f"{link['name']}||{m.get('name')}", 0)) * weight
+            weight_sum += link_ratio * 100.0 * support_sum
+            actual_sum += link_ratio * actual
+        result[f"课程目标{idx + 1}"] = round(actual_sum / weight_sum, 3) if weight_sum > 0 else 0
+        total_weight += weight_sum
+        total_actual += actual_sum
+    result["总达成度"] = round(total_actual / total_weight, 3) if total_weight > 0 else 0
+    return result
+
+
+def _uneven_payload():
+    """各方法支撑不均、含空环节的关系表"""
+    payload = make_relation_payload(obj_count=2)
+    payload["links"][0]["methods"][0]["supports"] = {"课程目标1": 0.3, "课程目标2": 0.033333}
+    payload["links"][2]["methods"][1]["supports"] = {"课程目标2": 0.5}
+    payload["links"].append({"name": "实践环节", "ratio": 0.0, "methods": []})
+    return payload
+
+
+@pytest.fixture(params=["even", "uneven"])
+def payload(request):
+    return make_relation_payload() if request.param == "even" else _uneven_payload()
+
+
+def _forward_frame(payload, n=40, seed=5):
+    rng = np.random.default_rng(seed)
+    methods = [m["name"] for link in payload["links"] for m in link["methods"]]
+    df = pd.DataFrame(rng.integers(0, 101, (n, len(methods))), columns=methods).astype(object)
+    df.insert(0, "姓名", [f"学生{i}" for i in range(n)])
+    df.loc[3, "姓名"] = None           # 空姓名的行跳过
+    df.loc[5, methods[0]] = "缺考"      # 无法识别的分数记 0
+    return df
+
+
+def test_matches_legacy_row_loop(payload):
+    df = _forward_frame(payload)
+    result = ForwardCalculator(df, payload).run()
+    legacy = _legacy_forward(df, payload)
+
+    assert result.names == [name for name, _, _, _ in legacy]
+    assert np.allclose(result.link_scores, [s for _, s, _, _ in legacy])
+    assert np.allclose(result.total_obj_scores, [s for _, _, s, _ in legacy])
+    assert np.allclose(result.total_scores, [s for _, _, _, s in legacy])
+
+
+def test_score_table_input_matches_dataframe(tmp_path, payload):
+    path = tmp_path / "forward.xlsx"
+    write_forward_workbook(path, payload, n=25)
+    from_table = ForwardCalculator(load_score_table(str(path)), payload).run()
+    # 原 DataFrame 读取路径：第二行为表头，合并的“姓名”单元格读出为空列名
+    df = pd.read_excel(path, header=1).fillna(0)
+    df.columns = ["姓名"] + list(df.columns[1:])
+    from_frame = ForwardCalculator(df, payload).run()
+    assert from_table.names == from_frame.names
+    assert np.allclose(from_table.method_scores, from_frame.method_scores)
+    assert np.allclose(from_table.total_scores, from_frame.total_scores)
+
+
+def test_achievement_matches_legacy_table5(payload):
+    df = _forward_frame(payload)
+    result = ForwardCalculator(df, payload).run()
+    achievement = AchievementResult(result.relation, result.method_means)
+    assert achievement.achievement_dict() == _legacy_achievement(payload, result.method_averages())
+
+
+def test_incremental_aggregates_match_recompute(payload):
+    df = _forward_frame(payload)
+    result = ForwardCalculator(df, payload).run()
+    aggregates = GradeAggregates.from_result(result)
+
+    changed = np.array([0, 7, 11])
+    new_scores = result.method_scores.copy()
+    new_scores[changed] = np.random.default_rng(1).integers(0, 101, (changed.size, new_scores.shape[1]))
+    updated = ForwardCalculator(None, RelationMatrix(payload)).compute(result.names, new_scores)
+    aggregates.update(changed, result.method_scores[changed], new_scores[changed], updated.total_scores[changed])
+
+    fresh = GradeAggregates.from_result(updated)
+    assert np.allclose(aggregates.method_means, fresh.method_means)
+    assert aggregates.average == pytest.approx(fresh.average)
+    assert np.array_equal(aggregates.grade_counts, fresh.grade_counts)
@@ -0,0 +1,64 @@
+import openpyxl
+from docx import Document
+
+from tests.conftest import make_processor, write_forward_workbook
+
+
+def _sheet_values(path):
+    wb = openpyxl.load_workbook(path)
+    return {
+        ws.title: (
+            [[c.value for c in row] for row in ws.iter_rows()],
+            sorted(str(r) for r in ws.merged_cells.ranges),
+        )
+        for ws in wb.worksheets
+    }
+
+
+def _docx_text(path):
+    return [[cell.text for row in table.rows for cell in row.cells] for table in Document(path).tables]
+
+
+def _outputs(out_dir):
+    files = sorted(p.name for p in out_dir.iterdir() if p.suffix in (".xlsx", ".docx"))
+    return files, {
+        name: _sheet_values(out_dir / name) if name.endswith(".xlsx") else _docx_text(out_dir / name)
+        for name in files
+    }
+
+
+def _run(input_file, payload, out_dir, incremental):
+    processor = make_processor(input_file, payload, out_dir)
+    overall = processor.process_forward_grades(incremental=incremental)
+    return overall, dict(processor.current_achievement)
+
+
+def test_incremental_update_matches_full_rerun(tmp_path, relation_payload, capsys):
+    grades = tmp_path / "grades.xlsx"
+    write_forward_workbook(grades, relation_payload, n=40, seed=2)
+    inc_dir, full_dir = tmp_path / "inc", tmp_path / "full"
+    _run(grades, relation_payload, inc_dir, incremental=True)
+
+    # 修正几名学生的成绩（含跨越等级区间的改动）
+    wb = openpyxl.load_workbook(grades)
+    ws = wb.active
+    for row, col, value in [(3, 2, 0), (10, 5, 100), (25, 7, 100), (41, 3, 12)]:
+        ws.cell(row, col, value)
+    wb.save(grades)
+
+    capsys.readouterr()
+    incremental = _run(grades, relation_payload, inc_dir, incremental=True)
+    assert "[增量] 4 名学生成绩有变化" in capsys.readouterr().out
+    full = _run(grades, relation_payload, full_dir, incremental=False)
+    assert incremental == full
+    assert _outputs(inc_dir) == _outputs(full_dir)
+
+
+def test_incremental_without_changes_keeps_outputs(tmp_path, relation_payload):
+    grades = tmp_path / "grades.xlsx"
+    write_forward_workbook(grades, relation_payload, n=15, seed=4)
+    out_dir = tmp_path / "out"
+    first = _run(grades, relation_payload, out_dir, incremental=True)
+    before = _outputs(out_dir)
+    assert _run(grades, relation_payload, out_dir, incremental=True) == first
+    assert _outputs(out_dir) == before
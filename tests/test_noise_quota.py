@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from apply_noise import GradeReverseEngine
+
+
+@pytest.mark.parametrize("ratio", [0.0, 0.05, 0.13, 0.5, 1.0])
+def test_exact_quota_of_eligible_students(ratio):
+    engine = GradeReverseEngine(seed=3)
+    n = 137
+    scores = np.full((n, 4), 80.0)
+    eligible = np.arange(n) % 3 != 0
+    allowed = np.array([True, False, True, False])
+    rows, cols = engine.apply_noise_batch(scores, eligible, allowed, ratio)
+
+    assert rows.size == cols.size == round(ratio * eligible.sum())
+    assert np.unique(rows).size == rows.size
+    assert eligible[rows].all()
+    assert allowed[cols].all()
+    # 每名选中学生恰好一个分项被改为不及格
+    changed = scores != 80.0
+    assert changed.sum() == rows.size
+    assert changed[rows, cols].all()
+
+
+@pytest.mark.parametrize("mode,low,high", [("random", 40, 59.9), ("near_miss", 55, 59.9), ("catastrophic", 0, 40.0)])
+def test_scores_within_severity_range(mode, low, high):
+    engine = GradeReverseEngine(seed=8)
+    scores = np.full((300, 2), 90.0)
+    rows, cols = engine.apply_noise_batch(scores, np.ones(300, dtype=bool), np.ones(2, dtype=bool), 0.5, mode)
+    injected = scores[rows, cols]
+    assert injected.min() >= low and injected.max() <= high
+    assert np.array_equal(injected, np.round(injected, 1))
+
+
+def test_students_without_allowed_methods_are_not_candidates():
+    engine = GradeReverseEngine(seed=1)
+    scores = np.full((10, 2), 80.0)
+    allowed = np.zeros((10, 2), dtype=bool)
+    allowed[:4, 1] = True
+    rows, cols = engine.apply_noise_batch(scores, np.ones(10, dtype=bool), allowed, 0.5)
+    assert rows.size == 2
+    assert (rows < 4).all() and (cols == 1).all()
+
+
+def test_breakdown_noise_count_matches_quota():
+    engine = GradeReverseEngine(seed=11)
+    structure = {"作业": {"weight": 0.5}, "实验": {"weight": 0.5}}
+    # 总分不超过 75 时，其余分项总能补足被固定的不及格分数
+    totals = np.linspace(20, 75, 200)
+    noise = {"noise_ratio": 0.1, "severity_mode": "near_miss", "allowed_items": ["实验"]}
+    scores = engine.generate_breakdown_batch(totals, structure, noise)
+    assert engine.last_noise_rows.size == round(0.1 * totals.size)
+    assert (scores[engine.last_noise_rows, 1] < 60).all()
+    assert np.abs(scores @ [0.5, 0.5] - totals).max() <= 0.05 + 1e-9
+
+
+def test_high_scorers_skip_noise():
+    engine = GradeReverseEngine(seed=11)
+    structure = {"作业": {"weight": 0.5}, "实验": {"weight": 0.5}}
+    totals = np.linspace(20, 97, 200)
+    engine.generate_breakdown_batch(totals, structure, {"noise_ratio": 0.1, "allowed_items": ["实验"]})
+    eligible = (totals < 85) & (totals > 2)
+    assert engine.last_noise_rows.size == round(0.1 * eligible.sum())
+    assert eligible[engine.last_noise_rows].all()
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from apply_noise import GradeReverseEngine
+
+
+def test_projection_hits_total_within_bounds():
+    engine = GradeReverseEngine(seed=0)
+    rng = np.random.default_rng(4)
+    weights = np.array([0.1, 0.25, 0.4, 0.25])
+    draft = rng.uniform(0, 100, (500, 4))
+    totals = rng.uniform(10, 90, 500)
+    upper = np.full((500, 4), 99.0)
+    lower = np.zeros((500, 4))
+    lower[:, 0] = upper[:, 0] = 50.0  # 固定一列，模拟被注入的噪声分数
+    result = engine.project_to_weighted_total(draft, weights, totals, upper, lower)
+    assert np.allclose(result @ weights, totals, atol=1e-9)
+    assert (result >= lower - 1e-12).all() and (result <= upper + 1e-12).all()
+    assert np.array_equal(result[:, 0], np.full(500, 50.0))
+
+
+def test_projection_is_nearest_feasible_point():
+    # 不触及上下限时为加权欧氏投影：所有分项平移同一个 λ
+    engine = GradeReverseEngine(seed=0)
+    weights = np.array([0.5, 0.3, 0.2])
+    draft = np.array([[70.0, 60.0, 80.0]])
+    result = engine.project_to_weighted_total(draft, weights, np.array([72.0]), 100.0)
+    shift = result - draft
+    assert np.allclose(shift, shift[0, 0])
+    assert result[0] @ weights == pytest.approx(72.0)
+
+
+def test_unreachable_total_clamps_to_nearest_bound():
+    engine = GradeReverseEngine(seed=0)
+    weights = np.array([0.5, 0.5])
+    result = engine.project_to_weighted_total(np.array([[50.0, 50.0]]), weights, np.array([120.0]), 99.0)
+    assert np.array_equal(result, [[99.0, 99.0]])
+
+
+def test_adjust_scores_hits_target_on_integer_grid(relation_payload, tmp_path):
+    from tests.conftest import make_processor
+
+    processor = make_processor(tmp_path / "none.xlsx", relation_payload, tmp_path)
+    rng = np.random.default_rng(2)
+    weights = [0.2, 0.3, 0.5]
+    draft = rng.integers(40, 100, (200, 3)).astype(float)
+    targets = np.round(rng.uniform(50, 95, 200), 1)
+    result = processor.adjust_scores(draft, targets, weights, 0, 100, "normal")
+    assert result.shape == draft.shape
+    assert np.abs(result @ np.array(weights) - targets).max() <= 0.1 + 1e-9
+    assert result.min() >= 0 and result.max() <= 100
+    # 单行调用与批量调用一致
+    single = processor.adjust_scores(draft[0], targets[0], weights, 0, 100, "normal")
+    assert np.array_equal(single, result[0])
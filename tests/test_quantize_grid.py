@@ -0,0 +1,65 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from apply_noise import GradeReverseEngine
+
+
+def _brute_force_best(weights, step, lo, hi, total):
+    """枚举 [lo, hi] 内全部网格组合，返回与总分的最小偏差"""
+    best = np.inf
+    for combo in itertools.product(*[range(int(a), int(b) + 1) for a, b in zip(lo, hi)]):
+        best = min(best, abs(np.dot(combo, weights) * step - total))
+    return best
+
+
+def test_reaches_total_missed_by_local_search():
+    engine = GradeReverseEngine(seed=1)
+    weights = np.array([0.7, 0.3])
+    scores = engine.project_to_weighted_total(np.array([[91.0, 98.0]]), weights, np.array([93.0]), 100.0, 0.0)
+    result = engine.quantize_to_grid(scores, weights, np.array([93.0]), 1, 100.0)
+    assert result[0] @ weights == pytest.approx(93.0)
+
+
+@pytest.mark.parametrize("weights", [(0.7, 0.3), (0.37, 0.33, 0.3), (0.2, 0.3, 0.5), (0.15, 0.85)])
+@pytest.mark.parametrize("step", [1, 0.5])
+def test_matches_brute_force_on_small_grids(weights, step):
+    engine = GradeReverseEngine(seed=7)
+    rng = np.random.default_rng(11)
+    w = np.array(weights)
+    m = w.size
+    for _ in range(60):
+        # 小范围上下限（格数），便于穷举；部分分项模拟被固定的噪声分数
+        lo_units = rng.integers(0, 8, m)
+        hi_units = lo_units + rng.integers(0, 14, m)
+        pinned = rng.random(m) < 0.2
+        hi_units[pinned] = lo_units[pinned]
+        lower, upper = lo_units * step, hi_units * step
+        total = np.round(rng.uniform(lower @ w, upper @ w), 1)
+        draft = rng.uniform(lower, upper)[None, :]
+        scores = engine.project_to_weighted_total(draft, w, np.array([total]), upper[None, :], lower[None, :])
+
+        result = engine.quantize_to_grid(scores, w, np.array([total]), step, upper[None, :], lower[None, :])[0]
+        units = np.round(result / step)
+        assert np.allclose(units * step, result)
+        assert ((units >= lo_units) & (units <= hi_units)).all()
+
+        deviation = abs(result @ w - total)
+        best = _brute_force_best(w, step, lo_units, hi_units, total)
+        if best <= 0.05 + 1e-9:
+            assert deviation <= 0.05 + 1e-9
+        else:
+            assert deviation == pytest.approx(best, abs=1e-9)
+
+
+def test_breakdown_batch_hits_reachable_totals():
+    engine = GradeReverseEngine(seed=3)
+    plan = engine.compile_plan(
+        {"作业": {"weight": 0.7, "type": "normal"}, "测验": {"weight": 0.3, "type": "normal"}},
+        {"noise_ratio": 0.3, "severity_mode": "random", "allowed_items": None},
+    )
+    totals = np.round(np.random.default_rng(5).uniform(10, 95, 5000), 1)
+    result = engine.generate_breakdown_batch(totals, plan, score_step=1)
+    # 0.7/0.3 的整数网格可以表示任意一位小数的总分
+    assert np.abs(result @ plan.weights - totals).max() <= 0.05 + 1e-9
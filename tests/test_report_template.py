@@ -0,0 +1,131 @@
+from docx import Document
+from docx.enum.style import WD_STYLE_TYPE
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls, qn
+
+from core_app.docx_splice import DocumentSplicer
+from core_app.report_builder import ReportBuilder
+from core_app.report_template import compile_template
+
+
+def _split_paragraph(doc, pieces):
+    """段落文本按 pieces 拆成多个 run（模拟 Word 把占位符拆散保存）"""
+    p = doc.add_paragraph()
+    for i, text in enumerate(pieces):
+        p.add_run(text).bold = i % 2 == 1
+    return p
+
+
+def _template(path):
+    doc = Document()
+    _split_paragraph(doc, ["课程：{{cour", "se_na", "me}}（", "{{teacher}}", "）"])
+    _split_paragraph(doc, ["{{INSERT_", "DOC_2}}"])
+    doc.add_paragraph("正文")
+    table = doc.add_table(rows=1, cols=1)
+    table.cell(0, 0).paragraphs[0].add_run("{{department")
+    table.cell(0, 0).paragraphs[0].add_run("}}")
+    doc.add_paragraph("{{INSERT_DOC_5}}")
+    doc.save(path)
+
+
+def test_split_placeholders_merged_and_indexed(tmp_path):
+    path = tmp_path / "template.docx"
+    _template(path)
+    template = compile_template(str(path))
+
+    assert [keys for _, keys in template.text_runs] == [("{{course_name}}",), ("{{teacher}}",), ("{{department}}",)]
+    assert [key for _, key in template.insert_paragraphs] == ["{{INSERT_DOC_2}}", "{{INSERT_DOC_5}}"]
+
+    doc, text_runs, insert_paragraphs = template.new_document()
+    first = doc.paragraphs[0]
+    # 占位符合并进起始 run，其余文字与格式保持不变
+    assert first.text == "课程：{{course_name}}（{{teacher}}）"
+    assert [r.text for r in first.runs] == ["课程：{{course_name}}（", "{{teacher}}", "）"]
+    assert first.runs[1].bold
+    assert text_runs[0][0] is first.runs[0]._r
+    assert insert_paragraphs[0][0] is doc.paragraphs[1]._p
+
+
+def test_compiled_template_cached_by_content(tmp_path):
+    path = tmp_path / "template.docx"
+    _template(path)
+    assert compile_template(str(path)) is compile_template(str(path))
+    doc = Document(str(path))
+    doc.add_paragraph("{{term}}")
+    doc.save(path)
+    assert [keys for _, keys in compile_template(str(path)).text_runs][-1] == ("{{term}}",)
+
+
+def _source_document():
+    doc = Document()
+    base = doc.styles.add_style("报告基础", WD_STYLE_TYPE.PARAGRAPH)
+    child = doc.styles.add_style("报告正文", WD_STYLE_TYPE.PARAGRAPH)
+    child.base_style = base
+    doc.add_paragraph("第一段", style="报告正文")
+    numbered = doc.add_paragraph("编号段")
+    numbered._p.get_or_add_pPr().append(parse_xml(
+        f'<w:numPr {nsdecls("w")}><w:ilvl w:val="0"/><w:numId w:val="3"/></w:numPr>'
+    ))
+    r_id = doc.part.relate_to("https://example.com", RT.HYPERLINK, is_external=True)
+    doc.add_paragraph()._p.append(parse_xml(
+        f'<w:hyperlink {nsdecls("w", "r")} r:id="{r_id}"><w:r><w:t>链接</w:t></w:r></w:hyperlink>'
+    ))
+    doc.add_table(rows=2, cols=2).cell(1, 1).text = "表格"
+    return doc
+
+
+def test_splice_moves_body_and_merges_parts():
+    target = Document()
+    anchor = target.add_paragraph("锚点")._p
+    target.add_paragraph("结尾")
+    source = _source_document()
+    source_len = len([el for el in source.element.body if el.tag != qn("w:sectPr")])
+
+    count = DocumentSplicer(target).splice(source, anchor)
+
+    assert count == source_len
+    assert len(source.element.body) == 1  # 只剩源文档的 sectPr
+    body = [el for el in target.element.body]
+    assert len([el for el in body if el.tag == qn("w:sectPr")]) == 1
+    texts = [p.text for p in target.paragraphs]
+    assert texts[:3] == ["锚点", "第一段", "编号段"]
+    assert texts[-1] == "结尾"
+    assert target.tables[0].cell(1, 1).text == "表格"
+
+    # 缺失的样式连同 basedOn 链一起复制
+    style_ids = {s.get(qn("w:styleId")) for s in target.styles.element.iterchildren(qn("w:style"))}
+    assert {target.paragraphs[1].style.style_id, target.paragraphs[1].style.base_style.style_id} <= style_ids
+    assert target.paragraphs[1].style.name == "报告正文"
+
+    # 编号改写为目标中新建的 num，指向同样的编号定义
+    numbering = target.part.part_related_by(RT.NUMBERING).element
+    num_id = target.paragraphs[2]._p.pPr.numPr.numId.val
+    assert num_id > 9
+    assert numbering.xpath(f'w:num[@w:numId="{num_id}"]')
+
+    # 外部链接在目标文档中重新登记
+    link = target.element.body.xpath(".//w:hyperlink")[0]
+    rel = target.part.rels[link.get(qn("r:id"))]
+    assert rel.is_external and rel.target_ref == "https://example.com"
+
+
+def test_report_builder_splices_documents(tmp_path):
+    template_path = tmp_path / "template.docx"
+    _template(template_path)
+    output_dir = tmp_path / "out"
+
+    section = Document()
+    section.add_paragraph("统计表正文")
+    builder = ReportBuilder(str(template_path), str(output_dir), documents={"{{INSERT_DOC_2}}": section})
+    path = builder.build(
+        {"course_name": "测试课程", "teacher": "张老师", "department": "计算机学院"}, {"course_name": "测试课程"}, {}
+    )
+
+    report = Document(path)
+    texts = [p.text for p in report.paragraphs]
+    assert texts[0] == "课程：测试课程（张老师）"
+    assert "统计表正文" in texts and "正文" in texts
+    assert "{{INSERT_DOC_2}}" not in "".join(texts)
+    assert any(t.startswith("[缺失文档: 5_") for t in texts)
+    assert report.tables[0].cell(0, 0).text == "计算机学院"
@@ -0,0 +1,42 @@
+import numpy as np
+
+from io_app.score_readers import load_score_csv, read_csv_headers
+
+
+def _write(path, text, encoding):
+    with open(path, "w", newline="", encoding=encoding) as fh:
+        fh.write(text)
+
+
+def test_gbk_csv_with_long_ascii_prefix(tmp_path):
+    # 表头与前 64KB 以上的行全是 ASCII，在 UTF-8 下也能解码；中文姓名出现在文件后部
+    rows = ["name,usual,midterm"]
+    rows += [f"S{i:06d},{i % 100},{(i * 7) % 100}" for i in range(6000)]
+    rows += ["张三,88,91", "李四,75,60"]
+    path = tmp_path / "gbk.csv"
+    _write(path, "\r\n".join(rows) + "\r\n", "gbk")
+    assert path.stat().st_size > (1 << 16)
+
+    table = load_score_csv(str(path), 1)
+    assert len(table) == 6002
+    assert list(table.names[-2:]) == ["张三", "李四"]
+    assert table.header_rows[0] == ["name", "usual", "midterm"]
+    assert np.allclose(table.values[-1], [75, 60])
+    assert read_csv_headers(str(path), 1) == [["name", "usual", "midterm"]]
+
+
+def test_utf8_bom_csv(tmp_path):
+    path = tmp_path / "utf8.csv"
+    _write(path, "姓名,平时考核\r\n王五,80\r\n", "utf-8-sig")
+    table = load_score_csv(str(path), 1)
+    assert table.header_rows[0] == ["姓名", "平时考核"]
+    assert list(table.names) == ["王五"]
+
+
+def test_undecodable_bytes_fall_back_to_replacement(tmp_path):
+    path = tmp_path / "broken.csv"
+    # 0x80 在 UTF-8 与 GB18030 中都不能单独出现
+    path.write_bytes("姓名,平时考核\r\n".encode("gb18030") + b"A\x80B,70\r\n")
+    table = load_score_csv(str(path), 1)
+    assert len(table) == 1
+    assert table.values[0, 0] == 70
@@ -0,0 +1,53 @@
+import numpy as np
+import openpyxl
+
+from io_app.score_table import build_score_table, load_score_table
+
+
+def _forward_workbook(path):
+    """两个环节都有“作业”列的正向模板，学号为数字姓名，含一个无法识别的分数"""
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(["姓名", "平时考核", None, "期末考核", None])
+    ws.append(["姓名", "作业", "考勤", "作业", "期末考试"])
+    ws.merge_cells("B1:C1")
+    ws.merge_cells("D1:E1")
+    ws.append([20230001, 80, 90, 70, 60])
+    ws.append([None, 1, 1, 1, 1])
+    ws.append(["李四", "缺考", 85, "", 75.5])
+    wb.save(path)
+
+
+def test_duplicate_method_names_map_in_order(tmp_path):
+    path = tmp_path / "dup.xlsx"
+    _forward_workbook(path)
+    table = load_score_table(str(path))
+
+    assert table.columns == ["作业", "考勤", "作业", "期末考试"]
+    # 同名表头按出现顺序依次对应各环节的方法
+    scores = table.take(["作业", "考勤", "作业", "期末考试"])
+    assert np.array_equal(scores, [[80, 90, 70, 60], [0, 85, 0, 75.5]])
+    assert np.array_equal(table.column("作业"), [80, 0])
+    # 缺失的列记 0；请求次数多于同名列时沿用最后一列
+    extra = table.take(["实验", "作业", "作业", "作业"])
+    assert np.array_equal(extra[:, 0], [0, 0])
+    assert np.array_equal(extra[:, 3], extra[:, 2])
+
+
+def test_names_and_coercions(tmp_path):
+    path = tmp_path / "dup.xlsx"
+    _forward_workbook(path)
+    table = load_score_table(str(path))
+
+    # 空姓名的行跳过，整数学号与 pandas 读取一致为 int
+    assert list(table.names) == [20230001, "李四"]
+    assert isinstance(table.names[0], int)
+    # 只有无法识别的文本记入转换报告，空单元格按 0 计不报告
+    assert table.coerced == [(5, "作业", "缺考")]
+
+
+def test_build_pads_short_rows():
+    header = [["姓名", "平时考核", "期末考核"]]
+    table = build_score_table(header, [("王五", 88), ("赵六", 70, 65.0), ()], first_row=2)
+    assert list(table.names) == ["王五", "赵六"]
+    assert np.array_equal(table.values, [[88, 0], [70, 65]])
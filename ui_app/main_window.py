@@ -317,6 +317,9 @@ class GradeAnalysisApp(QMainWindow):
     def __init__(self):
         super().__init__()
         self.input_file = None
+        # 导入时读取的列式成绩表，及其对应的 (文件、大小与修改时间、模式、关系表)，导出时复用
+        self.input_table = None
+        self.input_table_key = None
         self.previous_achievement_file = None
         self.course_description = ""
         self.objective_requirements = []
@@ -930,8 +933,9 @@ class GradeAnalysisApp(QMainWindow):
     def select_file(self):
         """选择 Excel 成绩单"""
         from core import GradeProcessor
-        import pandas as pd
-        file_name, _ = QFileDialog.getOpenFileName(self, "选择成绩单文件", "", "Excel Files (*.xlsx)")
+        file_name, _ = QFileDialog.getOpenFileName(
+            self, "选择成绩单文件", "", "成绩文件 (*.xlsx *.csv *.parquet);;Excel Files (*.xlsx);;CSV (*.csv);;Parquet (*.parquet)"
+        )
         if file_name:
             # 先用模板结构特征判断类型，避免被关系表不一致误判
             template_type = self._detect_template_type(file_name)
@@ -970,8 +974,8 @@ class GradeAnalysisApp(QMainWindow):
                     forward_err = e
 
                 try:
-                    df_tmp = pd.read_excel(file_name).fillna(0)
-                    temp_processor._validate_reverse_headers(df_tmp)
+                    # 逆向表头只需第1行与表体首行首列，只读表头即可
+                    temp_processor._validate_reverse_input(file_name)
                     is_reverse = True
                 except Exception as e:
                     reverse_err = e
@@ -992,30 +996,43 @@ class GradeAnalysisApp(QMainWindow):
                 QMessageBox.warning(self, "提示", f"导入文件与当前模式不匹配：{str(e)}")
                 return
 
+            # 表头已校验通过，表体只在此读取一次，导出时直接复用
+            try:
+                self.input_table = temp_processor.load_input_table(forward=is_forward_mode)
+                self.input_table_key = self._input_table_key(file_name, is_forward_mode)
+            except Exception as e:
+                QMessageBox.warning(self, "提示", f"成绩文件读取失败：{str(e)}")
+                return
+
             self.input_file = file_name
             self.status_label.setText(f"已选择文件: {os.path.basename(file_name)}")
 
+    def _input_table_key(self, file_path: str, is_forward_mode: bool):
+        """导入时读取的成绩表能否复用：文件路径、大小与修改时间、模式、关系表均未变"""
+        from io_app.run_cache import GradeRunCache
+        return (
+            os.path.abspath(file_path),
+            GradeRunCache.file_key(file_path),
+            is_forward_mode,
+            GradeRunCache.relation_fingerprint(self.relation_payload),
+        )
+
     def _detect_template_type(self, file_path: str) -> str:
         """根据表头结构判断模板类型：forward / reverse / unknown"""
         try:
-            from openpyxl import load_workbook
-            wb = load_workbook(file_path, data_only=True)
-            ws = wb.active
-            max_col = ws.max_column
-
-            def header_value(row, col):
-                cell = ws.cell(row=row, column=col)
-                if cell.value is not None:
-                    return str(cell.value).strip()
-                for rng in ws.merged_cells.ranges:
-                    if rng.min_row <= row <= rng.max_row and rng.min_col <= col <= rng.max_col:
-                        v = ws.cell(rng.min_row, rng.min_col).value
-                        return str(v).strip() if v is not None else ""
-                return ""
-
-            row1 = [header_value(1, c) for c in range(1, max_col + 1)]
-            row2 = [header_value(2, c) for c in range(1, max_col + 1)]
-            has_row1_merged = any(rng.min_row == 1 and rng.max_row == 1 for rng in ws.merged_cells.ranges)
+            from io_app.header_probe import probe_headers
+            from io_app.score_readers import read_csv_headers, score_input_kind
+            kind = score_input_kind(file_path)
+            if kind == "parquet":
+                # Parquet 按列名映射，不区分模板布局，由表头校验判断
+                return "unknown"
+            if kind == "csv":
+                row1, row2 = read_csv_headers(file_path, 2)
+                has_row1_merged = False
+            else:
+                probe = probe_headers(file_path)
+                row1, row2 = probe.header_rows(2)
+                has_row1_merged = bool(probe.merged_in_row(1))
             row1_nonempty = [v for v in row1 if v]
 
             # 正向模板：第1行有合并表头 或者 第1行有内容且第2行首列为“姓名”
@@ -1100,15 +1117,25 @@ class GradeAnalysisApp(QMainWindow):
 
             if hasattr(self.processor, 'set_noise_config') and self.noise_config:
                 self.processor.set_noise_config(self.noise_config)
+
+            # 导入后文件、模式与关系表都未变时复用已读取的成绩表，否则重新读取
+            table = None
+            if self.input_table is not None and \
+                    self.input_table_key == self._input_table_key(self.input_file, is_forward_mode):
+                table = self.input_table
             if self.tabs.currentIndex() == 0:
+                # 只更正少数成绩后再次导出时，按上次导出缓存只重算并修补变化的学生
                 overall = self.processor.process_forward_grades(
                     spread_mode=s_mode,
                     distribution=d_mode,
+                    table=table,
+                    incremental=True,
                 )
             else:
                 overall = self.processor.process_reverse_grades(
                     spread_mode=s_mode,
                     distribution=d_mode,
+                    table=table,
                 )
 
             # cache current achievement for AI report
@@ -1188,7 +1215,8 @@ class GradeAnalysisApp(QMainWindow):
             template_path = get_resource_path("report_template.docx")
             output_dir = get_outputs_dir()
             if os.path.exists(template_path):
-                builder = ReportBuilder(template_path, output_dir)
+                # 本次运行生成的表2/表5/表6直接使用内存文档，其余从输出目录查找
+                builder = ReportBuilder(template_path, output_dir, documents=self.processor.take_report_documents())
                 output_report = builder.build(self.course_open_info, self.course_basic_info, {})
             else:
                 self.status_label.setText("AI报告已生成，但未找到模板文件report_template.docx")
@@ -2,11 +2,6 @@ import os
 import requests
 import re
 from docx import Document
-from docx.shared import Pt, Cm
-from docx.oxml import OxmlElement
-from docx.oxml.ns import qn
-from docx.enum.table import WD_ROW_HEIGHT_RULE, WD_ALIGN_VERTICAL, WD_TABLE_ALIGNMENT
-from docx.enum.text import WD_ALIGN_PARAGRAPH
 from PyQt6.QtCore import Qt, QThread, pyqtSignal
 from PyQt6.QtGui import QIcon
 from PyQt6.QtWidgets import (
@@ -23,6 +18,7 @@ from PyQt6.QtWidgets import (
     QWidget,
     QVBoxLayout,
 )
+from io_app.docx_tables import DocxTable
 from utils import get_outputs_dir
 
 
@@ -256,23 +252,6 @@ class SettingsDialog(QDialog):
         self.test_dialog.exec()
 
 
-    def _set_cell_border(self, cell, size=4):
-        tc = cell._tc
-        tcPr = tc.get_or_add_tcPr()
-        borders = tcPr.find(qn('w:tcBorders'))
-        if borders is None:
-            borders = OxmlElement('w:tcBorders')
-            tcPr.append(borders)
-        for edge in ('top', 'left', 'bottom', 'right'):
-            edge_tag = qn(f'w:{edge}')
-            element = borders.find(edge_tag)
-            if element is None:
-                element = OxmlElement(f'w:{edge}')
-                borders.append(element)
-            element.set(qn('w:val'), 'single')
-            element.set(qn('w:sz'), str(size))  # 0.5pt -> 4
-            element.set(qn('w:color'), '000000')
-
     def _export_course_basic_word(self, data: dict):
         root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
         output_dir = get_outputs_dir()
@@ -281,11 +260,7 @@ class SettingsDialog(QDialog):
         safe_name = re.sub(r'[\\/:*?"<>|]', '_', course_name)
         output_path = os.path.join(output_dir, "1.\u8bfe\u7a0b\u57fa\u672c\u4fe1\u606f\u8868.docx")
 
-        doc = Document()
-        table = doc.add_table(rows=4, cols=6)
-        table.autofit = False
-        table.alignment = WD_TABLE_ALIGNMENT.CENTER
-        col_width = Cm(14.64 / 6)
+        table = DocxTable([14.64 / 6] * 6, border_size=4)
 
         rows = [
             ('\u8bfe\u7a0b\u540d\u79f0', data.get('course_name', ''), '\u5b66\u5206', data.get('credits', ''), '\u5b66\u65f6', data.get('hours', '')),
@@ -293,27 +268,11 @@ class SettingsDialog(QDialog):
             ('\u5f00\u8bfe\u5b66\u9662', data.get('college', ''), '\u4efb\u8bfe\u6559\u5e08', data.get('teacher', ''), '\u4e0a\u8bfe\u4e13\u4e1a', data.get('major', '')),
             ('\u4e0a\u8bfe\u73ed\u7ea7', data.get('class_name', ''), '\u4e0a\u8bfe\u4eba\u6570', data.get('student_count', ''), '\u8003\u6838\u4eba\u6570', data.get('exam_count', '')),
         ]
+        for row_vals in rows:
+            table.add_row(row_vals, bold={0, 2, 4})
 
-        for r_idx, row_vals in enumerate(rows):
-            row = table.rows[r_idx]
-            row.height_rule = WD_ROW_HEIGHT_RULE.AUTO
-            for c_idx in range(6):
-                cell = row.cells[c_idx]
-                cell.width = col_width
-                cell.text = ''
-                p = cell.paragraphs[0]
-                p.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                p.paragraph_format.space_before = Pt(0)
-                p.paragraph_format.space_after = Pt(0)
-                run = p.add_run(str(row_vals[c_idx]) if c_idx < len(row_vals) else '')
-                run.font.name = '\u4eff\u5b8b'
-                run._element.rPr.rFonts.set(qn('w:eastAsia'), '\u4eff\u5b8b')
-                run.font.size = Pt(12)
-                if c_idx in (0, 2, 4):
-                    run.bold = True
-                cell.vertical_alignment = WD_ALIGN_VERTICAL.CENTER
-                self._set_cell_border(cell, size=4)
-
+        doc = Document()
+        table.add_to(doc)
         doc.save(output_path)
         return output_path
 
@@ -328,37 +287,20 @@ class SettingsDialog(QDialog):
             "3.\u8bfe\u7a0b\u76ee\u6807\u4e0e\u6bd5\u4e1a\u8981\u6c42\u7684\u5bf9\u5e94\u5173\u7cfb\u8868.docx",
         )
 
-        doc = Document()
         rows_count = max(1, len(grad_req_map)) + 1
-        table = doc.add_table(rows=rows_count, cols=3)
-        table.autofit = False
-        table.alignment = WD_TABLE_ALIGNMENT.CENTER
 
         total_cm = 14.64
         col1 = 2.79
         col2 = 3.37
         col3 = total_cm - col1 - col2
-        col_widths = [col1, col2, col3]
+        table = DocxTable([col1, col2, col3], border_size=4)
 
         headers = [
             "\u8bfe\u7a0b\u76ee\u6807",
             "\u652f\u6491\u7684\u6bd5\u4e1a\u8981\u6c42",
             "\u652f\u6491\u7684\u6bd5\u4e1a\u8981\u6c42\u6307\u6807\u70b9",
         ]
-        for c_idx, title in enumerate(headers):
-            cell = table.cell(0, c_idx)
-            cell.width = Cm(col_widths[c_idx])
-            p = cell.paragraphs[0]
-            p.alignment = WD_ALIGN_PARAGRAPH.CENTER
-            p.paragraph_format.space_before = Pt(0)
-            p.paragraph_format.space_after = Pt(0)
-            run = p.add_run(title)
-            run.font.name = "\u4eff\u5b8b"
-            run._element.rPr.rFonts.set(qn('w:eastAsia'), "\u4eff\u5b8b")
-            run.font.size = Pt(12)
-            run.bold = True
-            cell.vertical_alignment = WD_ALIGN_VERTICAL.CENTER
-            self._set_cell_border(cell, size=4)
+        table.add_row(headers, bold=True, height_cm=1)
 
         for r in range(1, rows_count):
             obj_name = f"\u8bfe\u7a0b\u76ee\u6807{r}"
@@ -369,27 +311,10 @@ class SettingsDialog(QDialog):
                 obj_name = row.get('objective', obj_name)
                 requirement = row.get('requirement', '')
                 indicator = row.get('indicator', '')
+            table.add_row([obj_name, requirement, indicator], bold={0}, height_cm=1)
 
-            for c_idx, val in enumerate([obj_name, requirement, indicator]):
-                cell = table.cell(r, c_idx)
-                cell.width = Cm(col_widths[c_idx])
-                p = cell.paragraphs[0]
-                p.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                p.paragraph_format.space_before = Pt(0)
-                p.paragraph_format.space_after = Pt(0)
-                run = p.add_run(str(val))
-                run.font.name = "\u4eff\u5b8b"
-                run._element.rPr.rFonts.set(qn('w:eastAsia'), "\u4eff\u5b8b")
-                run.font.size = Pt(12)
-                run.bold = (c_idx == 0)
-                cell.vertical_alignment = WD_ALIGN_VERTICAL.CENTER
-                self._set_cell_border(cell, size=4)
-                table.rows[r].height = Cm(1)
-                table.rows[r].height_rule = WD_ROW_HEIGHT_RULE.EXACTLY
-
-        table.rows[0].height = Cm(1)
-        table.rows[0].height_rule = WD_ROW_HEIGHT_RULE.EXACTLY
-
+        doc = Document()
+        table.add_to(doc)
         doc.save(output_path)
         return output_path
 